@@ -1,20 +1,94 @@
+import re
 import sqlite3
+from concurrent.futures import Future
 from pathlib import Path
-import threading
+
+from database.connection_manager import ConnectionManager
+from database import migrations
+from database.normalization import SQL_FUNCTION, normalize_key
+from database.synonyms import default_synonyms
+from database.write_queue import WriteQueue
+
+# Columns of a part tuple as returned by every query, in order. Spelled out
+# instead of SELECT * so columns added by migrations don't change the shape.
+# Reads select them from parts_view, which also carries the dimension ids
+# (see migrations v8). The tuple ends with the stored search keys of
+# category, car_name, model and product_name, so in-memory indexes never
+# run normalize_key per row.
+PART_FIELDS = ('id', 'category', 'car_name', 'model', 'product_name',
+               'quantity', 'price', 'last_updated') + migrations.KEY_COLUMNS
+# Index of category_key in a part tuple
+PART_KEYS_START = PART_FIELDS.index(migrations.KEY_COLUMNS[0])
+PART_COLUMNS = ', '.join(PART_FIELDS)
+PART_COLUMNS_QUALIFIED = ', '.join(f'parts.{field}' for field in PART_FIELDS)
+# Columns covered by the full-text index, in parts_fts column order. The
+# index holds their normalized *_key shadow columns (see migrations v5).
+FTS_COLUMNS = migrations.KEYED_COLUMNS
+FTS_KEY_COLUMNS = migrations.KEY_COLUMNS
+# BM25 weight per FTS column; a hit in the product name counts most
+FTS_WEIGHTS = (1.0, 2.0, 2.0, 4.0)
+# Stand-ins for an open year range in the year index: a part "from 2004"
+# with no end fits every later year, one "up to 2012" every earlier year
+YEAR_MIN = 1900
+YEAR_MAX = 9999
+# Rows per keyset page when streaming the catalog
+PAGE_SIZE = 2000
+# Ids per DELETE ... IN (...) statement; stays under SQLite's default
+# 999 bound-variable limit on older builds
+DELETE_CHUNK_SIZE = 500
+# Python's \w matches Hebrew and Latin letters and digits, like unicode61 does
+_FTS_TOKEN = re.compile(r'\w+')
+
+
+def part_keys(row):
+    """Search keys of a part tuple's category, car, model and product name.
+
+    Read from the tuple's stored key columns; computed for a tuple that
+    does not carry them.
+    """
+    keys = row[PART_KEYS_START:PART_KEYS_START + 4]
+    if len(keys) == 4 and None not in keys:
+        return keys
+    return tuple(normalize_key(value) for value in row[1:5])
+
+
+class OperationCancelled(Exception):
+    """Raised inside a write to abandon it; the transaction is rolled back"""
+
+
 class CarPartsDB:
     """Handles database operations for car parts inventory"""
 
-    def __init__(self, db_path=None):
-        self.lock = threading.Lock()
+    def __init__(self, db_path=None, wal=False, migration_progress=None):
         # If no db_path provided, default to the 'database' folder inside the project root
         if db_path is None:
             # This assumes your project structure: Project/database/car_parts.db
             self.db_path = Path(__file__).resolve().parent.parent / "database/car_parts.db"
         else:
             self.db_path = Path(db_path)
-        self.conn = None
-        self.cursor = None
+        self.wal = wal
+        self.migration_progress = migration_progress
+        self.connections = ConnectionManager(self.db_path, on_connect=self._configure_connection)
+        self.fts_enabled = False
+        self.year_index_enabled = False
+        self.writer = None
         self.connect()  # This calls create_table()
+        if wal:
+            # In WAL mode every write goes through one batching writer thread
+            self.writer = WriteQueue(self.connections)
+
+    def _configure_connection(self, conn):
+        """Register search_key() for the key triggers, then apply WAL settings if enabled"""
+        conn.create_function(SQL_FUNCTION, 1, normalize_key, deterministic=True)
+        if self.wal:
+            self._configure_wal(conn)
+
+    @staticmethod
+    def _configure_wal(conn):
+        """WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+        and fsyncs at checkpoints instead of on every commit."""
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
 
     def create_table(self):
         """Correct schema with last_updated column"""
@@ -31,179 +105,575 @@ class CarPartsDB:
         )
         '''
         self.execute_query(query)
+        self.migrate(self.migration_progress)
+        self.create_search_index()
+        self.create_year_index()
+
+    def migrate(self, progress=None):
+        """Bring an existing database file up to the current schema version"""
+        return migrations.migrate(self.connections.get(), progress)
+
+    def create_search_index(self):
+        """Create the FTS5 index over the search keys and its sync triggers.
+
+        parts_fts is an external-content table over the *_key columns, so it
+        stores only the index; the triggers keep it in step with every
+        insert, update and delete on parts. They compute the keys with
+        search_key() themselves rather than read the key columns, which
+        other triggers fill in. If SQLite was built without FTS5, search
+        falls back to LIKE.
+        """
+        existed = self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE name = 'parts_fts'").fetchone()
+        try:
+            self.execute_query(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS parts_fts USING fts5(
+                    {', '.join(FTS_KEY_COLUMNS)},
+                    content='parts', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable: {e}")
+            self.fts_enabled = False
+            return
+
+        columns = ', '.join(FTS_KEY_COLUMNS)
+        new_values = ', '.join(f'{SQL_FUNCTION}(new.{col})' for col in FTS_COLUMNS)
+        old_values = ', '.join(f'{SQL_FUNCTION}(old.{col})' for col in FTS_COLUMNS)
+        self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_fts_insert AFTER INSERT ON parts BEGIN
+                INSERT INTO parts_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        ''')
+        self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_fts_delete AFTER DELETE ON parts BEGIN
+                INSERT INTO parts_fts(parts_fts, rowid, {columns})
+                VALUES ('delete', old.id, {old_values});
+            END
+        ''')
+        self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_fts_update
+            AFTER UPDATE OF {', '.join(FTS_COLUMNS)} ON parts BEGIN
+                INSERT INTO parts_fts(parts_fts, rowid, {columns})
+                VALUES ('delete', old.id, {old_values});
+                INSERT INTO parts_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        ''')
+        if not existed:
+            # Index rows that were there before the index was created
+            self.execute_write("INSERT INTO parts_fts(parts_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+
+    def create_year_index(self):
+        """Create the R*Tree over part year ranges and its sync triggers.
+
+        parts_years holds one (year_from, year_to) interval per part with a
+        known year, so "what fits a 2010 car" is a stabbing query on the
+        tree instead of a scan. Open ends are stored as YEAR_MIN/YEAR_MAX
+        and a reversed range is stored low to high. If SQLite was built
+        without R*Tree, find_compatible_parts compares the columns directly.
+        """
+        existed = self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE name = 'parts_years'").fetchone()
+        try:
+            self.execute_query(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS parts_years "
+                "USING rtree_i32(id, year_from, year_to)")
+        except sqlite3.OperationalError as e:
+            print(f"Year index unavailable: {e}")
+            self.year_index_enabled = False
+            return
+
+        def interval(row, source=""):
+            """SELECT giving the index entry of row (new, or parts with source)"""
+            low = f"COALESCE({row}.year_from, {YEAR_MIN})"
+            high = f"COALESCE({row}.year_to, {YEAR_MAX})"
+            return (f"SELECT {row}.id, MIN({low}, {high}), MAX({low}, {high}) {source}"
+                    f"WHERE {row}.year_from IS NOT NULL OR {row}.year_to IS NOT NULL")
+
+        self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_years_insert AFTER INSERT ON parts BEGIN
+                INSERT INTO parts_years {interval('new')};
+            END
+        ''')
+        self.execute_query('''
+            CREATE TRIGGER IF NOT EXISTS parts_years_delete AFTER DELETE ON parts BEGIN
+                DELETE FROM parts_years WHERE id = old.id;
+            END
+        ''')
+        self.execute_query(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_years_update
+            AFTER UPDATE OF year_from, year_to ON parts BEGIN
+                DELETE FROM parts_years WHERE id = old.id;
+                INSERT INTO parts_years {interval('new')};
+            END
+        ''')
+        if not existed:
+            # Index rows that were there before the index was created
+            self.execute_write(f"INSERT INTO parts_years {interval('parts', 'FROM parts ')}")
+        self.year_index_enabled = True
+
+    @staticmethod
+    def build_fts_query(search_term):
+        """Turn free text into an FTS5 query: every word is an ANDed prefix term.
+
+        The text is normalized like the indexed keys (niqqud, final letters,
+        geresh and case don't matter), and punctuation splits words the same
+        way the unicode61 tokenizer does, so "פ.גיר" becomes "פ" AND "גיר"*.
+        Single letters (the abbreviation marks in names like "פ.אויר") match
+        exactly, since as a prefix they would match most of the catalog.
+        A phrase from the synonyms table matches any of its spellings, so
+        "משאבת מים" becomes ("מ" AND "מים"*) OR ("משאבת"* AND "מים"*).
+        Returns None if nothing searchable is left.
+        """
+        def terms(text):
+            return ' AND '.join(f'"{token}"*' if len(token) > 1 else f'"{token}"'
+                                for token in _FTS_TOKEN.findall(text))
+
+        parts = []
+        for spellings in default_synonyms().variants(normalize_key(search_term)):
+            if len(spellings) == 1:
+                part = terms(spellings[0])
+            else:
+                part = '(' + ' OR '.join(f'({terms(s)})' for s in spellings) + ')'
+            if part:
+                parts.append(part)
+        if not parts:
+            return None
+        return ' AND '.join(parts)
+
+    def build_filter_clause(self, filters):
+        """Turn FilterDialog criteria into a parameterized WHERE clause.
+
+        Returns (clause, params); clause is empty when nothing is filtered.
+        Category is a substring match on the normalized category key,
+        tested against the small categories table and then looked up
+        through idx_parts_category_id. Name is a substring match on
+        product_name_key. Both mean exactly what FilterEngine's in-memory
+        filters mean, so either filter mode shows the same rows. Price and
+        quantity limits are inclusive range predicates on their own indexes.
+        """
+        conditions, params = [], []
+        if filters.get('category'):
+            conditions.append(
+                "category_id IN (SELECT id FROM categories WHERE key LIKE ? ESCAPE '\\')")
+            params.append(f"%{self._escape_like(normalize_key(filters['category']))}%")
+        if filters.get('name'):
+            conditions.append("product_name_key LIKE ? ESCAPE '\\'")
+            params.append(f"%{self._escape_like(normalize_key(filters['name']))}%")
+        for key, predicate in (('min_price', "price >= ?"), ('max_price', "price <= ?"),
+                               ('min_quantity', "quantity >= ?"),
+                               ('max_quantity', "quantity <= ?")):
+            if filters.get(key) is not None:
+                conditions.append(predicate)
+                params.append(filters[key])
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    @staticmethod
+    def _escape_like(text):
+        return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
     def execute_query(self, query, params=()):
-        with self.lock:
-            try:
-                if not self.conn:
-                    self.connect()
-                self.cursor.execute(query, params)
-                return self.cursor
-            except sqlite3.OperationalError:
-                self.connect()  # Reconnect if needed
-                self.cursor.execute(query, params)
-                return self.cursor
+        """Run a query on the calling thread's connection and return the cursor"""
+        return self.connections.get().execute(query, params)
+
+    def execute_write(self, query, params=()):
+        """Run a data-changing statement and return the number of rows it changed"""
+        return self.run_write(lambda conn: conn.execute(query, params).rowcount)
+
+    def run_write(self, write):
+        """Run write(conn) as a committed write and return its result.
+
+        With WAL enabled the write is queued to the writer thread and this
+        waits for its batch to commit; otherwise it runs in a transaction on
+        the calling thread. write must not commit on its own. Callers that
+        must not wait, like the GUI thread, use submit_write instead.
+        """
+        if self.writer:
+            return self.writer.submit(write).result()
+        with self.connections.transaction() as conn:
+            return write(conn)
+
+    def submit_write(self, write):
+        """Queue write(conn) without waiting and return a Future for its result.
+
+        Without WAL the write runs immediately and the Future is already done.
+        """
+        if self.writer:
+            return self.writer.submit(write)
+        future = Future()
+        try:
+            future.set_result(self.run_write(write))
+        except Exception as e:
+            future.set_exception(e)
+        return future
 
     def add_part(self, category, car_name, model, product_name, quantity, price):
         try:
-            if not self.conn:
-                self.connect()
-            self.cursor.execute("""
+            self.execute_write("""
                 INSERT INTO parts 
                 (category, car_name, model, product_name, quantity, price)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (category, car_name, model, product_name, quantity, price))
-            self.conn.commit()
             return True
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return False
 
-    def search_parts(self, search_term=''):
-        """Search parts by any field"""
-        query = '''
-        SELECT * FROM parts 
-        WHERE car_name LIKE ? 
-           OR model LIKE ? 
-           OR product_name LIKE ?
+    def search_parts(self, search_term='', limit=None):
+        """Search parts by any field, best matches first.
+
+        Uses the FTS5 index with BM25 ranking: every word must match the
+        start of a word in category, car, model or product name.
+        """
+        if not self.fts_enabled:
+            return self._search_parts_like(search_term, limit)
+
+        fts_query = self.build_fts_query(search_term)
+        if fts_query is None:
+            return self.get_all_parts()[:limit] if limit else self.get_all_parts()
+
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        query = f'''
+        SELECT {PART_COLUMNS_QUALIFIED} FROM parts_fts
+        JOIN parts_view AS parts ON parts.id = parts_fts.rowid
+        WHERE parts_fts MATCH ?
+        ORDER BY bm25(parts_fts, {weights})
+        LIMIT ?
         '''
         return self.execute_query(
-            query,
-            (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%')
+            query, (fts_query, -1 if limit is None else limit)
+        ).fetchall()
+
+    def _search_parts_like(self, search_term='', limit=None):
+        """Substring search on the normalized keys, used when FTS5 is not available"""
+        pattern = f'%{self._escape_like(normalize_key(search_term))}%'
+        query = f'''
+        SELECT {PART_COLUMNS} FROM parts_view
+        WHERE car_name_key LIKE ? ESCAPE '\\'
+           OR model_key LIKE ? ESCAPE '\\'
+           OR product_name_key LIKE ? ESCAPE '\\'
+        LIMIT ?
+        '''
+        return self.execute_query(
+            query, (pattern, pattern, pattern, -1 if limit is None else limit)
         ).fetchall()
 
     def get_part(self, part_id):
         """Get a single part by ID"""
-        conn = None
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM parts WHERE id = ?", (part_id,))
-            return cursor.fetchone()
-        finally:
-            if conn:
-                conn.close()
+        query = f"SELECT {PART_COLUMNS} FROM parts_view WHERE id = ?"
+        return self.execute_query(query, (part_id,)).fetchone()
 
     def get_all_parts(self):
         """Get all parts ordered by last updated"""
-        conn = self.get_connection()
+        query = f"SELECT {PART_COLUMNS} FROM parts_view ORDER BY last_updated DESC, id DESC"
+        return self.execute_query(query).fetchall()
+
+    def get_parts_page(self, after=None, limit=PAGE_SIZE):
+        """Get one page of parts in get_all_parts order using keyset pagination.
+
+        after is the cursor returned by page_cursor() for the previous page
+        (None for the first page). Each page is an index range scan, so the
+        cost does not grow with how deep into the catalog the page is.
+        """
+        if after is None:
+            query = (f"SELECT {PART_COLUMNS} FROM parts_view "
+                     f"ORDER BY last_updated DESC, id DESC LIMIT ?")
+            params = (limit,)
+        else:
+            query = f'''
+            SELECT {PART_COLUMNS} FROM parts_view
+            WHERE (last_updated, id) < (?, ?)
+            ORDER BY last_updated DESC, id DESC
+            LIMIT ?
+            '''
+            params = (after[0], after[1], limit)
+        return self.execute_query(query, params).fetchall()
+
+    @staticmethod
+    def page_cursor(page):
+        """Cursor for the page after the given one: its last (last_updated, id)"""
+        if not page:
+            return None
+        return page[-1][7], page[-1][0]
+
+    def filter_parts(self, filters, limit=None):
+        """Get parts matching FilterDialog criteria, newest first, without loading the catalog"""
+        clause, params = self.build_filter_clause(filters)
+        query = f'''
+        SELECT {PART_COLUMNS} FROM parts_view{clause}
+        ORDER BY last_updated DESC, id DESC
+        LIMIT ?
+        '''
+        return self.execute_query(query, params + [-1 if limit is None else limit]).fetchall()
+
+    def find_compatible_parts(self, car='', model='', year=None, limit=None):
+        """Get parts listed for a vehicle, newest first; see build_compatibility_query"""
+        source, clause, params = self.build_compatibility_query(car, model, year)
+        query = f'''
+        SELECT {PART_COLUMNS_QUALIFIED} FROM {source}{clause}
+        ORDER BY parts.last_updated DESC, parts.id DESC
+        LIMIT ?
+        '''
+        return self.execute_query(query, params + [-1 if limit is None else limit]).fetchall()
+
+    def find_compatible_ids(self, car='', model='', year=None):
+        """Ids of the parts find_compatible_parts would return, in no particular order.
+
+        Cheaper when the caller already holds the rows, as the products
+        view does.
+        """
+        source, clause, params = self.build_compatibility_query(car, model, year)
+        return [row[0] for row in self.execute_query(
+            f"SELECT parts.id FROM {source}{clause}", params)]
+
+    def build_compatibility_query(self, car='', model='', year=None):
+        """Turn a vehicle into (FROM source, WHERE clause, params).
+
+        car and model are compared by their normalized keys; either may be
+        empty to leave it open. With a year, only parts whose year range
+        contains it match. A car or model is resolved in the makes and
+        models tables and narrows through idx_parts_make_model or
+        idx_parts_model_id first, and the year is then checked on each row;
+        a year alone is a stabbing query on the parts_years R*Tree.
+        """
+        conditions, params = [], []
+        for column, table, value in (('make_id', 'makes', car), ('model_id', 'models', model)):
+            key = normalize_key(value)
+            if key:
+                conditions.append(f"parts.{column} IN (SELECT id FROM {table} WHERE key = ?)")
+                params.append(key)
+        source = "parts_view AS parts"
+        if year is not None:
+            if self.year_index_enabled and not conditions:
+                source = "parts_years JOIN parts_view AS parts ON parts.id = parts_years.id"
+                conditions.append("parts_years.year_from <= ? AND parts_years.year_to >= ?")
+            else:
+                low = f"COALESCE(parts.year_from, {YEAR_MIN})"
+                high = f"COALESCE(parts.year_to, {YEAR_MAX})"
+                conditions.append(
+                    f"(parts.year_from IS NOT NULL OR parts.year_to IS NOT NULL) "
+                    f"AND MIN({low}, {high}) <= ? AND MAX({low}, {high}) >= ?")
+            params.extend([year, year])
+        return source, (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def count_parts(self, filters):
+        """Count parts matching FilterDialog criteria using the same indexed clause"""
+        clause, params = self.build_filter_clause(filters)
+        return self.execute_query(f"SELECT COUNT(*) FROM parts{clause}", params).fetchone()[0]
+
+    def get_change_token(self):
+        """Current change sequence; pass it to get_changes_since() later"""
+        return self.execute_query(
+            "SELECT seq FROM parts_change_counter WHERE id = 1").fetchone()[0]
+
+    def get_changes_since(self, token):
+        """Get what changed after a token from get_change_token().
+
+        Returns (changed_parts, deleted_ids, new_token). Both lookups run on
+        one read snapshot, so nothing committed in between is missed or
+        reported twice.
+        """
+        conn = self.connections.get()
+        conn.execute("BEGIN")
         try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM parts ORDER BY last_updated DESC")
-            return cursor.fetchall()
+            new_token = conn.execute(
+                "SELECT seq FROM parts_change_counter WHERE id = 1").fetchone()[0]
+            changed = conn.execute(
+                f"SELECT {PART_COLUMNS} FROM parts_view WHERE change_seq > ? ORDER BY change_seq",
+                (token,)).fetchall()
+            deleted = [row[0] for row in conn.execute(
+                "SELECT id FROM parts_tombstones WHERE change_seq > ?", (token,))]
         finally:
-            conn.close()
+            conn.commit()
+        return changed, deleted, new_token
+
+    def get_categories(self):
+        """Category names in use, sorted, e.g. for a filter dropdown"""
+        return self._dimension_names('categories', 'category_id')
+
+    def get_makes(self):
+        """Car make names in use, sorted"""
+        return self._dimension_names('makes', 'make_id')
+
+    def get_models(self, make=''):
+        """Model names in use, sorted; only those of one make if given"""
+        key = normalize_key(make)
+        if not key:
+            return self._dimension_names('models', 'model_id')
+        return self._dimension_names(
+            'models', 'model_id', "models.make_id IN (SELECT id FROM makes WHERE key = ?)", (key,))
+
+    def _dimension_names(self, table, id_column, condition='', params=()):
+        """Names in a dimension table that at least one part refers to.
+
+        The empty key (unknown, stored as "-") is never listed. Reads only
+        the small table and probes the parts index once per row, so it
+        stays cheap however large the catalog grows. Models of different
+        makes may share a name; it is listed once.
+        """
+        query = f'''
+        SELECT DISTINCT name FROM {table}
+        WHERE key != ''
+        AND EXISTS (SELECT 1 FROM parts WHERE parts.{id_column} = {table}.id)
+        {'AND ' + condition if condition else ''}
+        ORDER BY name
+        '''
+        try:
+            return [row[0] for row in self.execute_query(query, params).fetchall()]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            return []
+
+    def get_product_names(self):
+        """Get every product name, e.g. to build the autocomplete index.
+
+        Safe from a worker thread: it reads on that thread's own connection,
+        which DatabaseWorker releases when it finishes.
+        """
+        query = 'SELECT product_name FROM parts'
+        return [row[0] for row in self.execute_query(query).fetchall()]
 
     def update_part(self, part_id, **kwargs):
         try:
             set_clause = ', '.join([f"{k} = ?" for k in kwargs.keys()])
             values = list(kwargs.values()) + [part_id]
-            self.cursor.execute(f"""
+            changed = self.execute_write(f"""
                 UPDATE parts 
                 SET {set_clause}
                 WHERE id = ?
             """, values)
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            return changed > 0
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return False
 
+    def submit_update_part(self, part_id, **kwargs):
+        """Queue an update_part without waiting; see submit_write.
+
+        The Future's result is the stored row as get_part returns it, read
+        in the same transaction, or None if the part no longer exists.
+        """
+        set_clause = ', '.join(f"{k} = ?" for k in kwargs)
+        values = list(kwargs.values()) + [part_id]
+
+        def update(conn):
+            if conn.execute(f"UPDATE parts SET {set_clause} WHERE id = ?", values).rowcount == 0:
+                return None
+            return conn.execute(f"SELECT {PART_COLUMNS} FROM parts_view WHERE id = ?",
+                                (part_id,)).fetchone()
+
+        return self.submit_write(update)
+
     def delete_part(self, part_id):
         """Delete a part by ID"""
-        conn = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM parts WHERE id = ?", (part_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            return self.execute_write("DELETE FROM parts WHERE id = ?", (part_id,)) > 0
         except sqlite3.Error as e:
             print(f"Database error: {str(e)}")
             return False
-        finally:
-            if conn:
-                conn.close()
 
     def delete_multiple_parts(self, part_ids):
         """Safe method to delete multiple parts"""
         try:
-            placeholders = ','.join(['?'] * len(part_ids))
-            self.cursor.execute(
-                f"DELETE FROM parts WHERE id IN ({placeholders})",
-                part_ids
-            )
-            self.conn.commit()
+            self.delete_parts(part_ids)
             return True
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             return False
 
+    def delete_parts(self, part_ids, progress=None, is_cancelled=None):
+        """Delete many parts in one transaction and return the ids that existed.
+
+        Ids are deleted in chunks of DELETE_CHUNK_SIZE. After each chunk
+        progress(done, total) is called; if is_cancelled() then returns True
+        the whole transaction is rolled back and OperationCancelled raised.
+        """
+        part_ids = list(dict.fromkeys(part_ids))
+        total = len(part_ids)
+
+        def delete(conn):
+            deleted = []
+            for start in range(0, total, DELETE_CHUNK_SIZE):
+                if is_cancelled and is_cancelled():
+                    raise OperationCancelled()
+                chunk = part_ids[start:start + DELETE_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                deleted.extend(row[0] for row in conn.execute(
+                    f"SELECT id FROM parts WHERE id IN ({placeholders})", chunk))
+                conn.execute(f"DELETE FROM parts WHERE id IN ({placeholders})", chunk)
+                if progress:
+                    progress(start + len(chunk), total)
+            if is_cancelled and is_cancelled():
+                raise OperationCancelled()
+            return deleted
+
+        return self.run_write(delete)
+
     def search_products_starting_with(self, search_text, limit=5):
-        """Return product names starting with search text (case-insensitive)"""
+        """Return product names whose normalized key starts with the normalized text"""
+        key = normalize_key(search_text)
+        if not key:
+            return []
         try:
-            self.cursor.execute("""
+            # A range on the key seeks idx_parts_product_name_key
+            cursor = self.execute_query("""
                 SELECT product_name FROM parts
-                WHERE product_name LIKE ? COLLATE NOCASE
-                ORDER BY product_name
+                WHERE product_name_key >= ? AND product_name_key < ?
+                ORDER BY product_name_key
                 LIMIT ?
-            """, (f"{search_text}%", limit))
-            return [row[0] for row in self.cursor.fetchall()]
+            """, (key, key + '\U0010ffff', limit))
+            return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             print(f"Search error: {e}")
             return []
 
     def close_connection(self):
-        """Safely close database connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
-        self.conn = None
-        self.cursor = None
+        """Flush queued writes, then close every thread's database connection"""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        self.connections.close_all()
+
+    def release_thread_connection(self):
+        """Close the calling thread's connection; worker threads call this when done"""
+        self.connections.close_thread()
 
     def get_part_by_name(self, product_name):
         """Fetch part by product name"""
-        query = 'SELECT * FROM parts WHERE product_name = ?'
-        return self.execute_query(query, (product_name,)).fetchone()
+        # The NOCASE term lets SQLite seek idx_parts_product_name; the plain
+        # term keeps the match exact
+        query = f'''
+        SELECT {PART_COLUMNS} FROM parts_view
+        WHERE product_name = ? COLLATE NOCASE AND product_name = ?
+        '''
+        return self.execute_query(query, (product_name, product_name)).fetchone()
 
     def connect(self):
-        """Establish and maintain connection"""
+        """Open this thread's connection and make sure the schema exists"""
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            self.cursor = self.conn.cursor()
+            self.connections.get()
             self.create_table()
         except sqlite3.Error as e:
             print(f"Connection error: {str(e)}")
             raise
 
-    def get_connection(self):
-        """Create new connection for each operation"""
-        return sqlite3.connect(self.db_path)
-
 if __name__ == "__main__":
+    from database.importer import CatalogImporter
+
     # Create an instance of the database
     db = CarPartsDB()
 
-    script_dir = Path(__file__).parent.absolute()
+    script_dir = Path(__file__).resolve().parent.parent
     file_path = script_dir / 'resources' / 'btw_filenames.txt'  # Adjusted path for resources directory
 
     # Only populate if empty
     if not db.get_all_parts():
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                product_names = [line.strip() for line in file if line.strip()]
-                for name in product_names:
-                    db.add_part(
-                        category="-",
-                        car_name="-",
-                        model="-",
-                        product_name=name,
-                        quantity=0,
-                        price=0.00
-                    )
-                print(f"Inserted {len(product_names)} products from file")
+            report = CatalogImporter(db).import_names(file_path)
+            print(f"Inserted {report.inserted} products from file ({report})")
         except FileNotFoundError:
             print(f"Error: {file_path} not found!")
         except Exception as e:
@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class ConnectionManager:
+    """Gives every thread its own long-lived SQLite connection.
+
+    sqlite3 connections must not be shared between threads, and opening one
+    per call throws away the statement cache. Here each thread (the UI
+    thread, each QThread worker) lazily opens one connection on first use
+    and keeps it, so repeated queries reuse their prepared statements.
+    """
+
+    def __init__(self, db_path, timeout=30.0, cached_statements=256, on_connect=None):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.on_connect = on_connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> connection
+
+    def get(self):
+        """Return the calling thread's connection, opening it if needed"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        # check_same_thread is off only so close_all() can close connections
+        # at shutdown; each connection is otherwise used by its own thread.
+        conn = sqlite3.connect(str(self.db_path), timeout=self.timeout,
+                               cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.on_connect:
+            self.on_connect(conn)
+        self._local.conn = conn
+
+        ident = threading.get_ident()
+        with self._lock:
+            # A finished thread's ident can be reused; drop its connection
+            stale = self._connections.pop(ident, None)
+            self._connections[ident] = conn
+        if stale is not None:
+            stale.close()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block in a transaction on this thread's connection.
+
+        Commits on success and rolls back if the block raises.
+        """
+        conn = self.get()
+        with conn:
+            yield conn
+
+    def close_thread(self):
+        """Close the calling thread's connection, e.g. when a worker finishes"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if self._connections.get(threading.get_ident()) is conn:
+                del self._connections[threading.get_ident()]
+        conn.close()
+
+    def close_all(self):
+        """Close every thread's connection; call once at shutdown"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing connection: {e}")
+        self._local.conn = None
+
+    def open_count(self):
+        with self._lock:
+            return len(self._connections)
+
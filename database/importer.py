@@ -0,0 +1,277 @@
+"""Streaming bulk import of supplier catalogs into the parts table.
+
+Usage from the project root:
+
+    python -m database.importer resources/btw_filenames.txt
+    python -m database.importer catalog.csv --csv --map product_name=Description,price=Price
+"""
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+from database.car_parts_db import CarPartsDB
+
+IMPORT_FIELDS = ('category', 'car_name', 'model', 'product_name', 'quantity', 'price')
+TEXT_FIELDS = ('category', 'car_name', 'model', 'product_name')
+# What the seed catalog has always stored for unknown text fields
+DEFAULT_TEXT = "-"
+
+
+class ImportReport:
+    """Running totals for an import, passed to the progress callback after each batch.
+
+    Every row read is counted once: inserted, updated, or skipped (blank,
+    invalid, repeated later in its batch, or matching a part it would not
+    change).
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.read} rows read, {self.inserted} inserted, {self.updated} updated, "
+                f"{self.skipped} skipped in {self.seconds:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/s)")
+
+
+class CatalogImporter:
+    """Streams rows from a file into CarPartsDB in large batches.
+
+    Rows are read lazily, normalized and validated, then written batch_size
+    at a time with executemany inside one transaction per batch. A row whose
+    key (one or more columns, product_name by default) already exists
+    updates that part instead of adding a duplicate; empty fields leave
+    the stored value alone.
+    """
+
+    def __init__(self, db, key=('product_name',), batch_size=5000, progress=None):
+        if isinstance(key, str):
+            key = (key,)
+        unknown = [field for field in key if field not in IMPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown key column(s): {', '.join(unknown)}")
+        self.db = db
+        self.key = tuple(key)
+        self.batch_size = batch_size
+        self.progress = progress
+        self._ids_by_key = None
+        self._max_id = 0
+
+    # --- Sources -----------------------------------------------------------
+
+    def import_names(self, path, encoding='utf-8'):
+        """Import a plain list with one product name per line"""
+        def rows():
+            with open(path, 'r', encoding=encoding) as file:
+                for line in file:
+                    yield {'product_name': line}
+        return self.import_rows(rows())
+
+    def import_csv(self, path, column_map=None, delimiter=',', encoding='utf-8-sig'):
+        """Import a CSV file with a header row.
+
+        column_map maps parts fields to CSV headers, e.g.
+        {'product_name': 'Description', 'price': 'Unit Price'}. Without it,
+        headers named like the parts fields (any case) are used.
+        """
+        def rows():
+            with open(path, 'r', encoding=encoding, newline='') as file:
+                reader = csv.DictReader(file, delimiter=delimiter)
+                mapping = column_map or self._default_mapping(reader.fieldnames or [])
+                missing = [header for header in mapping.values()
+                           if header not in (reader.fieldnames or [])]
+                if missing:
+                    raise ValueError(f"CSV has no column(s): {', '.join(missing)}")
+                for record in reader:
+                    yield {field: record.get(header) for field, header in mapping.items()}
+        return self.import_rows(rows())
+
+    @staticmethod
+    def _default_mapping(headers):
+        by_name = {header.strip().lower(): header for header in headers}
+        return {field: by_name[field] for field in IMPORT_FIELDS if field in by_name}
+
+    # --- Pipeline ----------------------------------------------------------
+
+    def import_rows(self, rows):
+        """Import an iterable of dicts keyed by parts field names"""
+        report = ImportReport()
+        batch = []
+        for line_number, raw in enumerate(rows, start=1):
+            report.read += 1
+            try:
+                row = self.normalize(raw)
+            except ValueError as e:
+                report.errors.append((line_number, str(e)))
+                row = None
+            if row is None:
+                report.skipped += 1
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._write_batch(batch, report)
+                batch = []
+        if batch:
+            self._write_batch(batch, report)
+        report.seconds = time.perf_counter() - report.started
+        return report
+
+    @staticmethod
+    def normalize(raw):
+        """Clean one row; returns None for blank rows and raises ValueError for bad ones"""
+        row = {}
+        for field in TEXT_FIELDS:
+            if field in raw:
+                value = " ".join(str(raw[field] or "").split())
+                row[field] = value
+        if not row.get('product_name'):
+            if any(str(value or "").strip() for value in raw.values()):
+                raise ValueError("missing product name")
+            return None
+        try:
+            if raw.get('quantity') not in (None, ""):
+                row['quantity'] = int(float(raw['quantity']))
+            if raw.get('price') not in (None, ""):
+                row['price'] = round(float(str(raw['price']).replace(',', '')), 2)
+        except ValueError:
+            raise ValueError(f"bad number in {raw!r}")
+        if row.get('quantity', 0) < 0 or row.get('price', 0) < 0:
+            raise ValueError("negative quantity or price")
+        return row
+
+    def _row_key(self, row):
+        # Empty text is stored as DEFAULT_TEXT (see _insert_values), so it
+        # has to key the same way to find the row again on re-import
+        return tuple((row.get(field) or DEFAULT_TEXT) if field in TEXT_FIELDS
+                     else row.get(field, 0)
+                     for field in self.key)
+
+    def _load_keys(self, conn):
+        """Read the key columns once so upserts never scan per batch"""
+        columns = ', '.join(self.key)
+        self._ids_by_key = {}
+        for row in conn.execute(f"SELECT id, {columns} FROM parts"):
+            self._ids_by_key[tuple(row[1:])] = row[0]
+            self._max_id = max(self._max_id, row[0])
+
+    def _write_batch(self, batch, report):
+        # Within a batch the last row for a key wins
+        by_key = {}
+        for row in batch:
+            by_key[self._row_key(row)] = row
+
+        def write(conn):
+            if self._ids_by_key is None:
+                self._load_keys(conn)
+            inserts = []
+            updates = {}
+            for key, row in by_key.items():
+                part_id = self._ids_by_key.get(key)
+                if part_id is None:
+                    inserts.append(row)
+                else:
+                    # An empty cell means "unknown", not "clear the stored value"
+                    fields = tuple(sorted(f for f in row
+                                          if f not in self.key and row[f] != ""))
+                    values = [row[f] for f in fields]
+                    updates.setdefault(fields, []).append(values + [part_id] + values)
+            if inserts:
+                conn.executemany(f'''
+                    INSERT INTO parts ({', '.join(IMPORT_FIELDS)})
+                    VALUES ({', '.join('?' * len(IMPORT_FIELDS))})
+                ''', [self._insert_values(row) for row in inserts])
+                columns = ', '.join(self.key)
+                for row in conn.execute(f"SELECT id, {columns} FROM parts WHERE id > ?",
+                                        (self._max_id,)):
+                    self._ids_by_key[tuple(row[1:])] = row[0]
+                    self._max_id = max(self._max_id, row[0])
+            updated = 0
+            for fields, values in updates.items():
+                if not fields:
+                    continue
+                # Rows that already hold these values are left untouched, so
+                # they keep last_updated and count as skipped
+                set_clause = ', '.join(f"{f} = ?" for f in fields)
+                same = ' AND '.join(f"{f} IS ?" for f in fields)
+                updated += conn.executemany(
+                    f"UPDATE parts SET {set_clause} WHERE id = ? AND NOT ({same})",
+                    values).rowcount
+            return len(inserts), updated
+
+        inserted, updated = self.db.run_write(write)
+        report.inserted += inserted
+        report.updated += updated
+        report.skipped += len(batch) - inserted - updated
+        report.seconds = time.perf_counter() - report.started
+        if self.progress:
+            self.progress(report)
+
+    @staticmethod
+    def _insert_values(row):
+        return (
+            row.get('category') or DEFAULT_TEXT,
+            row.get('car_name') or DEFAULT_TEXT,
+            row.get('model') or DEFAULT_TEXT,
+            row['product_name'],
+            row.get('quantity', 0),
+            row.get('price', 0.0),
+        )
+
+
+def parse_column_map(text):
+    """Parse 'field=Header,field2=Header 2' into a dict"""
+    mapping = {}
+    for pair in filter(None, (p.strip() for p in text.split(','))):
+        field, _, header = pair.partition('=')
+        if field.strip() not in IMPORT_FIELDS or not header:
+            raise argparse.ArgumentTypeError(f"bad mapping: {pair}")
+        mapping[field.strip()] = header.strip()
+    return mapping
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a parts catalog into the database")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--csv", action="store_true", help="file is CSV with a header row")
+    parser.add_argument("--map", type=parse_column_map, default=None,
+                        help="CSV column mapping, e.g. product_name=Description,price=Price")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--key", default="product_name",
+                        help="comma-separated columns identifying an existing part")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--db", type=Path, default=None, help="database file (default: car_parts.db)")
+    args = parser.parse_args(argv)
+
+    db = CarPartsDB(args.db)
+    importer = CatalogImporter(
+        db, key=[k.strip() for k in args.key.split(',') if k.strip()],
+        batch_size=args.batch_size,
+        progress=lambda report: print(f"  {report}", flush=True))
+    try:
+        if args.csv:
+            report = importer.import_csv(args.file, args.map, delimiter=args.delimiter)
+        else:
+            report = importer.import_names(args.file)
+    finally:
+        db.close_connection()
+
+    print(f"Done: {report}")
+    for line_number, message in report.errors[:20]:
+        print(f"  line {line_number}: {message}")
+    return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,444 @@
+"""Versioned schema migrations for car_parts.db.
+
+The schema version lives in PRAGMA user_version. Version 0 is the original
+bare parts table; each migration moves the file one version forward and is
+applied in place when CarPartsDB connects. To change the schema, append a
+migration with the next version number; never edit one that has shipped.
+
+    python -m database.migrations [--db path]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from database.normalization import SQL_FUNCTION
+
+# Rows per step for migrations that rewrite existing data
+BATCH_SIZE = 5000
+
+
+class Migration:
+    """One schema step.
+
+    apply(conn, progress) makes the change. Plain migrations run inside a
+    single transaction together with the version bump. Batched migrations
+    commit as they go (see run_in_batches) so large tables are not locked
+    for the whole upgrade; they must be safe to re-run if interrupted.
+    """
+
+    def __init__(self, version, description, apply, batched=False):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.batched = batched
+
+
+def create_indexes(conn, progress, indexes):
+    """Create (name, definition) indexes, reporting one step per index"""
+    for done, (name, definition) in enumerate(indexes, start=1):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        progress(f"index {name}", done, len(indexes))
+
+
+def run_in_batches(conn, statement, progress, label, table='parts', batch_size=BATCH_SIZE):
+    """Run statement over table one id range at a time, committing after each.
+
+    statement gets the range as the named parameters :lo and :hi (inclusive)
+    and should only touch rows that still need migrating, so a restart
+    after a crash picks up where it stopped.
+    """
+    lo, hi = conn.execute(f"SELECT MIN(id), MAX(id) FROM {table}").fetchone()
+    if lo is None:
+        return
+    total = hi - lo + 1
+    for start in range(lo, hi + 1, batch_size):
+        end = min(start + batch_size - 1, hi)
+        with conn:
+            conn.execute(statement, {'lo': start, 'hi': end})
+        progress(label, end - lo + 1, total)
+
+
+def _add_lookup_indexes(conn, progress):
+    create_indexes(conn, progress, [
+        ('idx_parts_last_updated', 'parts(last_updated, id)'),
+        ('idx_parts_product_name', 'parts(product_name COLLATE NOCASE)'),
+    ])
+
+
+def _add_filter_indexes(conn, progress):
+    create_indexes(conn, progress, [
+        ('idx_parts_category', 'parts(category COLLATE NOCASE)'),
+        ('idx_parts_car_name', 'parts(car_name COLLATE NOCASE)'),
+        ('idx_parts_model', 'parts(model COLLATE NOCASE)'),
+    ])
+
+
+# Columns whose edits count as a change for delta refreshes
+TRACKED_COLUMNS = ('category', 'car_name', 'model', 'product_name', 'quantity', 'price')
+
+
+def _add_change_tracking(conn, progress):
+    """Stamp every insert/update with a change sequence and keep tombstones for deletes.
+
+    parts_change_counter holds one global sequence number; each tracked
+    write bumps it, copies it into parts.change_seq and refreshes
+    last_updated. Deleted ids are kept in parts_tombstones with the
+    sequence of their deletion, so readers can ask for "everything after
+    sequence N".
+    """
+    conn.execute("ALTER TABLE parts ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_parts_change_seq ON parts(change_seq)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS parts_tombstones (
+            id INTEGER PRIMARY KEY,
+            change_seq INTEGER NOT NULL
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tombstones_change_seq ON parts_tombstones(change_seq)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS parts_change_counter (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO parts_change_counter (id, seq) VALUES (1, 0)")
+    progress("tables", 1, 2)
+
+    bump = "UPDATE parts_change_counter SET seq = seq + 1 WHERE id = 1;"
+    current = "(SELECT seq FROM parts_change_counter WHERE id = 1)"
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS parts_track_insert AFTER INSERT ON parts BEGIN
+            {bump}
+            UPDATE parts SET change_seq = {current}, last_updated = CURRENT_TIMESTAMP
+            WHERE id = new.id;
+            DELETE FROM parts_tombstones WHERE id = new.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS parts_track_update
+        AFTER UPDATE OF {', '.join(TRACKED_COLUMNS)} ON parts BEGIN
+            {bump}
+            UPDATE parts SET change_seq = {current}, last_updated = CURRENT_TIMESTAMP
+            WHERE id = new.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS parts_track_delete AFTER DELETE ON parts BEGIN
+            {bump}
+            INSERT OR REPLACE INTO parts_tombstones (id, change_seq)
+            VALUES (old.id, {current});
+        END
+    ''')
+    progress("triggers", 2, 2)
+
+
+def _add_range_indexes(conn, progress):
+    create_indexes(conn, progress, [
+        ('idx_parts_price', 'parts(price)'),
+        ('idx_parts_quantity', 'parts(quantity)'),
+    ])
+
+
+# Text columns that get a normalized shadow column, named <column>_key
+KEYED_COLUMNS = ('category', 'car_name', 'model', 'product_name')
+KEY_COLUMNS = tuple(f"{column}_key" for column in KEYED_COLUMNS)
+
+
+def _add_search_keys(conn, progress):
+    """Store a normalized search key next to every searchable text column.
+
+    The keys come from database.normalization through the search_key() SQL
+    function, so triggers recompute them on every insert and text edit and
+    no write path can forget to. Existing rows are filled in batches. The
+    old full-text index covered the raw columns; it is dropped here and
+    CarPartsDB.create_search_index rebuilds it over the keys.
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(parts)")}
+    for column in KEY_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE parts ADD COLUMN {column} TEXT")
+
+    keys = ', '.join(f"{key} = {SQL_FUNCTION}({column})"
+                     for column, key in zip(KEYED_COLUMNS, KEY_COLUMNS))
+    with conn:
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_keys_insert AFTER INSERT ON parts BEGIN
+                UPDATE parts SET {keys} WHERE id = new.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_keys_update
+            AFTER UPDATE OF {', '.join(KEYED_COLUMNS)} ON parts BEGIN
+                UPDATE parts SET {keys} WHERE id = new.id;
+            END
+        ''')
+    # Rows inserted from here on get keys from the trigger, so NULL marks
+    # exactly the rows still to backfill
+    run_in_batches(conn, f'''
+        UPDATE parts SET {keys}
+        WHERE id BETWEEN :lo AND :hi AND product_name_key IS NULL
+    ''', progress, "search keys")
+
+    with conn:
+        for name, definition in [
+            ('idx_parts_product_name_key', 'parts(product_name_key)'),
+            ('idx_parts_category_key', 'parts(category_key)'),
+        ]:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        for trigger in ('parts_fts_insert', 'parts_fts_delete', 'parts_fts_update'):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("DROP TABLE IF EXISTS parts_fts")
+    progress("indexes", 1, 1)
+
+
+def _add_vehicle_columns(conn, progress):
+    """Columns for what database.vehicle_extractor parses out of product names.
+
+    parse_confidence is NULL until a row has been parsed; editing the
+    product name clears it again so the next extraction run revisits the
+    row.
+    """
+    for column, definition in (('year_from', 'INTEGER'), ('year_to', 'INTEGER'),
+                               ('engine', 'TEXT'), ('parse_confidence', 'REAL')):
+        conn.execute(f"ALTER TABLE parts ADD COLUMN {column} {definition}")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS parts_parse_reset
+        AFTER UPDATE OF product_name ON parts BEGIN
+            UPDATE parts SET parse_confidence = NULL WHERE id = new.id;
+        END
+    ''')
+    progress("columns", 1, 1)
+
+
+def _add_vehicle_index(conn, progress):
+    create_indexes(conn, progress, [
+        ('idx_parts_vehicle', 'parts(car_name_key, model_key)'),
+    ])
+
+
+# (table, parts text column, parts id column) for each dimension
+DIMENSIONS = (('categories', 'category', 'category_id'),
+              ('makes', 'car_name', 'make_id'),
+              ('models', 'model', 'model_id'))
+
+
+def _dimension_trigger_body(row):
+    """Trigger statements that file row (new) under its dimension ids and keys"""
+    key = {column: f"{SQL_FUNCTION}({row}.{column})" for column in KEYED_COLUMNS}
+    make_id = f"(SELECT id FROM makes WHERE key = {key['car_name']})"
+    keys = ', '.join(f"{column}_key = {key[column]}" for column in KEYED_COLUMNS)
+    return f'''
+        INSERT OR IGNORE INTO categories (key, name)
+        SELECT {key['category']}, {row}.category WHERE {key['category']} != '';
+        INSERT OR IGNORE INTO makes (key, name) VALUES ({key['car_name']}, {row}.car_name);
+        INSERT OR IGNORE INTO models (make_id, key, name)
+        SELECT {make_id}, {key['model']}, {row}.model WHERE {key['model']} != '';
+        UPDATE parts SET {keys},
+            category_id = (SELECT id FROM categories WHERE key = {key['category']}),
+            make_id = {make_id},
+            model_id = (SELECT id FROM models
+                        WHERE make_id = {make_id} AND key = {key['model']})
+        WHERE id = {row}.id;
+    '''
+
+
+def _add_dimension_tables(conn, progress):
+    """Move category, make and model into small tables referenced by id.
+
+    Each dimension row is one normalized key with one display name, so
+    spellings that differ only in case, niqqud or punctuation collapse
+    into a single category, make or model (under its make). The name
+    kept is the most common spelling. A part whose category or model has
+    an empty key (e.g. the "-" placeholder) gets no id for it; makes keep
+    their empty-key row as the parent of models of an unknown make.
+
+    parts keeps its text columns as the write interface: triggers file
+    every insert and text edit under the matching ids (adding dimension
+    rows as needed) and also take over the key updates from the v5
+    triggers. parts_view shows each part's own text, so an edit that only
+    changes case or punctuation reads back as typed; the ids serve
+    filters, vehicle lookups and the dimension name lists.
+
+    Runs online: the triggers are in place before existing rows are
+    filled in batches.
+    """
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS makes (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS models (
+                id INTEGER PRIMARY KEY,
+                make_id INTEGER NOT NULL REFERENCES makes(id),
+                key TEXT NOT NULL,
+                name TEXT NOT NULL,
+                UNIQUE (make_id, key)
+            )
+        ''')
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(parts)")}
+        for table, _, id_column in DIMENSIONS:
+            if id_column not in existing:
+                conn.execute(
+                    f"ALTER TABLE parts ADD COLUMN {id_column} INTEGER REFERENCES {table}(id)")
+
+        conn.execute("DROP TRIGGER IF EXISTS parts_keys_insert")
+        conn.execute("DROP TRIGGER IF EXISTS parts_keys_update")
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_dimensions_insert AFTER INSERT ON parts BEGIN
+                {_dimension_trigger_body('new')}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS parts_dimensions_update
+            AFTER UPDATE OF {', '.join(KEYED_COLUMNS)} ON parts BEGIN
+                {_dimension_trigger_body('new')}
+            END
+        ''')
+    progress("tables", 1, 3)
+
+    # Most common spelling first, so INSERT OR IGNORE keeps it as the name
+    with conn:
+        conn.execute('''
+            INSERT OR IGNORE INTO categories (key, name)
+            SELECT category_key, category FROM parts WHERE category_key != ''
+            GROUP BY category_key, category ORDER BY COUNT(*) DESC
+        ''')
+        conn.execute('''
+            INSERT OR IGNORE INTO makes (key, name)
+            SELECT car_name_key, car_name FROM parts
+            GROUP BY car_name_key, car_name ORDER BY COUNT(*) DESC
+        ''')
+        conn.execute('''
+            INSERT OR IGNORE INTO models (make_id, key, name)
+            SELECT makes.id, parts.model_key, parts.model
+            FROM parts JOIN makes ON makes.key = parts.car_name_key
+            WHERE parts.model_key != ''
+            GROUP BY makes.id, parts.model_key, parts.model ORDER BY COUNT(*) DESC
+        ''')
+    progress("dimension values", 2, 3)
+
+    run_in_batches(conn, '''
+        UPDATE parts SET
+            category_id = (SELECT id FROM categories WHERE key = parts.category_key),
+            make_id = (SELECT id FROM makes WHERE key = parts.car_name_key),
+            model_id = (SELECT models.id FROM models JOIN makes ON makes.id = models.make_id
+                        WHERE makes.key = parts.car_name_key AND models.key = parts.model_key)
+        WHERE id BETWEEN :lo AND :hi AND category_id IS NULL
+    ''', progress, "dimension ids")
+
+    with conn:
+        for name, definition in [
+            ('idx_parts_category_id', 'parts(category_id)'),
+            ('idx_parts_make_model', 'parts(make_id, model_id)'),
+            ('idx_parts_model_id', 'parts(model_id)'),
+            ('idx_models_key', 'models(key)'),
+        ]:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        # Filters and vehicle lookups now go through the ids
+        for name in ('idx_parts_category', 'idx_parts_car_name', 'idx_parts_model',
+                     'idx_parts_category_key', 'idx_parts_vehicle'):
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute("DROP VIEW IF EXISTS parts_view")
+        conn.execute('''
+            CREATE VIEW parts_view AS
+            SELECT id, category, car_name, model, product_name, quantity, price, last_updated,
+                   change_seq, year_from, year_to, engine, parse_confidence,
+                   category_id, make_id, model_id,
+                   category_key, car_name_key, model_key, product_name_key
+            FROM parts
+        ''')
+    progress("indexes", 3, 3)
+
+
+MIGRATIONS = [
+    Migration(1, "index last_updated and product_name", _add_lookup_indexes),
+    Migration(2, "index category, car_name and model", _add_filter_indexes),
+    Migration(3, "change tracking and delete tombstones", _add_change_tracking),
+    Migration(4, "index price and quantity", _add_range_indexes),
+    Migration(5, "normalized search keys", _add_search_keys, batched=True),
+    Migration(6, "parsed vehicle columns", _add_vehicle_columns),
+    Migration(7, "index car and model keys", _add_vehicle_index),
+    Migration(8, "category, make and model dimension tables", _add_dimension_tables,
+              batched=True),
+]
+
+
+def _print_progress(message, done, total):
+    print(f"  {message}: {done}/{total}")
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def migrate(conn, progress=None):
+    """Apply every migration newer than the file's user_version.
+
+    progress(message, done, total) is called as each migration advances.
+    Returns the list of versions applied.
+    """
+    progress = progress or (lambda message, done, total: None)
+    applied = []
+    version = current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        label = f"v{migration.version} {migration.description}"
+        progress(label, 0, 1)
+
+        def report(message, done, total, label=label):
+            progress(f"{label}: {message}", done, total)
+
+        if migration.batched:
+            migration.apply(conn, report)
+            with conn:
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+        else:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                migration.apply(conn, report)
+                conn.execute(f"PRAGMA user_version = {migration.version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        version = migration.version
+        applied.append(version)
+        progress(label, 1, 1)
+    return applied
+
+
+def main(argv=None):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from database.car_parts_db import CarPartsDB
+
+    parser = argparse.ArgumentParser(description="Upgrade a parts database in place")
+    parser.add_argument("--db", type=Path, default=None, help="database file (default: car_parts.db)")
+    args = parser.parse_args(argv)
+
+    # CarPartsDB migrates on connect; report each step as it goes
+    db = CarPartsDB(args.db, migration_progress=_print_progress)
+    version = current_version(db.connections.get())
+    db.close_connection()
+    print(f"Schema is at version {version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
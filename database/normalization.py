@@ -0,0 +1,49 @@
+"""Canonical search keys for Hebrew and Latin product text.
+
+normalize_key() is the single definition of "the same text" for search:
+the database stores its output in the *_key shadow columns (and indexes
+them, including in parts_fts), and every in-memory index and query path
+runs typed text through it before comparing. Keys compare equal when the
+text differs only in:
+
+* niqqud, cantillation marks and Latin accents (dropped)
+* final letter forms: ך ם ן ף ץ become כ מ נ פ צ
+* geresh, gershayim and quote marks (dropped, so צ'יפ is ציפ and
+  ש"ח is שח)
+* case, punctuation and runs of whitespace (punctuation becomes a
+  space; a dot between two digits, as in 1.6, is kept)
+
+The SQLite triggers call this through the search_key() SQL function that
+CarPartsDB registers on every connection. Changing the rules changes the
+stored keys, so it needs a migration that recomputes them and rebuilds
+parts_fts.
+"""
+import re
+import unicodedata
+
+SQL_FUNCTION = "search_key"
+
+# Final letter forms and the regular letters they stand for
+_FINAL_LETTERS = (("ך", "כ"), ("ם", "מ"), ("ן", "נ"), ("ף", "פ"), ("ץ", "צ"))
+# Combining marks: Latin accents, Hebrew cantillation and niqqud (not the
+# maqaf, paseq and sof pasuq punctuation, which separate words)
+_MARKS = re.compile('[\u0300-\u036f\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7]+')
+# Geresh, gershayim and the ASCII and typographic quotes typed in their place
+_QUOTES = re.compile('[\'"`\u00b4\u05f3\u05f4\u2018\u2019\u201c\u201d]+')
+# Runs of letters and digits; a dot followed by a digit stays inside a
+# word when a digit precedes it (1.6, 2.0L). Everything else separates words.
+_WORDS = re.compile(r'[^\W_]+(?:(?<=\d)\.\d[^\W_]*)*')
+
+
+def normalize_key(text):
+    """Return the canonical search key of text ("" for None)"""
+    if not text:
+        return ""
+    text = str(text).lower()
+    if not text.isascii():
+        # NFKD splits precomposed forms (é, presentation forms such as שׁ)
+        # into a base letter plus marks
+        text = _MARKS.sub("", unicodedata.normalize('NFKD', text))
+        for final, regular in _FINAL_LETTERS:
+            text = text.replace(final, regular)
+    return " ".join(_WORDS.findall(_QUOTES.sub("", text)))
@@ -33,7 +33,12 @@ class SettingsDB:
             ('default_currency', 'ILS'),
             ('auto_restock', 'true'),
             ('primary_color', '#2980b9'),
-            ('secondary_color', '#3498db')
+            ('secondary_color', '#3498db'),
+            ('wal_mode', 'false'),
+            # How FilterDialog criteria run: 'memory' or 'sql'
+            ('filter_mode', 'memory'),
+            # Build the views not opened yet while the app is idle after startup
+            ('prewarm_views', 'true')
         ]
 
         self.conn.executemany(
@@ -0,0 +1,143 @@
+"""Abbreviation and synonym groups for part search.
+
+Groups come from resources/search_synonyms.txt (one group per line, the
+catalog's own spelling first, alternatives separated by "|"). Every
+phrase is normalized with normalize_key and compiled into a table keyed
+by its first word, so finding the phrases in a text is one dict lookup
+per word plus a comparison of the few phrases starting with that word.
+
+The same table is used at both ends of a search:
+
+* index time: expansions() gives the canonical spelling of every
+  alternative found in a row, which the in-memory indexes store next to
+  the row's own text
+* query time: canonicalize() rewrites alternatives in the query to the
+  canonical spelling, and variants() lists every spelling of each phrase
+  for building an FTS query
+"""
+from pathlib import Path
+
+from database.normalization import normalize_key
+
+DEFAULT_SYNONYMS_PATH = Path(__file__).resolve().parent.parent / "resources" / "search_synonyms.txt"
+
+
+class SynonymTable:
+    """Compiled synonym groups; see the module docstring"""
+
+    def __init__(self, groups=()):
+        # phrase words -> index of its group in self.groups
+        self._group_of = {}
+        # first word -> phrase word tuples starting with it, longest first
+        self._by_first = {}
+        self.groups = []
+        for group in groups:
+            self.add_group(group)
+
+    @classmethod
+    def load(cls, path=DEFAULT_SYNONYMS_PATH, encoding='utf-8'):
+        """Read a synonyms file; a missing file gives an empty table"""
+        table = cls()
+        try:
+            with open(path, 'r', encoding=encoding) as file:
+                for line in file:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        table.add_group(line.split('|'))
+        except OSError as e:
+            print(f"Error loading search synonyms: {e}")
+        return table
+
+    def __len__(self):
+        return len(self.groups)
+
+    def add_group(self, phrases):
+        """Add phrases meaning the same thing; the first is the canonical spelling"""
+        keys = [key for key in dict.fromkeys(normalize_key(p) for p in phrases) if key]
+        keys = [key for key in keys if tuple(key.split()) not in self._group_of]
+        if len(keys) < 2:
+            return
+        index = len(self.groups)
+        self.groups.append(keys)
+        for key in keys:
+            words = tuple(key.split())
+            self._group_of[words] = index
+            phrases = self._by_first.setdefault(words[0], [])
+            phrases.append(words)
+            phrases.sort(key=len, reverse=True)
+
+    def _matches(self, words):
+        """Yield (start, end, group index) for phrases in a word list, longest match first"""
+        by_first = self._by_first
+        i = 0
+        while i < len(words):
+            for phrase in by_first.get(words[i], ()):
+                if tuple(words[i:i + len(phrase)]) == phrase:
+                    yield i, i + len(phrase), self._group_of[phrase]
+                    i += len(phrase)
+                    break
+            else:
+                i += 1
+
+    def expansions(self, key):
+        """Canonical spellings of the alternatives found in a normalized key"""
+        if not self._by_first:
+            return []
+        words = key.split()
+        found = []
+        for start, end, group in self._matches(words):
+            canonical = self.groups[group][0]
+            if " ".join(words[start:end]) != canonical and canonical not in found:
+                found.append(canonical)
+        return found
+
+    def canonicalize(self, key):
+        """Rewrite every phrase of a normalized key to its canonical spelling"""
+        if not self._by_first:
+            return key
+        words = key.split()
+        out = []
+        last = 0
+        for start, end, group in self._matches(words):
+            out.extend(words[last:start])
+            out.append(self.groups[group][0])
+            last = end
+        out.extend(words[last:])
+        return " ".join(out)
+
+    def variants(self, key):
+        """Split a normalized key into a list of alternatives per phrase.
+
+        Words outside any group come back as one-item lists, so
+        "פילטר אויר 1.6" gives [["פ אויר", "פילטר אויר", ...], ["1.6"]].
+        """
+        words = key.split()
+        parts = []
+        last = 0
+        for start, end, group in self._matches(words):
+            parts.extend([word] for word in words[last:start])
+            parts.append(list(self.groups[group]))
+            last = end
+        parts.extend([word] for word in words[last:])
+        return parts
+
+
+_default_table = None
+
+
+def default_synonyms():
+    """The table loaded from DEFAULT_SYNONYMS_PATH, read on first use"""
+    global _default_table
+    if _default_table is None:
+        _default_table = SynonymTable.load()
+    return _default_table
+
+
+def set_default_synonyms(table):
+    """Replace the shared table, e.g. after the synonyms file was edited.
+
+    Indexes built before the call keep the expansions they were built with
+    until they are rebuilt.
+    """
+    global _default_table
+    _default_table = table
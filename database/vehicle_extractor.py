@@ -0,0 +1,367 @@
+"""Parse car, model, year range and engine out of product names.
+
+The seed catalog packs vehicle data into product_name ("09-12 פ.גיר מזדה 3",
+"1.2 CBZ ח.קראנק", "1.4 מ15 SX4 פ.אויר") and stores "-" in car_name and
+model. This fills car_name and model where they are still "-", and
+year_from, year_to, engine and parse_confidence on every row parsed.
+Parsing runs in worker processes; the main process reads the table in id
+order and writes the results back one batch per transaction.
+
+Usage from the project root:
+
+    python -m database.vehicle_extractor
+    python -m database.vehicle_extractor --all --workers 4
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from database.car_parts_db import CarPartsDB
+from database.normalization import normalize_key
+
+DEFAULT_VEHICLES_PATH = Path(__file__).resolve().parent.parent / "resources" / "vehicle_models.txt"
+# Two-digit years below this are 20xx, the rest 19xx
+CENTURY_PIVOT = 50
+# Values written to car_name and model that mean "unknown"
+UNKNOWN_TEXT = ('', '-')
+
+# "09-12": a year range
+_YEAR_RANGE = re.compile(r'(?<![\w.])(\d{2})-(\d{2})(?![\w.])')
+# "מ04": from 2004
+_YEAR_FROM = re.compile(r'(?<!\w)מ(\d{2})(?!\w)')
+# "עד 12", "עד12": up to 2012
+_YEAR_TO = re.compile(r'(?<!\w)עד ?(\d{2})(?!\w)')
+# "1.4": engine displacement in litres
+_DISPLACEMENT = re.compile(r'(?<![\w.])(\d\.\d)(?![\w.])')
+# "CBZ": a three-letter engine code
+_ENGINE_CODE = re.compile(r'(?<![\w.])([A-Z]{3})(?![\w.])')
+
+
+def full_year(two_digits):
+    value = int(two_digits)
+    return 2000 + value if value < CENTURY_PIVOT else 1900 + value
+
+
+class VehicleParser:
+    """Recognizes makes, models, years and engines in one product name.
+
+    Makes and models come from a vocabulary file (see
+    resources/vehicle_models.txt). Their spellings are normalized and
+    matched on whole words, longest phrase first.
+
+    parse() returns a ParseResult whose confidence is the mean of
+    per-field scores: a model with its make named 1.0, a model whose make
+    is inferred 0.8, a make alone 0.7; a year range or "from" year 0.9,
+    an "up to" year 0.8; a displacement 0.9, an engine code alone 0.6.
+    Names that mention more than one vehicle ("פולו + איביזה") keep the
+    first and have their vehicle score scaled by 0.6. A name with
+    nothing recognizable scores 0.
+    """
+
+    def __init__(self, vocabulary=()):
+        self.makes = []
+        # model spelling -> canonical model text, per make index
+        self._models = []
+        # first word -> [(words, kind, make index, canonical text)], longest first
+        self._phrases = {}
+        self._model_words = set()
+        for make_spellings, models in vocabulary:
+            self.add_make(make_spellings, models)
+
+    @classmethod
+    def load(cls, path=DEFAULT_VEHICLES_PATH, encoding='utf-8'):
+        """Read a vocabulary file (make spellings : models)"""
+        vocabulary = []
+        with open(path, 'r', encoding=encoding) as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                makes, _, models = line.partition(':')
+                vocabulary.append((
+                    [m.strip() for m in makes.split('|') if m.strip()],
+                    [[s.strip() for s in model.split('/') if s.strip()]
+                     for model in models.split(',') if model.strip()],
+                ))
+        return cls(vocabulary)
+
+    def add_make(self, spellings, models):
+        """Add a make (its spellings, first is canonical) and its models.
+
+        models is a list of spelling lists, again canonical first.
+        """
+        index = len(self.makes)
+        self.makes.append(spellings[0])
+        for spelling in spellings:
+            self._add_phrase(spelling, 'make', index, spellings[0])
+        for model_spellings in models:
+            for spelling in model_spellings:
+                self._add_phrase(spelling, 'model', index, model_spellings[0])
+                self._model_words.update(spelling.upper().split())
+
+    def _add_phrase(self, spelling, kind, make, canonical):
+        words = tuple(normalize_key(spelling).split())
+        if not words:
+            return
+        phrases = self._phrases.setdefault(words[0], [])
+        phrases.append((words, kind, make, canonical))
+        phrases.sort(key=lambda phrase: len(phrase[0]), reverse=True)
+
+    def _vehicle_matches(self, words):
+        """Yield (start, end, kind, make, canonical) for every phrase, left to right.
+
+        A phrase may name a model of several makes, so one span can yield
+        several model matches.
+        """
+        i = 0
+        while i < len(words):
+            matched = None
+            for phrase, kind, make, canonical in self._phrases.get(words[i], ()):
+                if matched is not None and len(phrase) < matched:
+                    break
+                if tuple(words[i:i + len(phrase)]) == phrase:
+                    matched = len(phrase)
+                    yield i, i + len(phrase), kind, make, canonical
+            i += matched or 1
+
+    def _vehicles(self, key):
+        """Return [(make index, model or None, score)] in the order they appear"""
+        words = key.split()
+        vehicles = []
+        last_make = None  # (make index, end position)
+        spans = {}
+        for start, end, kind, make, canonical in self._vehicle_matches(words):
+            spans.setdefault((start, end), []).append((kind, make, canonical))
+        for (start, end), found in spans.items():
+            makes = [make for kind, make, _ in found if kind == 'make']
+            if makes:
+                last_make = (makes[0], end)
+                vehicles.append([makes[0], None, 0.7])
+                continue
+            after_make = last_make is not None and last_make[1] == start
+            candidates = [(make, model) for _, make, model in found
+                          if after_make or not model.isdigit()]
+            if not candidates:
+                continue
+            named = [c for c in candidates if last_make and c[0] == last_make[0]]
+            if named:
+                make, model = named[0]
+                if vehicles and vehicles[-1][0] == make and vehicles[-1][1] is None:
+                    vehicles[-1] = [make, model, 1.0]
+                    continue
+                vehicles.append([make, model, 1.0])
+            elif len({make for make, _ in candidates}) == 1:
+                vehicles.append([candidates[0][0], candidates[0][1], 0.8])
+        return vehicles
+
+    def parse(self, name):
+        result = ParseResult()
+        if not name:
+            return result
+        scores = []
+
+        vehicles = self._vehicles(normalize_key(name))
+        if vehicles:
+            make, model, score = vehicles[0]
+            result.car_name = self.makes[make]
+            result.model = model
+            if len({(v[0], v[1]) for v in vehicles}) > 1:
+                score *= 0.6
+            scores.append(score)
+
+        match = _YEAR_RANGE.search(name)
+        if match and int(match.group(1)) <= int(match.group(2)):
+            result.year_from, result.year_to = full_year(match.group(1)), full_year(match.group(2))
+            scores.append(0.9)
+        else:
+            year_from = _YEAR_FROM.search(name)
+            year_to = _YEAR_TO.search(name)
+            if year_from:
+                result.year_from = full_year(year_from.group(1))
+                scores.append(0.9)
+            if year_to:
+                result.year_to = full_year(year_to.group(1))
+                scores.append(0.8)
+
+        engine = []
+        displacement = next((m.group(1) for m in _DISPLACEMENT.finditer(name)
+                             if 0.6 <= float(m.group(1)) <= 7.0), None)
+        if displacement:
+            engine.append(displacement)
+        code = next((m.group(1) for m in _ENGINE_CODE.finditer(name)
+                     if m.group(1) not in self._model_words), None)
+        if code:
+            engine.append(code)
+        if engine:
+            result.engine = " ".join(engine)
+            scores.append(0.9 if displacement else 0.6)
+
+        result.confidence = round(sum(scores) / len(scores), 2) if scores else 0.0
+        return result
+
+
+class ParseResult:
+    """What VehicleParser found in one name; unknown fields are None"""
+
+    __slots__ = ('car_name', 'model', 'year_from', 'year_to', 'engine', 'confidence')
+
+    def __init__(self):
+        self.car_name = None
+        self.model = None
+        self.year_from = None
+        self.year_to = None
+        self.engine = None
+        self.confidence = 0.0
+
+
+# --- Worker processes -----------------------------------------------------
+
+_parser = None
+
+
+def _init_worker(vocabulary_path):
+    global _parser
+    _parser = VehicleParser.load(vocabulary_path)
+
+
+def _parse_batch(rows):
+    """Parse (id, product_name, car_name, model) rows in a worker.
+
+    Returns (field updates, vehicle updates) ready for executemany: field
+    updates for every row, vehicle updates only where car_name or model is
+    still unknown and the parser found one.
+    """
+    fields, vehicles = [], []
+    for part_id, name, car_name, model in rows:
+        result = _parser.parse(name)
+        fields.append((result.year_from, result.year_to, result.engine,
+                       result.confidence, part_id))
+        new_car = result.car_name if car_name in UNKNOWN_TEXT and result.car_name else car_name
+        new_model = result.model if model in UNKNOWN_TEXT and result.model else model
+        if (new_car, new_model) != (car_name, model):
+            vehicles.append((new_car, new_model, part_id))
+    return fields, vehicles
+
+
+class ExtractionReport:
+    """Running totals for an extraction, passed to the progress callback after each batch"""
+
+    def __init__(self):
+        self.read = 0
+        self.parsed = 0
+        self.vehicles = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.read} rows read, {self.parsed} with vehicle data, "
+                f"{self.vehicles} car/model filled in {self.seconds:.2f}s "
+                f"({self.rows_per_second:,.0f} rows/s)")
+
+
+class VehicleExtractor:
+    """Runs VehicleParser over the parts table and stores the results.
+
+    Only rows never parsed (parse_confidence IS NULL) are read unless
+    reparse is set. Rows are read in id order batch_size at a time, parsed
+    by a pool of worker processes and written back in one transaction per
+    batch.
+    """
+
+    def __init__(self, db, workers=None, batch_size=5000, reparse=False,
+                 vocabulary_path=DEFAULT_VEHICLES_PATH, progress=None):
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.reparse = reparse
+        self.vocabulary_path = vocabulary_path
+        self.progress = progress
+
+    def _batches(self):
+        pending = "" if self.reparse else "AND parse_confidence IS NULL"
+        last_id = 0
+        try:
+            while True:
+                rows = self.db.execute_query(f'''
+                    SELECT id, product_name, car_name, model FROM parts
+                    WHERE id > ? {pending}
+                    ORDER BY id LIMIT ?
+                ''', (last_id, self.batch_size)).fetchall()
+                if not rows:
+                    return
+                last_id = rows[-1][0]
+                yield rows
+        finally:
+            # The pool reads batches on its own thread
+            self.db.release_thread_connection()
+
+    def run(self):
+        report = ExtractionReport()
+        if self.workers > 1:
+            with Pool(self.workers, initializer=_init_worker,
+                      initargs=(self.vocabulary_path,)) as pool:
+                for result in pool.imap(_parse_batch, self._batches()):
+                    self._write(result, report)
+        else:
+            _init_worker(self.vocabulary_path)
+            for rows in self._batches():
+                self._write(_parse_batch(rows), report)
+        report.seconds = time.perf_counter() - report.started
+        return report
+
+    def _write(self, result, report):
+        fields, vehicles = result
+
+        def write(conn):
+            conn.executemany('''
+                UPDATE parts SET year_from = ?, year_to = ?, engine = ?, parse_confidence = ?
+                WHERE id = ?
+            ''', fields)
+            if vehicles:
+                conn.executemany("UPDATE parts SET car_name = ?, model = ? WHERE id = ?",
+                                 vehicles)
+
+        self.db.run_write(write)
+        report.read += len(fields)
+        report.parsed += sum(1 for row in fields if row[3] > 0)
+        report.vehicles += len(vehicles)
+        report.seconds = time.perf_counter() - report.started
+        if self.progress:
+            self.progress(report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fill car, model, years and engine from product names")
+    parser.add_argument("--all", action="store_true", help="reparse rows parsed before")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parser processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--vehicles", type=Path, default=DEFAULT_VEHICLES_PATH,
+                        help="make/model vocabulary file")
+    parser.add_argument("--db", type=Path, default=None, help="database file (default: car_parts.db)")
+    args = parser.parse_args(argv)
+
+    db = CarPartsDB(args.db)
+    extractor = VehicleExtractor(
+        db, workers=args.workers, batch_size=args.batch_size, reparse=args.all,
+        vocabulary_path=args.vehicles,
+        progress=lambda report: print(f"  {report}", flush=True))
+    try:
+        report = extractor.run()
+    finally:
+        db.close_connection()
+    print(f"Done: {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Single writer thread that commits queued writes in batches.
+
+    Callers submit a function taking a sqlite3 connection and get a Future
+    for its return value. The writer thread never waits for more work: it
+    takes everything already queued (up to ``max_batch`` items) and runs it
+    inside one transaction. A lone edit commits straight away, while writes
+    that pile up during a commit share the next one, so a burst of edits
+    costs a handful of commits/fsyncs instead of one per edit. Each write runs under its own savepoint: a failing write
+    is rolled back and reported on its Future without affecting the rest
+    of the batch. Write functions must not commit themselves.
+    """
+
+    def __init__(self, connections, max_batch=500):
+        self.connections = connections
+        self.max_batch = max_batch
+        self.commits = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="CarPartsDB-writer",
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self, write):
+        """Queue write(conn) and return a Future with its result"""
+        future = Future()
+        if not self._thread.is_alive():
+            future.set_exception(RuntimeError("Write queue is closed"))
+            return future
+        self._queue.put((write, future))
+        return future
+
+    def close(self, timeout=5.0):
+        """Commit whatever is queued, then stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _next_batch(self):
+        """Block for the first write, then take whatever else is already queued"""
+        batch = [self._queue.get()]
+        while batch[-1] is not _STOP and len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = self.connections.get()
+        # Transactions are managed explicitly below
+        conn.isolation_level = None
+        try:
+            while True:
+                batch = self._next_batch()
+                stop = batch[-1] is _STOP
+                writes = [item for item in batch if item is not _STOP]
+                if writes:
+                    self._commit_batch(conn, writes)
+                if stop:
+                    break
+        finally:
+            self.connections.close_thread()
+
+    def _commit_batch(self, conn, writes):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for write, future in writes:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT queued_write")
+                try:
+                    results.append((future, write(conn), None))
+                    conn.execute("RELEASE queued_write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO queued_write")
+                    conn.execute("RELEASE queued_write")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+            self.commits += 1
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for write, future in writes:
+                if not future.done():
+                    if not future.running():
+                        future.set_running_or_notify_cancel()
+                    future.set_exception(e)
+            return
+
+        # Only report success once the batch is durable
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
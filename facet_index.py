@@ -0,0 +1,212 @@
+from array import array
+
+from database.car_parts_db import part_keys
+from database.normalization import normalize_key
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure Python path gives the same results
+    np = None
+
+# Row column behind each text facet
+TEXT_FACETS = {'category': 1, 'car': 2, 'model': 3}
+# Stock status values; a part with no quantity is out of stock, as in the statistics
+IN_STOCK = 'in_stock'
+OUT_OF_STOCK = 'out_of_stock'
+FACETS = tuple(TEXT_FACETS) + ('stock',)
+# Code of a removed row's slot; it is in no bitmap
+REMOVED = -1
+
+# Bit offsets set in each byte value, for turning a bitmap into positions
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+if hasattr(int, 'bit_count'):
+    def _popcount(bits):
+        return bits.bit_count()
+else:  # Python < 3.10
+    def _popcount(bits):
+        return bin(bits).count('1')
+
+
+class Facet:
+    """One facet: a bitmap of storage positions per distinct value.
+
+    Values are grouped by normalize_key and shown under the first spelling
+    seen. Bitmaps are kept as bytearrays so setting a bit is cheap while
+    rows stream in; each is turned into a Python int, which ANDs and counts
+    whole bitmaps in C, the first time a count needs it after a change.
+    """
+
+    def __init__(self):
+        self.codes = array('l')
+        self.keys = []
+        self.names = []
+        self._code_of = {}
+        # Raw value -> code, so repeated spellings skip normalize_key
+        self._code_of_value = {}
+        self._bytes = []
+        self._ints = []
+        self._counts = []
+
+    def code(self, value, key=None):
+        code = self._code_of_value.get(value)
+        if code is not None:
+            return code
+        key = normalize_key(value or "") if key is None else key
+        code = self._code_of.get(key)
+        if code is None:
+            code = len(self.keys)
+            self._code_of[key] = code
+            self.keys.append(key)
+            self.names.append(value or "")
+            self._bytes.append(bytearray())
+            self._ints.append(None)
+            self._counts.append(0)
+        self._code_of_value[value] = code
+        return code
+
+    def set(self, pos, code, on=True):
+        bits = self._bytes[code]
+        byte = pos >> 3
+        if byte >= len(bits):
+            bits.extend(bytes(max(byte + 1, 2 * len(bits)) - len(bits)))
+        if on:
+            bits[byte] |= 1 << (pos & 7)
+            self._counts[code] += 1
+        else:
+            bits[byte] &= ~(1 << (pos & 7)) & 0xff
+            self._counts[code] -= 1
+        self._ints[code] = None
+
+    def append(self, code):
+        if code != REMOVED:
+            self.set(len(self.codes), code)
+        self.codes.append(code)
+
+    def remove(self, pos):
+        code = self.codes[pos]
+        if code != REMOVED:
+            self.set(pos, code, False)
+            self.codes[pos] = REMOVED
+
+    def update(self, pos, code):
+        old = self.codes[pos]
+        if old != code:
+            self.set(pos, old, False)
+            self.set(pos, code)
+            self.codes[pos] = code
+
+    def bitmap(self, code):
+        bits = self._ints[code]
+        if bits is None:
+            bits = self._ints[code] = int.from_bytes(self._bytes[code], 'little')
+        return bits
+
+    def mask(self, keys):
+        """Bitmap of the rows having any of the given keys"""
+        mask = 0
+        for key in keys:
+            code = self._code_of.get(key)
+            if code is not None:
+                mask |= self.bitmap(code)
+        return mask
+
+    def counts(self, within=None):
+        """(key, name, count) per value, counting only rows in the within bitmap"""
+        if within is None:
+            return list(zip(self.keys, self.names, self._counts))
+        return [(key, name, _popcount(self.bitmap(code) & within) if count else 0)
+                for code, (key, name, count)
+                in enumerate(zip(self.keys, self.names, self._counts))]
+
+
+class FacetIndex:
+    """Precomputed facet counts over the product snapshot, by storage position.
+
+    Keeps one bitmap per category, car, model and stock status value, so a
+    click on a facet is a few big-integer ANDs and popcounts instead of a
+    GROUP BY over the catalog. A selection maps facet names to sets of
+    keys: values within a facet are or-ed, facets are and-ed. Each facet's
+    counts apply the selection on the other facets only, so they say how
+    many rows choosing that value (too) would give. A removed row (or a
+    None row) keeps its position in no bitmap.
+    """
+
+    def __init__(self, rows=()):
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self.facets = {facet: Facet() for facet in FACETS}
+        self._removed = 0
+        self.append(rows)
+
+    def __len__(self):
+        return len(self.facets['stock'].codes)
+
+    def append(self, rows):
+        stock = self.facets['stock']
+        for row in rows:
+            if row is None:
+                for facet in self.facets.values():
+                    facet.append(REMOVED)
+                self._removed += 1
+                continue
+            keys = part_keys(row)
+            for facet, column in TEXT_FACETS.items():
+                self.facets[facet].append(
+                    self.facets[facet].code(row[column], keys[column - 1]))
+            stock.append(stock.code(*self._stock(row)))
+
+    def update(self, pos, row):
+        keys = part_keys(row)
+        for facet, column in TEXT_FACETS.items():
+            self.facets[facet].update(pos, self.facets[facet].code(row[column], keys[column - 1]))
+        stock = self.facets['stock']
+        stock.update(pos, stock.code(*self._stock(row)))
+
+    def remove(self, pos):
+        if self.facets['stock'].codes[pos] != REMOVED:
+            for facet in self.facets.values():
+                facet.remove(pos)
+            self._removed += 1
+
+    @staticmethod
+    def _stock(row):
+        status = IN_STOCK if (row[5] or 0) > 0 else OUT_OF_STOCK
+        return status, status
+
+
+    def _selected(self, selection, skip=None):
+        """Bitmap of the rows matching the selection, or None if nothing is selected"""
+        result = None
+        for facet, keys in selection.items():
+            if facet != skip and keys:
+                mask = self.facets[facet].mask(keys)
+                result = mask if result is None else result & mask
+        return result
+
+    def counts(self, selection=None):
+        """Map each facet name to (key, name, count) tuples in first-seen order"""
+        selection = selection or {}
+        return {facet: self.facets[facet].counts(self._selected(selection, skip=facet))
+                for facet in FACETS}
+
+    def positions(self, selection):
+        """Storage positions of the rows matching the selection, ascending"""
+        mask = self._selected(selection)
+        if mask is None:
+            if not self._removed:
+                return array('l', range(len(self)))
+            stock = self.facets['stock']
+            mask = stock.mask(stock.keys)
+        data = mask.to_bytes((len(self) + 7) // 8, 'little')
+        if np is not None:
+            bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder='little')
+            return array('l', np.flatnonzero(bits).astype('l').tobytes())
+        positions = array('l')
+        for byte, value in enumerate(data):
+            if value:
+                base = byte << 3
+                positions.extend(base + bit for bit in _BYTE_BITS[value])
+        return positions
@@ -0,0 +1,201 @@
+from array import array
+from bisect import bisect_right
+
+from database.car_parts_db import part_keys
+from database.normalization import normalize_key
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure Python path gives the same results
+    np = None
+
+# Joins distinct values in a TextColumn blob; cannot occur in typed filter text
+_SEPARATOR = "\0"
+
+
+class TextColumn:
+    """Dictionary-encoded text column of normalized search keys.
+
+    Every row stores the code of its distinct raw value, and each code's
+    entry in values is that value's normalize_key. A substring filter is
+    tested once per distinct value, with a single str.find pass over all
+    of them joined together, and then mapped back to rows through the
+    codes, so repeated categories and cars cost nothing extra.
+    """
+
+    def __init__(self):
+        self.codes = array('q')
+        self.values = []
+        self._code_of = {}
+        self._blob = None
+        self._starts = None
+
+    def append(self, value, key=None):
+        self.codes.append(self._code(value, key))
+
+    def set(self, pos, value, key=None):
+        self.codes[pos] = self._code(value, key)
+
+    def _code(self, value, key=None):
+        """Code of a raw value; key is its normalize_key if already known"""
+        value = value or ""
+        code = self._code_of.get(value)
+        if code is None:
+            code = len(self.values)
+            self._code_of[value] = code
+            self.values.append(normalize_key(value) if key is None else key)
+            self._blob = None
+        return code
+
+    def matching_codes(self, text):
+        """Return a bytearray with 1 for every distinct value containing text"""
+        text = normalize_key(text)
+        flags = bytearray(len(self.values))
+        if self._blob is None:
+            self._blob = _SEPARATOR.join(self.values)
+            starts = array('q')
+            offset = 0
+            for value in self.values:
+                starts.append(offset)
+                offset += len(value) + 1
+            self._starts = starts
+        blob, starts = self._blob, self._starts
+        # Jumping from hit to hit wins while matches are rare; once they are
+        # common, testing every value in one comprehension is cheaper
+        budget = len(self.values) // 8 + 1
+        hit = blob.find(text)
+        while hit >= 0:
+            budget -= 1
+            if not budget:
+                return bytearray(text in value for value in self.values)
+            code = bisect_right(starts, hit) - 1
+            flags[code] = 1
+            if code + 1 >= len(starts):
+                break
+            # Skip the rest of this value; one hit per value is enough
+            hit = blob.find(text, starts[code + 1])
+        return flags
+
+
+class FilterEngine:
+    """Evaluates FilterDialog criteria over the product snapshot as column masks.
+
+    Holds prices and quantities as typed arrays and category and name as
+    TextColumns, one entry per storage position of the products view.
+    With NumPy installed every criterion becomes a boolean mask and the
+    masks are and-ed together; without it the same criteria narrow a
+    position list in plain Python.
+
+    Supported filter keys: category, name (substring of the normalized text),
+    min_price, max_price, min_quantity, max_quantity (inclusive; None or a
+    missing key means no limit).
+
+    A removed row (or a None row, the slot of one removed before the
+    build) keeps its position and is listed in ``removed``, which no
+    filter matches.
+    """
+
+    TEXT_FILTERS = {'category': 1, 'name': 4}
+    RANGE_FILTERS = {
+        'min_price': ('prices', False),
+        'max_price': ('prices', True),
+        'min_quantity': ('quantities', False),
+        'max_quantity': ('quantities', True),
+    }
+
+    def __init__(self, rows=()):
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self.prices = array('d')
+        self.quantities = array('q')
+        self.text = {key: TextColumn() for key in self.TEXT_FILTERS}
+        self.removed = set()
+        self._arrays = None
+        self.append(rows)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def append(self, rows):
+        for row in rows:
+            if row is None:
+                self.removed.add(len(self.prices))
+                self.prices.append(0.0)
+                self.quantities.append(0)
+                for column in self.text.values():
+                    column.append("", "")
+                continue
+            self.prices.append(float(row[6] or 0.0))
+            self.quantities.append(int(row[5] or 0))
+            keys = part_keys(row)
+            for key, column in self.TEXT_FILTERS.items():
+                self.text[key].append(row[column], keys[column - 1])
+        self._arrays = None
+
+    def update(self, pos, row):
+        self.prices[pos] = float(row[6] or 0.0)
+        self.quantities[pos] = int(row[5] or 0)
+        keys = part_keys(row)
+        for key, column in self.TEXT_FILTERS.items():
+            self.text[key].set(pos, row[column], keys[column - 1])
+        self._arrays = None
+
+    def remove(self, pos):
+        self.removed.add(pos)
+
+
+    def positions(self, filters):
+        """Storage positions of the rows matching every criterion, ascending"""
+        if np is not None:
+            return array('l', np.flatnonzero(self.mask(filters)).astype('l').tobytes())
+        return self._positions_python(filters)
+
+    def mask(self, filters):
+        """NumPy boolean mask over storage positions (requires NumPy)"""
+        if self._arrays is None:
+            self._arrays = {
+                'prices': np.frombuffer(self.prices, dtype=np.float64).copy(),
+                'quantities': np.frombuffer(self.quantities, dtype=np.int64).copy(),
+                'codes': {key: np.frombuffer(column.codes, dtype=np.int64).copy()
+                          for key, column in self.text.items()},
+            }
+        arrays = self._arrays
+        mask = np.ones(len(self), dtype=bool)
+        if self.removed:
+            mask[list(self.removed)] = False
+        for key in self.TEXT_FILTERS:
+            if filters.get(key):
+                flags = self.text[key].matching_codes(filters[key])
+                mask &= np.frombuffer(bytes(flags), dtype=bool)[arrays['codes'][key]]
+        for key, (name, is_max) in self.RANGE_FILTERS.items():
+            limit = filters.get(key)
+            if limit is not None:
+                mask &= arrays[name] <= limit if is_max else arrays[name] >= limit
+        return mask
+
+    def _positions_python(self, filters):
+        candidates = range(len(self))
+        if self.removed:
+            candidates = [pos for pos in candidates if pos not in self.removed]
+        for key in self.TEXT_FILTERS:
+            if filters.get(key):
+                column = self.text[key]
+                codes = column.codes
+                if len(candidates) < len(column.values):
+                    # Fewer rows left than distinct values: test the rows directly
+                    text = normalize_key(filters[key])
+                    values = column.values
+                    candidates = [pos for pos in candidates if text in values[codes[pos]]]
+                    continue
+                flags = column.matching_codes(filters[key])
+                candidates = [pos for pos in candidates if flags[codes[pos]]]
+        for key, (name, is_max) in self.RANGE_FILTERS.items():
+            limit = filters.get(key)
+            if limit is not None:
+                values = getattr(self, name)
+                if is_max:
+                    candidates = [pos for pos in candidates if values[pos] <= limit]
+                else:
+                    candidates = [pos for pos in candidates if values[pos] >= limit]
+        return array('l', candidates)
@@ -1,7 +1,8 @@
 import sys
+import time
 import logging
 from pathlib import Path
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtWidgets import QMainWindow, QApplication, QWidget, QVBoxLayout, \
     QStackedWidget, QMessageBox
 from PyQt5.QtGui import QIcon
@@ -18,17 +19,28 @@ from home_page import HomePageWidget
 from translator import Translator
 from database.settings_db import SettingsDB
 from database.car_parts_db import CarPartsDB
+from inventory_cache import InventoryCache
 from themes import set_theme, get_color
 
 
+# Views reachable from the home page, in the order idle prewarming builds them
+VIEW_NAMES = ('products', 'statistics', 'settings', 'help')
+
+
 class GUI(QMainWindow):
     language_changed = pyqtSignal()
+    # Emitted once the window is built and the first catalog page (or the
+    # end of an empty catalog, or a load error) has arrived
+    ready = pyqtSignal()
 
     def __init__(self):
         super().__init__()
         # Initialize databases
         self.settings_db = SettingsDB()
-        self.parts_db = CarPartsDB()
+        self.parts_db = CarPartsDB(
+            wal=self.settings_db.get_setting('wal_mode', 'false') == 'true')
+        # Single in-memory copy of the catalog that every view reads from
+        self.inventory = InventoryCache(self.parts_db, parent=self)
 
         # Load theme
         saved_theme = self.settings_db.get_setting('theme', 'classic')
@@ -44,6 +56,12 @@ class GUI(QMainWindow):
         self.preload_views()
         self.setup_ui()
         self.apply_theme()
+        # Stream the catalog in; views built later start from the snapshot
+        self.is_ready = False
+        for signal in (self.inventory.page_loaded, self.inventory.loaded,
+                       self.inventory.error):
+            signal.connect(self._on_inventory_ready)
+        QTimer.singleShot(0, self.inventory.load)
 
         # Set initial layout direction
         self._apply_layout_direction_initially()
@@ -58,11 +76,74 @@ class GUI(QMainWindow):
             self.setWindowIcon(QIcon(str(icon_path)))
 
     def preload_views(self):
-        """Initialize all view widgets"""
-        self.products_widget = ProductsWidget(self.translator, self.parts_db)
-        self.statistics_widget = StatisticsWidget(self.translator)
-        self.settings_widget = SettingsWidget(self.translator, self.update_language, self)
-        self.help_widget = HelpWidget(self.translator)
+        """Register how to build each view; a view is built on first navigation.
+
+        Views still missing once the GUI is ready are built one by one
+        while the event loop is idle, unless the prewarm_views setting is
+        'false'.
+        """
+        self._views = {}
+        self._view_factories = {
+            'products': self._create_products_widget,
+            'statistics': lambda: StatisticsWidget(self.translator, self.inventory),
+            'settings': lambda: SettingsWidget(self.translator, self.update_language, self),
+            'help': lambda: HelpWidget(self.translator),
+        }
+        self.prewarm = self.settings_db.get_setting('prewarm_views', 'true') == 'true'
+
+    def _create_products_widget(self):
+        widget = ProductsWidget(self.translator, self.parts_db, self.inventory)
+        widget.filter_mode = self.settings_db.get_setting('filter_mode', 'memory')
+        return widget
+
+    def view(self, name):
+        """Return a view, building it and adding it to the content stack on first use"""
+        widget = self._views.get(name)
+        if widget is None:
+            started = time.perf_counter()
+            widget = self._views[name] = self._view_factories[name]()
+            self.content_stack.addWidget(widget)
+            self._apply_layout_direction_recursive(
+                widget, Qt.RightToLeft if self.rtl_enabled else Qt.LeftToRight)
+            logging.debug("View '%s' built in %.0f ms",
+                          name, (time.perf_counter() - started) * 1000)
+        return widget
+
+    def prewarm_views(self):
+        """Build the next view not built yet, then yield to the event loop before the rest"""
+        pending = [name for name in VIEW_NAMES if name not in self._views]
+        if pending:
+            self.view(pending[0])
+        if len(pending) > 1:
+            QTimer.singleShot(0, self.prewarm_views)
+
+    @property
+    def products_widget(self):
+        return self.view('products')
+
+    @property
+    def statistics_widget(self):
+        return self.view('statistics')
+
+    @property
+    def settings_widget(self):
+        return self.view('settings')
+
+    @property
+    def help_widget(self):
+        return self.view('help')
+
+    def built_views(self):
+        """Views built so far; views not built yet pick up the current state when they are"""
+        return list(self._views.values())
+
+    def _on_inventory_ready(self, *args):
+        if self.is_ready:
+            return
+        self.is_ready = True
+        self.ready.emit()
+        if self.prewarm:
+            QTimer.singleShot(0, self.prewarm_views)
 
     def setup_ui(self):
         """Create and arrange all UI components"""
@@ -79,7 +160,7 @@ class GUI(QMainWindow):
         # Create main widgets
         self.home_page = HomePageWidget(self.translator, navigation_functions)
         self.header = HeaderWidget(self.translator, self.show_home)
-        self.search_bar = SearchBarWidget(self.translator, self.parts_db)
+        self.search_bar = SearchBarWidget(self.translator, self.parts_db, self.inventory)
         self.footer = FooterWidget(self.translator)
         copyright_widget = CopyrightWidget(self.translator)
 
@@ -89,10 +170,6 @@ class GUI(QMainWindow):
         # Create stacked widget for content
         self.content_stack = QStackedWidget()
         self.content_stack.addWidget(self.home_page)
-        self.content_stack.addWidget(self.products_widget)
-        self.content_stack.addWidget(self.statistics_widget)
-        self.content_stack.addWidget(self.settings_widget)
-        self.content_stack.addWidget(self.help_widget)
 
         # Main layout
         main_widget = QWidget()
@@ -214,10 +291,8 @@ class GUI(QMainWindow):
         self.search_bar.update_translations()
         self.footer.update_translations()
         self.home_page.update_translations()
-        self.products_widget.update_translations()
-        self.statistics_widget.update_translations()
-        self.settings_widget.update_translations()
-        self.help_widget.update_translations()
+        for widget in self.built_views():
+            widget.update_translations()
 
         # Force layout update
         self.updateGeometry()
@@ -227,6 +302,7 @@ class GUI(QMainWindow):
         """Handle application closing"""
         try:
             # Close database connections
+            self.inventory.stop()
             self.parts_db.close_connection()
             self.settings_db.close()
 
@@ -269,11 +345,7 @@ class GUI(QMainWindow):
                 self.search_bar,
                 self.home_page,
                 self.footer,
-                self.products_widget,
-                self.statistics_widget,
-                self.settings_widget,
-                self.help_widget
-            ]
+            ] + self.built_views()
 
             for widget in widgets_with_theme:
                 if hasattr(widget, 'apply_theme'):
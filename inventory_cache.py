@@ -0,0 +1,282 @@
+import sys
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from widgets.workers import DatabaseWorker, PagedLoadWorker, WriteNotifier
+
+# Most products kept in memory; a larger catalog keeps the most recently
+# updated rows and sets InventoryCache.truncated
+MAX_CACHED_ROWS = 500_000
+# Removed rows leave tombstones until there are this many and they make up
+# a quarter of the snapshot; then it is compacted
+COMPACT_MIN_REMOVED = 1000
+
+
+class InventoryCache(QObject):
+    """One in-memory snapshot of the parts table shared by every view.
+
+    The GUI owns a single instance. It streams the catalog in once, applies
+    edits to the database first and then to the snapshot, and reports every
+    change as a signal so views patch themselves instead of re-querying.
+    Rows keep the CarPartsDB tuple shape and the order they were loaded in;
+    views that mirror the snapshot (ProductsWidget's table model) can rely
+    on a row's index in ``products`` matching their own storage position.
+    ``_pos_by_id`` maps part ids to that index so lookups by id are O(1).
+
+    A removed row leaves None in its slot, so no other row moves and views
+    drop just that position. Once tombstones pile up the snapshot is
+    compacted and ``compacted`` tells views to reload their positions from
+    ``products``. Iterate rows() for the live rows only.
+    """
+    loading_started = pyqtSignal()
+    # Rows appended while streaming the initial load
+    page_loaded = pyqtSignal(list)
+    loaded = pyqtSignal(int)
+    rows_added = pyqtSignal(list)
+    # (old rows, new rows), same order
+    rows_updated = pyqtSignal(list, list)
+    rows_removed = pyqtSignal(list)
+    # Tombstones were dropped and positions renumbered
+    compacted = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, db, max_rows=MAX_CACHED_ROWS, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.max_rows = max_rows
+        self.products = []
+        self._pos_by_id = {}
+        self._removed = 0
+        self.is_loaded = False
+        self.truncated = False
+        self._sync_token = None
+        self._worker = None
+        # A refresh() asked for while a worker was running; runs after it
+        self._refresh_pending = False
+
+    # --- Loading -----------------------------------------------------------
+
+    def load(self):
+        """(Re)load the whole snapshot, streaming it in pages"""
+        self.stop()
+        self._refresh_pending = False
+        self.products = []
+        self._pos_by_id = {}
+        self._removed = 0
+        self.is_loaded = False
+        self.truncated = False
+        # Taken before reading so writes made during the load are picked up
+        # by the next refresh(); re-applying them is harmless
+        try:
+            self._sync_token = self.db.get_change_token()
+        except Exception as e:
+            print(f"Error reading change token: {e}")
+            self._sync_token = None
+        self.loading_started.emit()
+
+        self._worker = PagedLoadWorker(self.db)
+        self._worker.page_loaded.connect(self._on_page_loaded)
+        self._worker.finished.connect(self._on_load_finished)
+        self._worker.error.connect(self._on_worker_error)
+        self._worker.start()
+
+    def refresh(self):
+        """Fetch only what changed since the last sync; full load if there is nothing to diff.
+
+        While a load or another refresh is running, the refresh is queued
+        and runs once it ends; any number of calls meanwhile make one fetch.
+        """
+        if self._sync_token is None:
+            self.load()
+            return
+        if self.is_busy():
+            self._refresh_pending = True
+            return
+        self._refresh_pending = False
+        self._worker = DatabaseWorker(self.db, "changes", self._sync_token)
+        self._worker.finished.connect(self._on_changes)
+        self._worker.error.connect(self._on_worker_error)
+        self._worker.start()
+
+    def is_busy(self):
+        return self._worker is not None and self._worker.isRunning()
+
+    def stop(self):
+        """Stop a running load, e.g. before reloading or at shutdown.
+
+        Waits for the worker to end (a load stops after its current page)
+        so it is never dropped while still running.
+        """
+        if self.is_busy():
+            self._worker.requestInterruption()
+            self._worker.quit()
+            self._worker.wait()
+
+    def _run_pending(self):
+        """Start a refresh queued while the current worker ran"""
+        if self._refresh_pending:
+            # The worker has emitted its last signal and is about to return
+            self._worker.wait()
+            self.refresh()
+
+    def _on_worker_error(self, message):
+        if self.sender() is not self._worker:
+            return
+        self.error.emit(message)
+        self._run_pending()
+
+    def _on_page_loaded(self, page):
+        if self.sender() is not self._worker:
+            return
+        room = self.max_rows - len(self)
+        if len(page) > room:
+            page = page[:room]
+            self.truncated = True
+            self._worker.requestInterruption()
+        if not page:
+            return
+        page = [self._compact(row) for row in page]
+        for row in page:
+            self._pos_by_id[row[0]] = len(self.products)
+            self.products.append(row)
+        self.page_loaded.emit(page)
+
+    def _on_load_finished(self, count):
+        if self.sender() is not self._worker:
+            return
+        self.is_loaded = True
+        self.loaded.emit(len(self.products))
+        self._run_pending()
+
+    def _on_changes(self, changes):
+        if self.sender() is not self._worker:
+            return
+        changed, deleted, token = changes
+        try:
+            if deleted:
+                self._remove(deleted)
+            if changed:
+                self._upsert(changed)
+            self._sync_token = token
+        except Exception as e:
+            print(f"Error applying changes: {e}")
+            self.load()
+            return
+        self._run_pending()
+
+    @staticmethod
+    def _compact(row):
+        """Intern the text fields; many rows share the same category, car and model"""
+        return tuple(sys.intern(value) if isinstance(value, str) else value
+                     for value in row)
+
+    # --- Reads -------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.products) - self._removed
+
+    def rows(self):
+        """The cached rows, skipping removed slots"""
+        return (row for row in self.products if row is not None)
+
+    def get(self, part_id):
+        """Return the cached row for a part id, or None"""
+        pos = self._pos_by_id.get(part_id)
+        return None if pos is None else self.products[pos]
+
+    def position(self, part_id):
+        """Index of a part id in ``products``, or -1 if not cached"""
+        return self._pos_by_id.get(part_id, -1)
+
+    def product_names(self):
+        return [row[4] for row in self.rows()]
+
+    # --- Writes ------------------------------------------------------------
+
+    def add_part(self, **data):
+        """Insert a part; the new row arrives through rows_added"""
+        if not self.db.add_part(**data):
+            return False
+        self.refresh()
+        return True
+
+    def update_part(self, part_id, **fields):
+        """Update a part in the database, then in the snapshot.
+
+        Returns the stored row, or None if the database rejected the write.
+        """
+        if not self.db.update_part(part_id, **fields):
+            return None
+        row = self.db.get_part(part_id)
+        if row is None:
+            return None
+        self._upsert([row])
+        return self._compact(row)
+
+    def submit_update(self, part_id, **fields):
+        """Queue an update without waiting for it to commit.
+
+        Returns a WriteNotifier that is not started yet: connect to it, then
+        call start(). Its finished signal carries the stored row (None if
+        the part is gone) after the snapshot has been patched and
+        rows_updated emitted; error carries the database's message.
+        """
+        notifier = WriteNotifier(self.db.submit_update_part(part_id, **fields), self)
+        notifier.finished.connect(self._on_update_written)
+        notifier.finished.connect(notifier.deleteLater)
+        notifier.error.connect(notifier.deleteLater)
+        return notifier
+
+    def _on_update_written(self, row):
+        if row is not None:
+            self._upsert([row])
+
+    def discard(self, part_ids):
+        """Drop rows already deleted from the database (e.g. by a bulk delete)"""
+        self._remove(part_ids)
+
+    def _upsert(self, rows):
+        old_rows, new_rows, added = [], [], []
+        for row in rows:
+            row = self._compact(row)
+            i = self._pos_by_id.get(row[0])
+            if i is None:
+                if len(self) >= self.max_rows:
+                    # Full; like a load, rows past max_rows are left out
+                    self.truncated = True
+                    continue
+                self._pos_by_id[row[0]] = len(self.products)
+                self.products.append(row)
+                added.append(row)
+            else:
+                old_rows.append(self.products[i])
+                new_rows.append(row)
+                self.products[i] = row
+        if new_rows:
+            self.rows_updated.emit(old_rows, new_rows)
+        if added:
+            self.rows_added.emit(added)
+
+    def _remove(self, part_ids):
+        removed = []
+        for part_id in set(part_ids):
+            pos = self._pos_by_id.pop(part_id, None)
+            if pos is not None:
+                removed.append(self.products[pos])
+                self.products[pos] = None
+        if not removed:
+            return
+        self._removed += len(removed)
+        self.rows_removed.emit(removed)
+        if self._removed >= COMPACT_MIN_REMOVED and self._removed * 4 >= len(self.products):
+            self.compact()
+
+    def compact(self):
+        """Drop the tombstones; positions change, so views reload on ``compacted``"""
+        if not self._removed:
+            return
+        # A new list: an index worker may still be reading the old one
+        self.products = [row for row in self.products if row is not None]
+        self._pos_by_id = {row[0]: i for i, row in enumerate(self.products)}
+        self._removed = 0
+        self.compacted.emit()
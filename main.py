@@ -1,6 +1,7 @@
 import sys
+import time
 from pathlib import Path
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication
 
 from shared import SCRIPT_DIR
@@ -17,6 +18,7 @@ login_widget = None
 main_gui = None
 
 if __name__ == "__main__":
+    launched = time.perf_counter()
     QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
     app = QApplication(sys.argv)
 
@@ -49,10 +51,15 @@ if __name__ == "__main__":
 
         splash = SplashScreen()
         splash.show()
+        # Paint the splash before the main window is built
+        app.processEvents()
 
         # Pre-create the main GUI, but hide it until login is successful.
+        # Views other than the home page are built on first use.
+        started = time.perf_counter()
         main_gui = GUI()
         main_gui.hide()
+        print(f"Startup: main window built in {(time.perf_counter() - started) * 1000:.0f} ms")
 
         # Create the login widget (which now matches your GUI theme).
         login_widget = LoginWidget()
@@ -70,13 +77,15 @@ if __name__ == "__main__":
         login_widget.login_successful.connect(on_login)
 
 
-        # After the splash, show the login widget.
+        # Swap the splash for the login once the GUI reports it is ready.
         def show_login():
             splash.close()
             login_widget.show()
+            print(f"Startup: login shown {(time.perf_counter() - launched) * 1000:.0f} ms "
+                  f"after launch")
 
 
-        QTimer.singleShot(2000, show_login)
+        main_gui.ready.connect(show_login)
 
         exit_code = app.exec_()
         sys.exit(exit_code)
@@ -0,0 +1,376 @@
+import re
+import sys
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+
+from database.car_parts_db import part_keys
+from database.normalization import normalize_key
+from database.synonyms import default_synonyms
+
+# Words as the FTS5 unicode61 tokenizer sees them: runs of letters and digits
+_TOKEN = re.compile(r'\w+')
+# Everything FuzzyIndex ignores when comparing names
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+class PrefixIndex:
+    """Sorted in-memory index of product names for prefix lookups.
+
+    Names are stored as (search key, name) pairs in one sorted list, so a
+    prefix query is a binary search plus a short forward scan, and single
+    names can be added or removed without rebuilding the whole index.
+    """
+
+    def __init__(self, names=()):
+        self._entries = []
+        self.rebuild(names)
+
+    def rebuild(self, names):
+        self._entries = sorted((normalize_key(name), name) for name in names if name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, name):
+        if name:
+            insort(self._entries, (normalize_key(name), name))
+
+    def remove(self, name):
+        """Remove one occurrence of name; returns False if it was not indexed"""
+        if not name:
+            return False
+        entry = (normalize_key(name), name)
+        i = bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+            return True
+        return False
+
+    def replace(self, old_name, new_name):
+        self.remove(old_name)
+        self.add(new_name)
+
+    def suggest(self, prefix, limit=5):
+        """Return up to limit distinct names whose search key starts with prefix's"""
+        key = normalize_key(prefix)
+        if not key:
+            return []
+        results = []
+        seen = set()
+        i = bisect_left(self._entries, (key,))
+        while i < len(self._entries) and len(results) < limit:
+            entry_key, name = self._entries[i]
+            if not entry_key.startswith(key):
+                break
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+            i += 1
+        return results
+
+
+class NarrowingSearch:
+    """Substring search over the products view that narrows as the query grows.
+
+    Each storage position gets one search key (the stored keys of category,
+    car, model and name joined by spaces) built once, followed by the
+    canonical spelling of any synonym it contains. Queries are
+    canonicalized the same way, so "משאבת מים" finds "מ.מים" and back.
+    Results are cached per query in a small LRU; a query containing a
+    cached query can only match rows that query matched, so only those
+    rows are rescanned. Backspacing hits the cache directly. Any change to
+    the rows clears the cache. A removed row (or a None row, the slot of
+    one removed before the build) keeps its position with an empty key.
+    """
+
+    def __init__(self, rows=(), cache_size=16, synonyms=None):
+        self.cache_size = cache_size
+        self.synonyms = synonyms if synonyms is not None else default_synonyms()
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self._keys = []
+        self._results = OrderedDict()
+        self.append(rows)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def make_key(self, row):
+        if row is None:
+            return ""
+        key = " ".join(filter(None, part_keys(row)))
+        expansions = self.synonyms.expansions(key)
+        # A newline never occurs in a query, so no match spans the two parts
+        return "\n".join([key] + expansions) if expansions else key
+
+    def append(self, rows):
+        self._keys.extend(self.make_key(row) for row in rows)
+        self._results.clear()
+
+    def update(self, pos, row):
+        self._keys[pos] = self.make_key(row)
+        self._results.clear()
+
+    def remove(self, pos):
+        self.update(pos, None)
+
+
+    def search(self, query):
+        """Return the storage positions whose key contains query, ascending"""
+        query = self.synonyms.canonicalize(normalize_key(query))
+        cached = self._results.get(query)
+        if cached is not None:
+            self._results.move_to_end(query)
+            return cached
+
+        # Narrow from the smallest cached result whose query is part of this one
+        base = None
+        for previous, positions in self._results.items():
+            if previous in query and (base is None or len(positions) < len(base)):
+                base = positions
+        keys = self._keys
+        if base is None:
+            positions = [pos for pos, key in enumerate(keys) if query in key]
+        else:
+            positions = [pos for pos in base if query in keys[pos]]
+
+        self._results[query] = positions
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return positions
+
+
+class TokenIndex:
+    """Word-level inverted index for multi-word searches in any order.
+
+    Every word of category, car, model and product name (normalized, then
+    split like the FTS5 unicode61 tokenizer) maps to a sorted array of
+    storage positions; so do the words of the canonical spelling of any
+    synonym in the row, and queries are canonicalized before they are
+    split. A query is an AND of its words, each matched as a prefix
+    except single characters, which must match a whole word, as in
+    CarPartsDB.build_fts_query. The rarest word supplies the candidates;
+    the other words are checked against each candidate's own words, so a
+    common word like "3" never has to be materialized. A removed row (or
+    a None row) keeps its position with no words.
+    """
+
+    def __init__(self, rows=(), synonyms=None):
+        self.synonyms = synonyms if synonyms is not None else default_synonyms()
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self._postings = {}
+        self._row_tokens = []
+        self._tokens = []
+        self.append(rows)
+
+    def __len__(self):
+        return len(self._row_tokens)
+
+    @staticmethod
+    def tokenize(key):
+        return [sys.intern(token) for token in _TOKEN.findall(key)]
+
+    def _row_words(self, row):
+        if row is None:
+            return ()
+        key = " ".join(filter(None, part_keys(row)))
+        words = set(self.tokenize(key))
+        for expansion in self.synonyms.expansions(key):
+            words.update(self.tokenize(expansion))
+        return tuple(words)
+
+    def append(self, rows):
+        """Index rows stored after every position indexed so far"""
+        new_tokens = []
+        for row in rows:
+            pos = len(self._row_tokens)
+            tokens = self._row_words(row)
+            self._row_tokens.append(tokens)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array('l')
+                    new_tokens.append(token)
+                postings.append(pos)
+        if len(new_tokens) > 64:
+            self._tokens = sorted(self._postings)
+        else:
+            for token in new_tokens:
+                insort(self._tokens, token)
+
+    def update(self, pos, row):
+        """Re-index one edited row"""
+        old, new = set(self._row_tokens[pos]), set(self._row_words(row))
+        for token in old - new:
+            postings = self._postings[token]
+            del postings[bisect_left(postings, pos)]
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+        for token in new - old:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('l')
+                insort(self._tokens, token)
+            postings.insert(bisect_left(postings, pos), pos)
+        self._row_tokens[pos] = tuple(new)
+
+    def remove(self, pos):
+        """Drop a removed row's words; its position stays unused"""
+        self.update(pos, None)
+
+
+    def _matching_tokens(self, word):
+        if len(word) == 1:
+            return [word] if word in self._postings else []
+        i = bisect_left(self._tokens, word)
+        tokens = []
+        while i < len(self._tokens) and self._tokens[i].startswith(word):
+            tokens.append(self._tokens[i])
+            i += 1
+        return tokens
+
+    def search(self, query):
+        """Return the storage positions matching every word of query, ascending"""
+        words = list(dict.fromkeys(
+            self.tokenize(self.synonyms.canonicalize(normalize_key(query)))))
+        if not words:
+            return []
+        expanded = []
+        for word in words:
+            tokens = self._matching_tokens(word)
+            if not tokens:
+                return []
+            expanded.append((sum(len(self._postings[t]) for t in tokens), word, tokens))
+        expanded.sort()
+
+        _, _, tokens = expanded[0]
+        if len(tokens) == 1:
+            candidates = self._postings[tokens[0]]
+        else:
+            candidates = sorted(set().union(*(self._postings[t] for t in tokens)))
+        for _, word, tokens in expanded[1:]:
+            row_tokens = self._row_tokens
+            if len(word) == 1:
+                candidates = [pos for pos in candidates if word in row_tokens[pos]]
+            else:
+                candidates = [pos for pos in candidates
+                              if any(t.startswith(word) for t in row_tokens[pos])]
+        return list(candidates)
+
+
+class FuzzyIndex:
+    """Trigram index over normalized product names for typo-tolerant search.
+
+    Names are normalized with normalize_key and split into words; a run of
+    single letters is one word and a lone letter joins the word after it,
+    so "C.B.Z", "C B Z" and "cbz" compare alike, as do "מ.מים" and "ממים".
+    Each word is padded with two spaces in front and one behind before it
+    is cut into trigrams, so the start and end of a word count too and a
+    single typo in a short word still leaves most of its trigrams. Each
+    trigram maps to the storage positions whose name contains it. A query
+    counts shared trigrams per row, rarest trigrams first, and stops adding
+    very common ones once max_postings have been counted; the best
+    candidates are then ranked by how much of the query they cover, with
+    closeness in length breaking ties. Candidates covering less than
+    min_relative of what the best one covers are dropped. A removed row
+    (or a None row) keeps its position with no trigrams.
+    """
+
+    def __init__(self, rows=(), max_postings=60000, min_relative=0.5):
+        self.max_postings = max_postings
+        self.min_relative = min_relative
+        self.rebuild(rows)
+
+    def rebuild(self, rows):
+        self._postings = {}
+        self._keys = []
+        self.append(rows)
+
+    def __len__(self):
+        return len(self._keys)
+
+    @staticmethod
+    def normalize(text):
+        words = []
+        letters = ""
+        for word in filter(None, _NON_WORD.split(normalize_key(text))):
+            if len(word) == 1:
+                letters += word
+            elif len(letters) == 1:
+                words.append(letters + word)
+                letters = ""
+            else:
+                words.extend(filter(None, (letters, word)))
+                letters = ""
+        if letters:
+            words.append(letters)
+        return " ".join(words)
+
+    @staticmethod
+    def trigrams(key):
+        grams = set()
+        for word in key.split():
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    @classmethod
+    def _row_key(cls, row):
+        return "" if row is None else cls.normalize(part_keys(row)[3])
+    def append(self, rows):
+        postings = self._postings
+        for row in rows:
+            pos = len(self._keys)
+            key = self._row_key(row)
+            self._keys.append(key)
+            for gram in self.trigrams(key):
+                positions = postings.get(gram)
+                if positions is None:
+                    positions = postings[gram] = array('l')
+                positions.append(pos)
+
+    def update(self, pos, row):
+        old = self.trigrams(self._keys[pos])
+        key = self._row_key(row)
+        new = self.trigrams(key)
+        for gram in old - new:
+            positions = self._postings[gram]
+            del positions[bisect_left(positions, pos)]
+        for gram in new - old:
+            positions = self._postings.setdefault(gram, array('l'))
+            positions.insert(bisect_left(positions, pos), pos)
+        self._keys[pos] = key
+
+    def remove(self, pos):
+        self.update(pos, None)
+
+
+    def search(self, query, limit=50):
+        """Return up to limit storage positions similar to query, best first"""
+        grams = self.trigrams(self.normalize(query))
+        if not grams:
+            return []
+        lists = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        counts = Counter()
+        budget = self.max_postings
+        for positions in lists:
+            if budget <= 0:
+                break
+            counts.update(positions)
+            budget -= len(positions)
+
+        scored = []
+        for pos, _ in counts.most_common(limit * 10):
+            row_grams = self.trigrams(self._keys[pos])
+            shared = len(grams & row_grams)
+            scored.append((shared / len(grams), 2 * shared / (len(grams) + len(row_grams)), pos))
+        if not scored:
+            return []
+        scored.sort(reverse=True)
+        floor = scored[0][0] * self.min_relative
+        return [pos for coverage, _, pos in scored[:limit] if coverage >= floor]
@@ -0,0 +1,49 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The project is run from its root rather than installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.car_parts_db import CarPartsDB  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = CarPartsDB(tmp_path / "parts.db")
+    yield db
+    db.close_connection()
+
+
+@pytest.fixture
+def wal_db(tmp_path):
+    db = CarPartsDB(tmp_path / "parts.db", wal=True)
+    yield db
+    db.close_connection()
+
+
+def part(part_id, category, car, model, name, quantity=1, price=10.0):
+    """A part tuple shaped like the database rows, without the stored keys"""
+    return (part_id, category, car, model, name, quantity, price, "2024-01-01 00:00:00")
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def wait_until(app, condition, timeout=5.0):
+    """Process Qt events until condition() holds; False on timeout"""
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
@@ -0,0 +1,78 @@
+import threading
+
+from database.connection_manager import ConnectionManager
+
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    connections = ConnectionManager(tmp_path / "threads.db")
+    main = connections.get()
+    assert connections.get() is main
+    seen = []
+
+    def worker():
+        seen.append(connections.get())
+        connections.close_thread()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen and seen[0] is not main
+    assert connections.open_count() == 1
+    connections.close_all()
+    assert connections.open_count() == 0
+
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    connections = ConnectionManager(tmp_path / "rollback.db")
+    with connections.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    try:
+        with connections.transaction() as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("abandon")
+    except RuntimeError:
+        pass
+    assert connections.get().execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    connections.close_all()
+
+
+def test_concurrent_readers_and_writers(db):
+    writers, readers, per_thread = 4, 4, 100
+    errors = []
+
+    def write(n):
+        try:
+            for i in range(per_thread):
+                if not db.add_part("cat", "car", "model", f"w{n}-{i}", i, 1.0):
+                    errors.append(f"add failed in writer {n}")
+                part = db.get_part_by_name(f"w{n}-{i}")
+                db.update_part(part[0], quantity=part[5] + 1)
+        except Exception as e:
+            errors.append(repr(e))
+        finally:
+            db.release_thread_connection()
+
+    def read():
+        try:
+            for _ in range(per_thread):
+                db.get_all_parts()
+                db.search_parts("w1")
+        except Exception as e:
+            errors.append(repr(e))
+        finally:
+            db.release_thread_connection()
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=read) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    # The test thread plays the UI thread and keeps reading meanwhile
+    while any(t.is_alive() for t in threads):
+        db.get_all_parts()
+    for t in threads:
+        t.join()
+
+    parts = db.get_all_parts()
+    assert errors == []
+    assert len(parts) == writers * per_thread
+    assert all(p[5] == int(p[4].split("-")[1]) + 1 for p in parts)
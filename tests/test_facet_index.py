@@ -0,0 +1,47 @@
+from conftest import part
+
+from database.normalization import normalize_key
+from facet_index import IN_STOCK, OUT_OF_STOCK, FacetIndex
+
+ROWS = [
+    part(1, "מנוע", "מזדה", "3", "משאבת מים", quantity=5),
+    part(2, "בלמים", "טויוטה", "קורולה", "רפידות בלם", quantity=0),
+    part(3, "מנוע", "טויוטה", "יאריס", "טרמוסטט", quantity=2),
+]
+
+
+def counts(index, facet, selection=None):
+    return {key: count for key, _, count in index.counts(selection)[facet]}
+
+
+def test_counts_apply_the_other_facets_only():
+    index = FacetIndex(ROWS)
+    selection = {'car': {normalize_key("טויוטה")}}
+    assert counts(index, 'category', selection) == {
+        normalize_key("מנוע"): 1, normalize_key("בלמים"): 1}
+    # The car facet ignores its own selection
+    assert counts(index, 'car', selection) == {
+        normalize_key("מזדה"): 1, normalize_key("טויוטה"): 2}
+    assert counts(index, 'stock', selection) == {IN_STOCK: 1, OUT_OF_STOCK: 1}
+
+
+def test_positions_and_facets_combine():
+    index = FacetIndex(ROWS)
+    assert list(index.positions({})) == [0, 1, 2]
+    selection = {'category': {normalize_key("מנוע")}, 'stock': {IN_STOCK}}
+    assert list(index.positions(selection)) == [0, 2]
+
+
+def test_update_moves_a_row_between_values():
+    index = FacetIndex(ROWS)
+    index.update(1, part(2, "בלמים", "טויוטה", "קורולה", "רפידות בלם", quantity=4))
+    assert counts(index, 'stock') == {IN_STOCK: 3, OUT_OF_STOCK: 0}
+
+
+def test_removed_rows_leave_every_count():
+    index = FacetIndex(ROWS + [None])
+    index.remove(1)
+    assert len(index) == 4
+    assert list(index.positions({})) == [0, 2]
+    assert counts(index, 'stock') == {IN_STOCK: 2, OUT_OF_STOCK: 0}
+    assert counts(index, 'car') == {normalize_key("מזדה"): 1, normalize_key("טויוטה"): 1}
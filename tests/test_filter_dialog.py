@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+from conftest import wait_until
+
+from translator import Translator
+
+
+@pytest.fixture
+def dialogs(qapp):
+    from widgets import dialogs
+    return dialogs
+
+
+def test_preview_uses_the_given_count(dialogs, db):
+    db.add_part("Oil", "-", "-", "Filter", 1, 1.0)
+    seen = []
+    dialog = dialogs.FilterDialog(Translator(), db=db,
+                                  count=lambda filters: seen.append(filters) or 42)
+    dialog.name_edit.setText("filter")
+    dialog.update_match_count()
+    assert seen[-1]['name'] == "filter"
+    assert "42" in dialog.match_count_label.text()
+    assert not dialog._count_workers
+    dialog.done(0)
+
+
+def test_preview_counts_in_the_database_until_count_can_tell(qapp, dialogs, db):
+    db.add_part("Oil", "-", "-", "Filter", 1, 1.0)
+    db.add_part("Oil", "-", "-", "Pump", 1, 1.0)
+    dialog = dialogs.FilterDialog(Translator(), db=db, count=lambda filters: None)
+    assert wait_until(qapp, lambda: "2" in dialog.match_count_label.text())
+    dialog.done(0)
+
+
+def test_closing_keeps_a_running_count_alive_until_it_ends(qapp, dialogs, db, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+    count_parts = db.count_parts
+
+    def slow_count(filters):
+        entered.set()
+        release.wait(5)
+        return count_parts(filters)
+
+    monkeypatch.setattr(db, 'count_parts', slow_count)
+    dialog = dialogs.FilterDialog(Translator(), db=db)
+    assert entered.wait(5)
+    (worker,) = dialog._count_workers
+    dialog.done(0)
+    assert worker.isRunning() and worker in dialogs._closed_dialog_counts
+    release.set()
+    assert wait_until(qapp, lambda: worker not in dialogs._closed_dialog_counts)
+    worker.wait()
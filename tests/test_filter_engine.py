@@ -0,0 +1,69 @@
+from conftest import part
+
+import filter_engine
+from filter_engine import FilterEngine
+
+ROWS = [
+    part(1, "מנוע", "מזדה", "3", "משאבת מים", quantity=5, price=120.0),
+    part(2, "בלמים", "טויוטה", "קורולה", "רפידות בלם", quantity=0, price=80.0),
+    part(3, "מנועים", "סקודה", "פביה", "מ.מים פביה", quantity=2, price=200.0),
+    part(4, "חשמל", "-", "-", "מצבר", quantity=1, price=450.0),
+]
+
+
+def positions(engine, filters):
+    return list(engine.positions(filters))
+
+
+def test_text_filters_are_substrings_of_the_normalized_key():
+    engine = FilterEngine(ROWS)
+    assert positions(engine, {'category': "מנוע"}) == [0, 2]
+    assert positions(engine, {'name': "מים"}) == [0, 2]
+    assert positions(engine, {'name': "מ.מים"}) == [2]
+
+
+def test_range_filters_are_inclusive():
+    engine = FilterEngine(ROWS)
+    assert positions(engine, {'min_price': 120.0, 'max_price': 200.0}) == [0, 2]
+    assert positions(engine, {'max_quantity': 0}) == [1]
+    assert positions(engine, {'category': "מנוע", 'min_quantity': 3}) == [0]
+    assert positions(engine, {'min_price': None}) == [0, 1, 2, 3]
+
+
+def test_update_and_append_are_seen_by_the_next_query():
+    engine = FilterEngine(ROWS)
+    engine.update(3, part(4, "מנוע", "-", "-", "מצבר", quantity=1, price=450.0))
+    engine.append([part(5, "מנוע", "מזדה", "6", "טרמוסטט", quantity=9, price=60.0)])
+    assert positions(engine, {'category': "מנוע"}) == [0, 2, 3, 4]
+
+
+def test_python_path_matches_numpy_path(monkeypatch):
+    filters = {'category': "מנוע", 'max_price': 300.0}
+    expected = positions(FilterEngine(ROWS), filters)
+    monkeypatch.setattr(filter_engine, 'np', None)
+    assert positions(FilterEngine(ROWS), filters) == expected
+
+
+def test_removed_rows_match_no_filter(monkeypatch):
+    for numpy in (filter_engine.np, None):
+        monkeypatch.setattr(filter_engine, 'np', numpy)
+        engine = FilterEngine(ROWS[:1] + [None] + ROWS[2:])
+        engine.remove(2)
+        assert positions(engine, {}) == [0, 3]
+        assert positions(engine, {'category': "מנוע"}) == [0]
+
+
+def test_memory_and_sql_filters_return_the_same_parts(db):
+    for row in ROWS + [part(5, "מנוע", "מזדה", "6", "פ.גיר מזדה 6", quantity=3, price=90.0),
+                       part(6, "Oil", "-", "-", "Oil filter 1.6", quantity=0, price=35.5)]:
+        db.add_part(*row[1:7])
+    rows = db.get_all_parts()
+    engine = FilterEngine(rows)
+    for filters in ({'name': "זדה"}, {'name': "מים"}, {'name': "מ.מים"}, {'name': "FILTER 1.6"},
+                    {'category': "מנוע"}, {'category': "oil", 'max_quantity': 0},
+                    {'name': "מ", 'min_price': 90.0, 'max_price': 200.0}):
+        memory = {rows[pos][0] for pos in engine.positions(filters)}
+        sql = {row[0] for row in db.filter_parts(filters)}
+        assert memory == sql, filters
+        assert db.count_parts(filters) == len(memory), filters
+    assert {rows[pos][4] for pos in engine.positions({'name': "זדה"})} == {"פ.גיר מזדה 6"}
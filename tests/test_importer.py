@@ -0,0 +1,59 @@
+from database.importer import CatalogImporter, DEFAULT_TEXT
+
+
+def names(db):
+    return sorted(row[4] for row in db.get_all_parts())
+
+
+def test_import_names_inserts_one_part_per_line(db, tmp_path):
+    path = tmp_path / "names.txt"
+    path.write_text("משאבת מים\n\nפילטר  שמן \nמשאבת מים\n", encoding='utf-8')
+    report = CatalogImporter(db, batch_size=2).import_names(path)
+    assert names(db) == ["משאבת מים", "פילטר שמן"]
+    assert (report.read, report.inserted) == (4, 2)
+    part = db.get_part_by_name("פילטר שמן")
+    assert part[1:4] == (DEFAULT_TEXT, DEFAULT_TEXT, DEFAULT_TEXT)
+
+
+def test_import_csv_updates_existing_parts_by_key(db, tmp_path):
+    db.add_part("Oil", "Mazda", "3", "Filter", 1, 5.0)
+    path = tmp_path / "catalog.csv"
+    path.write_text("Description,Price,Qty\nFilter,7.5,3\nPump,\"1,200\",1\n",
+                    encoding='utf-8')
+    report = CatalogImporter(db).import_csv(
+        path, {'product_name': "Description", 'price': "Price", 'quantity': "Qty"})
+    assert (report.inserted, report.updated) == (1, 1)
+    filter_part = db.get_part_by_name("Filter")
+    assert filter_part[1:7] == ("Oil", "Mazda", "3", "Filter", 3, 7.5)
+    assert db.get_part_by_name("Pump")[6] == 1200.0
+
+
+def test_bad_rows_are_reported_and_skipped(db):
+    rows = [{'product_name': "Good", 'price': "3"},
+            {'product_name': "Bad", 'price': "abc"},
+            {'product_name': "", 'price': "4"},
+            {'product_name': "Negative", 'quantity': "-1"}]
+    report = CatalogImporter(db).import_rows(rows)
+    assert names(db) == ["Good"]
+    assert report.inserted == 1
+    assert [line for line, _ in report.errors] == [2, 3, 4]
+
+
+def test_reimport_counts_every_row_and_keeps_known_fields(db, tmp_path):
+    db.add_part("Oil", "Mazda", "3", "Filter", 1, 5.0)
+    db.add_part("Oil", "Mazda", "6", "Pump", 1, 5.0)
+    path = tmp_path / "catalog.csv"
+    path.write_text("product_name,category,car_name,model,price\n"
+                    "Filter,,,,5\n"
+                    "Pump,Water,,,9\n"
+                    "Belt,,,,2\n", encoding='utf-8')
+    importer = CatalogImporter(db)
+    report = importer.import_csv(path)
+    assert (report.read, report.inserted, report.updated, report.skipped) == (3, 1, 1, 1)
+    assert db.get_part_by_name("Filter")[1:4] == ("Oil", "Mazda", "3")
+    assert db.get_part_by_name("Pump")[1:7] == ("Water", "Mazda", "6", "Pump", 1, 9.0)
+
+    names = tmp_path / "names.txt"
+    names.write_text("Filter\nPump\nBelt\n", encoding='utf-8')
+    report = CatalogImporter(db).import_names(names)
+    assert (report.read, report.inserted, report.updated, report.skipped) == (3, 0, 0, 3)
@@ -0,0 +1,52 @@
+import inventory_cache
+from conftest import wait_until
+from inventory_cache import InventoryCache
+from widgets.product_table_model import ProductTableModel
+
+
+def loaded_inventory(qapp, db, count):
+    for i in range(count):
+        db.add_part("cat", "car", "model", f"part {i}", i, 1.0)
+    inventory = InventoryCache(db)
+    inventory.load()
+    assert wait_until(qapp, lambda: inventory.is_loaded)
+    return inventory
+
+
+def test_removed_rows_leave_tombstones_until_compaction(qapp, db, monkeypatch):
+    monkeypatch.setattr(inventory_cache, 'COMPACT_MIN_REMOVED', 3)
+    inventory = loaded_inventory(qapp, db, 10)
+    model = ProductTableModel()
+    model.load(inventory.products)
+    inventory.rows_removed.connect(lambda rows: model.remove_ids(row[0] for row in rows))
+    compactions = []
+    inventory.compacted.connect(lambda: compactions.append(len(inventory.products)))
+
+    ids = [row[0] for row in inventory.products]
+    kept = inventory.products[5]
+    inventory.discard(ids[:2])
+    assert len(inventory) == 8 and len(inventory.products) == 10
+    assert inventory.products[:2] == [None, None]
+    # No other row moved, in the cache or the model
+    assert inventory.position(kept[0]) == model.position_for_id(kept[0]) == 5
+    assert model.rowCount() == 8 and model.part_id(0) == ids[2]
+    assert compactions == []
+
+    inventory.discard(ids[2:3])
+    assert compactions == [7]
+    assert inventory.position(kept[0]) == 2
+    assert list(inventory.rows()) == inventory.products
+    inventory.stop()
+
+
+def test_model_loads_removed_slots_as_tombstones(qapp):
+    model = ProductTableModel()
+    rows = [(1, "c", "car", "m", "a", 1, 1.0, ""), None, (3, "c", "car", "m", "b", 2, 2.0, "")]
+    model.load(rows)
+    assert model.rowCount() == 2 and model.storage_size() == 2
+    assert model.position_for_id(3) == 2
+    model.sort(5)
+    model.remove_ids([1])
+    assert [model.part_id(row) for row in range(model.rowCount())] == [3]
+    model.show_all()
+    assert model.rowCount() == 1
@@ -0,0 +1,74 @@
+import sqlite3
+
+from database import migrations
+from database.car_parts_db import PART_FIELDS, CarPartsDB
+
+
+def test_fresh_database_reaches_the_latest_version(db):
+    conn = db.connections.get()
+    assert migrations.current_version(conn) == migrations.latest_version()
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(parts_view)")]
+    assert set(PART_FIELDS) <= set(columns)
+    assert migrations.migrate(conn) == []
+
+
+def test_original_database_is_upgraded_in_place(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute('''
+        CREATE TABLE parts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL, car_name TEXT NOT NULL, model TEXT NOT NULL,
+            product_name TEXT NOT NULL, quantity INTEGER DEFAULT 0,
+            price REAL DEFAULT 0.0, last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO parts (category, car_name, model, product_name, quantity, price) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [("Oil", "מזדה", "3", "שמן מנוע", 4, 30.0),
+         ("oil", "מזדה", "3", "פילטר שמן", 2, 25.0),
+         ("-", "-", "-", "מצבר", 1, 300.0)])
+    conn.commit()
+    conn.close()
+
+    steps = []
+    db = CarPartsDB(path, migration_progress=lambda *args: steps.append(args))
+    try:
+        assert migrations.current_version(db.connections.get()) == migrations.latest_version()
+        assert steps
+        parts = {row[4]: row for row in db.get_all_parts()}
+        assert parts["שמן מנוע"][1] == "Oil"
+        assert parts["פילטר שמן"][1] == "oil"
+        assert parts["שמן מנוע"][PART_FIELDS.index('product_name_key')] == "שמנ מנוע"
+        # Both spellings share one category row; the "-" placeholder has none
+        assert db.get_categories() == ["Oil"]
+        assert db.get_makes() == ["מזדה"]
+        assert db.get_models() == ["3"]
+        assert [row[4] for row in db.filter_parts({'category': "OIL"})] == [
+            "פילטר שמן", "שמן מנוע"]
+    finally:
+        db.close_connection()
+
+
+def test_edits_keep_search_keys_and_dimensions_in_step(db):
+    db.add_part("Oil", "Mazda", "3", "שמן מנוע", 1, 10.0)
+    part = db.get_part_by_name("שמן מנוע")
+    db.update_part(part[0], category="Brakes", car_name="Toyota")
+    part = db.get_part(part[0])
+    assert part[1:3] == ("Brakes", "Toyota")
+    assert part[PART_FIELDS.index('category_key')] == "brakes"
+    assert db.get_categories() == ["Brakes"]
+    assert db.get_makes() == ["Toyota"]
+
+
+def test_placeholder_text_is_never_listed_as_a_dimension(db):
+    db.add_part("-", "-", "-", "מצבר", 1, 300.0)
+    db.add_part("-", "-", "Corolla", "רפידות בלם", 2, 80.0)
+    db.add_part("Oil", "Mazda", "-", "שמן מנוע", 1, 10.0)
+    assert db.get_categories() == ["Oil"]
+    assert db.get_makes() == ["Mazda"]
+    assert db.get_models() == ["Corolla"]
+    assert db.get_models("Mazda") == []
+    # A model of an unknown make is still found by model
+    assert [row[4] for row in db.find_compatible_parts(model="corolla")] == ["רפידות בלם"]
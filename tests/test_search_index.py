@@ -0,0 +1,72 @@
+from conftest import part
+
+from database.synonyms import SynonymTable
+from search_index import FuzzyIndex, NarrowingSearch, PrefixIndex, TokenIndex
+
+ROWS = [
+    part(1, "מנוע", "מזדה", "3", "משאבת מים מזדה 3"),
+    part(2, "בלמים", "טויוטה", "קורולה", "רפידות בלם קורולה"),
+    part(3, "מנוע", "סקודה", "אוקטביה", "מ.מים אוקטביה 1.6"),
+    part(4, "חשמל", "-", "-", "C.B.Z חיישן"),
+]
+SYNONYMS = SynonymTable([["משאבת מים", "מ.מים"]])
+
+
+def test_prefix_index_suggests_by_normalized_prefix():
+    index = PrefixIndex(["משאבת מים", "משאבת דלק", "מצבר"])
+    assert index.suggest("משאבת", limit=5) == ["משאבת דלק", "משאבת מים"]
+    index.replace("מצבר", "מצמד")
+    assert index.suggest("מצ") == ["מצמד"]
+    assert not index.remove("מצבר")
+    assert len(index) == 3
+
+
+def test_narrowing_search_matches_synonyms_and_narrows():
+    search = NarrowingSearch(ROWS, synonyms=SYNONYMS)
+    assert search.search("משאבת מים") == [0, 2]
+    assert search.search("מ.מים") == [0, 2]
+    assert search.search("משאבת מים מזדה") == [0]
+    # Narrowing from the cached parent query must not lose rows after an edit
+    search.update(1, part(2, "מנוע", "טויוטה", "קורולה", "משאבת מים קורולה"))
+    assert search.search("משאבת מים") == [0, 1, 2]
+
+
+def test_token_index_matches_words_in_any_order():
+    index = TokenIndex(ROWS, synonyms=SYNONYMS)
+    assert index.search("3 מזדה") == [0]
+    assert index.search("קורו רפיד") == [1]
+    assert index.search("מים") == [0, 2]
+    assert index.search("לא קיים") == []
+    index.update(0, part(1, "מנוע", "מזדה", "6", "פילטר שמן מזדה 6"))
+    assert index.search("מים") == [2]
+    index.append([part(5, "מנוע", "מזדה", "3", "מ.מים מזדה")])
+    assert index.search("מזדה מים") == [4]
+
+
+def test_fuzzy_index_ignores_punctuation_and_ranks_closest_first():
+    index = FuzzyIndex(ROWS)
+    assert index.search("cbz")[0] == 3
+    assert index.search("רפידות בלם קורולה")[0] == 1
+    index.update(1, part(2, "בלמים", "טויוטה", "יאריס", "רפידות בלם יאריס"))
+    assert index.search("רפידות בלם יאריס")[0] == 1
+
+
+def test_fuzzy_index_finds_single_edit_typos_in_short_words():
+    rows = ROWS + [part(5, "מנוע", "מזדה", "6", "מזדה"), part(6, "בלמים", "-", "-", "קורולה")]
+    index = FuzzyIndex(rows)
+    assert index.search("קורלה")[0] == 5  # missing letter
+    assert index.search("מזדאה")[0] == 4  # extra letter
+    assert index.search("קורולע")[0] == 5  # wrong letter
+    assert index.search("ממים")[0] == 2  # "מ.מים" without the dot
+    assert index.search("קורלה")[1] == 1  # same word inside a longer name ranks next
+
+
+def test_removed_rows_keep_their_position_and_never_match():
+    rows = ROWS[:2] + [None] + ROWS[3:]
+    for index in (NarrowingSearch(rows, synonyms=SYNONYMS), TokenIndex(rows, synonyms=SYNONYMS),
+                  FuzzyIndex(rows)):
+        assert len(index) == 4
+        assert 2 not in index.search("מ.מים אוקטביה")
+        index.remove(0)
+        assert 0 not in index.search("משאבת מים מזדה")
+        assert index.search("רפידות בלם קורולה")[0] == 1
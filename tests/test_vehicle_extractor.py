@@ -0,0 +1,45 @@
+from database.vehicle_extractor import VehicleExtractor, VehicleParser
+
+VOCABULARY = [
+    (["מזדה", "mazda"], [["3"], ["6"], ["CX5"]]),
+    (["פולקסווגן", "VW"], [["פולו"], ["גולף"]]),
+    (["סיאט"], [["איביזה"]]),
+]
+
+
+def test_parser_finds_vehicle_years_and_engine():
+    parser = VehicleParser(VOCABULARY)
+    result = parser.parse("09-12 פ.גיר מזדה 3 1.6")
+    assert (result.car_name, result.model) == ("מזדה", "3")
+    assert (result.year_from, result.year_to) == (2009, 2012)
+    assert result.engine == "1.6"
+    assert result.confidence == 0.93
+
+
+def test_parser_infers_make_and_open_year_ranges():
+    parser = VehicleParser(VOCABULARY)
+    result = parser.parse("רפידות פולו מ04")
+    assert (result.car_name, result.model, result.year_from, result.year_to) == (
+        "פולקסווגן", "פולו", 2004, None)
+    # A bare number is not a model unless its make comes right before it
+    assert parser.parse("בורג 3").car_name is None
+    mixed = parser.parse("מראה פולו + איביזה עד 12")
+    assert mixed.model == "פולו" and mixed.year_to == 2012
+    assert parser.parse("").confidence == 0.0
+
+
+def test_extractor_fills_unknown_vehicles_only(db, tmp_path):
+    vocabulary = tmp_path / "vehicles.txt"
+    vocabulary.write_text("מזדה | mazda : 3, 6\nסיאט : איביזה\n", encoding='utf-8')
+    db.add_part("-", "-", "-", "פ.גיר מזדה 3 09-12", 1, 1.0)
+    db.add_part("-", "סיאט", "-", "מראה איביזה", 1, 1.0)
+    db.add_part("-", "-", "-", "בורג", 1, 1.0)
+
+    report = VehicleExtractor(db, workers=1, vocabulary_path=vocabulary).run()
+    assert (report.read, report.vehicles) == (3, 2)
+    gear = db.get_part_by_name("פ.גיר מזדה 3 09-12")
+    assert gear[2:4] == ("מזדה", "3")
+    assert db.get_part_by_name("מראה איביזה")[2:4] == ("סיאט", "איביזה")
+    assert db.find_compatible_ids("מזדה", "3", 2010) == [gear[0]]
+    # Parsed rows are not read again unless asked to
+    assert VehicleExtractor(db, workers=1, vocabulary_path=vocabulary).run().read == 0
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from conftest import wait_until
+
+
+def test_lone_write_commits_without_waiting_for_more(wal_db):
+    wal_db.add_part("cat", "car", "model", "part", 1, 1.0)
+    part_id = wal_db.get_part_by_name("part")[0]
+    started = time.perf_counter()
+    for quantity in range(20):
+        wal_db.update_part(part_id, quantity=quantity)
+    # A batching window would make every serial write wait it out
+    assert (time.perf_counter() - started) / 20 < 0.01
+    assert wal_db.get_part(part_id)[5] == 19
+
+
+def test_writes_queued_during_a_commit_share_the_next_one(wal_db):
+    wal_db.add_part("cat", "car", "model", "part", 0, 1.0)
+    part_id = wal_db.get_part_by_name("part")[0]
+    entered, release = threading.Event(), threading.Event()
+    commits = wal_db.writer.commits
+
+    def block(conn):
+        entered.set()
+        return release.wait(5)
+
+    blocker = wal_db.submit_write(block)
+    assert entered.wait(5)
+    futures = [wal_db.submit_update_part(part_id, quantity=i) for i in range(1, 51)]
+    release.set()
+    rows = [future.result(5) for future in futures]
+    assert blocker.result(5)
+    assert [row[5] for row in rows] == list(range(1, 51))
+    assert wal_db.writer.commits - commits == 2
+
+
+def test_failing_write_does_not_undo_its_batch(wal_db):
+    release = threading.Event()
+    wal_db.submit_write(lambda conn: release.wait(5))
+    good = wal_db.submit_write(lambda conn: conn.execute(
+        "INSERT INTO parts (category, car_name, model, product_name) "
+        "VALUES ('c', 'c', 'm', 'kept')").rowcount)
+    bad = wal_db.submit_write(lambda conn: conn.execute("INSERT INTO missing VALUES (1)"))
+    release.set()
+    assert good.result(5) == 1
+    assert bad.exception(5) is not None
+    assert wal_db.get_part_by_name("kept") is not None
+
+
+def test_submitted_update_patches_the_inventory(qapp, wal_db):
+    from inventory_cache import InventoryCache
+
+    wal_db.add_part("cat", "car", "model", "part", 1, 1.0)
+    inventory = InventoryCache(wal_db)
+    inventory.load()
+    assert wait_until(qapp, lambda: inventory.is_loaded)
+    part_id = inventory.products[0][0]
+    updates, stored, errors = [], [], []
+    inventory.rows_updated.connect(lambda old, new: updates.append(new[0][5]))
+
+    notifier = inventory.submit_update(part_id, quantity=7)
+    notifier.finished.connect(lambda row: stored.append((row[5], list(updates))))
+    notifier.start()
+    missing = inventory.submit_update(-1, quantity=7)
+    missing.finished.connect(stored.append)
+    missing.start()
+    failing = inventory.submit_update(part_id, no_such_column=1)
+    failing.error.connect(errors.append)
+    failing.start()
+
+    assert wait_until(qapp, lambda: len(stored) == 2 and errors)
+    # The snapshot is patched before the caller hears about the write
+    assert stored == [(7, [7]), None]
+    assert inventory.get(part_id)[5] == 7
+    inventory.stop()
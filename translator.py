@@ -65,6 +65,78 @@ TRANSLATIONS = {
         'en': 'Found {count} out of {total} products',
         'he': 'נמצאו {count} מתוך {total} מוצרים'
     },
+    'fuzzy_results': {
+        'en': 'No exact matches; showing {count} similar products',
+        'he': 'לא נמצאו התאמות מדויקות; מוצגים {count} מוצרים דומים'
+    },
+    'matching_parts': {
+        'en': '{count} matching parts',
+        'he': '{count} חלקים תואמים'
+    },
+    'counting_matches': {
+        'en': 'Counting matches...',
+        'he': 'סופר התאמות...'
+    },
+    'filter_timing': {
+        'en': '({path}, {ms:.1f} ms)',
+        'he': '({path}, {ms:.1f} מ"ש)'
+    },
+    'filter_path_memory': {
+        'en': 'in memory',
+        'he': 'בזיכרון'
+    },
+    'filter_path_sql': {
+        'en': 'database query',
+        'he': 'שאילתת מסד נתונים'
+    },
+    'compatibility_button': {
+        'en': 'Fits Vehicle',
+        'he': 'התאמה לרכב'
+    },
+    'compatibility_title': {
+        'en': 'Find Parts for a Vehicle',
+        'he': 'חיפוש חלקים לרכב'
+    },
+    'year': {
+        'en': 'Year',
+        'he': 'שנה'
+    },
+    'any_year': {
+        'en': 'Any year',
+        'he': 'כל שנה'
+    },
+    'find_parts': {
+        'en': 'Find Parts',
+        'he': 'חפש חלקים'
+    },
+    'compatible_results': {
+        'en': '{count} parts fit {vehicle} ({ms:.1f} ms)',
+        'he': '{count} חלקים מתאימים ל{vehicle} ({ms:.1f} מ"ש)'
+    },
+    'facets_title': {
+        'en': 'Browse',
+        'he': 'עיון'
+    },
+    'stock_status': {
+        'en': 'Stock',
+        'he': 'מלאי'
+    },
+    'in_stock': {
+        'en': 'In stock',
+        'he': 'במלאי'
+    },
+    'out_of_stock': {
+        'en': 'Out of stock',
+        'he': 'אזל מהמלאי'
+    },
+    'clear_facets': {
+        'en': 'Clear',
+        'he': 'נקה'
+    },
+    'facet_results': {
+        'en': 'Showing {count} of {total} products ({ms:.1f} ms)',
+        'he': 'מוצגים {count} מתוך {total} מוצרים ({ms:.1f} מ"ש)'
+    },
     'no_cell_selected': {
         'en': 'No cell selected',
         'he': 'לא נבחר תא'
@@ -230,6 +302,12 @@ TRANSLATIONS = {
         'en': "Refresh Statistics",
         'he': "רענן סטטיסטיקות"
     },
+    'stats_summary': {
+        'en': "{count} products | {units} units in stock | stock value {value:,.2f}\n"
+              "{out_of_stock} out of stock | {categories} categories",
+        'he': "{count} מוצרים | {units} יחידות במלאי | שווי מלאי {value:,.2f}\n"
+              "{out_of_stock} אזלו מהמלאי | {categories} קטגוריות"
+    },
 'invalid_number': {
         'en': "Please enter a valid number",
         'he': "אנא הזן מספר תקין"
@@ -254,6 +332,8 @@ TRANSLATIONS = {
     'window_title': {'en': "Car Parts Management", 'he': "ניהול חלקי רכב"},
     'save': {'en': "Save", 'he': "שמור"},
     'cancel': {'en': "Cancel", 'he': "בטל"},
+    'deleting_items': {'en': "Deleting {count} items...", 'he': "מוחק {count} פריטים..."},
+    'delete_cancelled': {'en': "Delete cancelled, nothing was removed", 'he': "המחיקה בוטלה, לא הוסר דבר"},
     'language_settings': {'en': "Language Settings", 'he': "הגדרות שפה"},
     'interface_language': {'en': "Interface Language", 'he': "שפת ממשק"},
     'english': {'en': "English", 'he': "אנגלית"},
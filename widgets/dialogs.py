@@ -1,5 +1,14 @@
 from shared_imports import *
 from themes import *
+from widgets.workers import CountWorker
+
+# Quiet time after the last change before FilterDialog recounts matches
+MATCH_COUNT_DEBOUNCE_MS = 250
+# CountWorkers still running after their FilterDialog closed; a running
+# QThread must not be destroyed, so each is held here until it ends
+_closed_dialog_counts = set()
+
+
 class ItemDetailsDialog(QDialog):
     def __init__(self, item_data, translator, parent=None):
         super().__init__(parent)
@@ -195,10 +204,30 @@ class AddProductDialog(QDialog):
         super().closeEvent(event)
 
 
+def dimension_combo(placeholder, names=()):
+    """Editable combo box listing known names (categories, makes, models)
+    that also accepts free text, starting empty"""
+    combo = QComboBox()
+    combo.setEditable(True)
+    combo.setInsertPolicy(QComboBox.NoInsert)
+    combo.addItems(names)
+    combo.setEditText("")
+    combo.lineEdit().setPlaceholderText(placeholder)
+    return combo
+
+
 class FilterDialog(QDialog):
-    def __init__(self, translator, parent=None):
+    def __init__(self, translator, parent=None, db=None, count=None):
         super().__init__(parent)
         self.translator = translator
+        # Live match count; needs a CarPartsDB to count against
+        self.db = db
+        # count(filters) -> number of matches, or None if it cannot tell
+        # yet. Lets the caller count the way Apply will filter (e.g. in
+        # memory); a None falls back to counting in the database.
+        self.count = count
+        self._count_request = 0
+        self._count_workers = set()
 
         # Set up the dialog with theme
         apply_dialog_theme(
@@ -232,11 +261,12 @@ class FilterDialog(QDialog):
         form_layout.setSpacing(10)
         form_layout.setContentsMargins(15, 20, 15, 15)
 
-        # Category filter
-        self.category_edit = QLineEdit()
-        self.category_edit.setPlaceholderText(self.translator.t('category_placeholder'))
+        # Category filter; typed text still matches as a substring
+        self.category_combo = dimension_combo(
+            self.translator.t('category_placeholder'),
+            self.db.get_categories() if self.db is not None else ())
         form_layout.addRow(QLabel(f"{self.translator.t('category')}:"),
-                           self.category_edit)
+                           self.category_combo)
 
         # Name filter
         self.name_edit = QLineEdit()
@@ -270,6 +300,24 @@ class FilterDialog(QDialog):
 
         layout.addWidget(form_container)
 
+        # Live preview of how many parts the current criteria match
+        self.match_count_label = QLabel()
+        self.match_count_label.setAlignment(Qt.AlignCenter)
+        self.match_count_label.setStyleSheet(f"color: {get_color('text')};")
+        layout.addWidget(self.match_count_label)
+        self.match_count_label.setVisible(self.db is not None)
+
+        self.count_timer = QTimer(self)
+        self.count_timer.setSingleShot(True)
+        self.count_timer.setInterval(MATCH_COUNT_DEBOUNCE_MS)
+        self.count_timer.timeout.connect(self.update_match_count)
+        if self.db is not None:
+            self.category_combo.editTextChanged.connect(self.schedule_match_count)
+            self.name_edit.textChanged.connect(self.schedule_match_count)
+            self.min_price.valueChanged.connect(self.schedule_match_count)
+            self.max_price.valueChanged.connect(self.schedule_match_count)
+            self.update_match_count()
+
         # Buttons with unified styling
         button_container = QWidget()
         button_layout = QHBoxLayout(button_container)
@@ -303,9 +351,57 @@ class FilterDialog(QDialog):
 
         layout.addWidget(button_container)
 
+    def schedule_match_count(self, *args):
+        """Restart the debounce; the count runs once the fields stop changing"""
+        self.match_count_label.setText(self.translator.t('counting_matches'))
+        self.count_timer.start()
+
+    def update_match_count(self):
+        """Count matches with count() or in a worker, cancelling any count still running"""
+        self._cancel_counts()
+        self._count_request += 1
+        if self.count is not None:
+            try:
+                count = self.count(self.get_filters())
+            except Exception as e:
+                print("Error counting matches:", e)
+                count = None
+            if count is not None:
+                self.on_match_count(self._count_request, count)
+                return
+        worker = CountWorker(self.db, self.get_filters(), self._count_request)
+        worker.counted.connect(self.on_match_count)
+        worker.error.connect(lambda message: print("Error counting matches:", message))
+        worker.finished.connect(lambda w=worker: self._count_workers.discard(w))
+        self._count_workers.add(worker)
+        worker.start()
+
+    def on_match_count(self, request_id, count):
+        if request_id != self._count_request:
+            return  # Criteria changed since this count started
+        self.match_count_label.setText(
+            self.translator.t('matching_parts').format(count=count))
+
+    def _cancel_counts(self):
+        for worker in self._count_workers:
+            worker.cancel()
+
+    def done(self, result):
+        self.count_timer.stop()
+        self._cancel_counts()
+        for worker in self._count_workers:
+            # Nothing reports back to the closed dialog; the worker is only
+            # kept alive until it ends
+            for signal in (worker.counted, worker.error, worker.finished):
+                signal.disconnect()
+            _closed_dialog_counts.add(worker)
+            worker.finished.connect(lambda w=worker: _closed_dialog_counts.discard(w))
+        self._count_workers = set()
+        super().done(result)
+
     def reset_filters(self):
         """Clear all filter fields"""
-        self.category_edit.clear()
+        self.category_combo.setEditText("")
         self.name_edit.clear()
         self.min_price.setValue(0)
         self.max_price.setValue(0)
@@ -313,8 +409,97 @@ class FilterDialog(QDialog):
     def get_filters(self):
         """Return the current filter values"""
         return {
-            "category": self.category_edit.text().strip(),
+            "category": self.category_combo.currentText().strip(),
             "name": self.name_edit.text().strip(),
             "min_price": self.min_price.value() if self.min_price.value() > 0 else None,
             "max_price": self.max_price.value() if self.max_price.value() > 0 else None
-        }
\ No newline at end of file
+        }
+
+class CompatibilityDialog(QDialog):
+    """Asks for a car, model and year to list the parts that fit it"""
+
+    # Earliest year offered; the spin box minimum doubles as "any year"
+    FIRST_YEAR = 1970
+
+    def __init__(self, translator, parent=None, db=None):
+        super().__init__(parent)
+        self.translator = translator
+        # Fills the make and model lists; without it they are plain text fields
+        self.db = db
+
+        apply_dialog_theme(
+            self,
+            title=self.translator.t('compatibility_title'),
+            icon_path="resources/filter_icon.png"
+        )
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+
+        title = QLabel(f"<h2>{self.translator.t('compatibility_title')}</h2>")
+        title.setStyleSheet(f"color: {get_color('text')}; font-weight: bold;")
+        layout.addWidget(title)
+
+        form_container = QGroupBox(self.translator.t('filter_criteria'))
+        form_layout = QFormLayout(form_container)
+        form_layout.setSpacing(10)
+        form_layout.setContentsMargins(15, 20, 15, 15)
+
+        self.car_combo = dimension_combo(
+            self.translator.t('car_placeholder'),
+            self.db.get_makes() if self.db is not None else ())
+        form_layout.addRow(QLabel(f"{self.translator.t('car')}:"), self.car_combo)
+
+        self.model_combo = dimension_combo(self.translator.t('model_placeholder'))
+        form_layout.addRow(QLabel(f"{self.translator.t('model')}:"), self.model_combo)
+        if self.db is not None:
+            self.car_combo.editTextChanged.connect(self.update_models)
+            self.update_models()
+
+        self.year_spin = QSpinBox()
+        self.year_spin.setRange(self.FIRST_YEAR - 1, datetime.now().year + 1)
+        self.year_spin.setSpecialValueText(self.translator.t('any_year'))
+        # Start at "any year" so parts without years are not left out unasked
+        self.year_spin.setValue(self.year_spin.minimum())
+        form_layout.addRow(QLabel(f"{self.translator.t('year')}:"), self.year_spin)
+
+        layout.addWidget(form_container)
+
+        button_container = QWidget()
+        button_layout = QHBoxLayout(button_container)
+
+        find_btn = QPushButton(self.translator.t('find_parts'))
+        find_btn.setIcon(QIcon("resources/check_icon.png"))
+        find_btn.clicked.connect(self.accept)
+        find_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {get_color('highlight')};
+                color: white;
+                border: none;
+            }}
+            QPushButton:hover {{
+                background-color: {QColor(get_color('highlight')).darker(115).name()};
+            }}
+        """)
+
+        cancel_btn = QPushButton(self.translator.t('cancel'))
+        cancel_btn.setIcon(QIcon("resources/cancel_icon.png"))
+        cancel_btn.clicked.connect(self.reject)
+
+        button_layout.addStretch()
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(find_btn)
+        layout.addWidget(button_container)
+
+    def update_models(self, *args):
+        """List the models of the chosen make (all models while none is chosen)"""
+        text = self.model_combo.currentText()
+        self.model_combo.clear()
+        self.model_combo.addItems(self.db.get_models(self.car_combo.currentText().strip()))
+        self.model_combo.setEditText(text)
+
+    def get_vehicle(self):
+        """Return (car, model, year); empty text or None means any"""
+        year = self.year_spin.value()
+        return (self.car_combo.currentText().strip(), self.model_combo.currentText().strip(),
+                None if year == self.year_spin.minimum() else year)
@@ -0,0 +1,126 @@
+from shared_imports import *
+from PyQt5.QtWidgets import QListWidgetItem
+from themes import get_color
+from facet_index import FACETS
+
+# Group title translation key per facet
+FACET_TITLES = {'category': 'category', 'car': 'car', 'model': 'model', 'stock': 'stock_status'}
+
+
+class FacetPanel(QWidget):
+    """Checkable value lists with counts for each facet of a FacetIndex.
+
+    Emits selection_changed with {facet: set of keys} whenever a value is
+    checked or unchecked; the owner answers with set_counts(). Values with
+    no matching rows are hidden unless checked.
+    """
+    selection_changed = pyqtSignal(dict)
+
+    def __init__(self, translator, parent=None):
+        super().__init__(parent)
+        self.translator = translator
+        # facet -> {key: QListWidgetItem}
+        self._items = {facet: {} for facet in FACETS}
+        self._groups = {}
+        self._lists = {}
+        self._counts = {}
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setFixedWidth(230)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
+        header = QHBoxLayout()
+        self.title_label = QLabel(f"<b>{self.translator.t('facets_title')}</b>")
+        self.title_label.setStyleSheet(f"color: {get_color('text')};")
+        header.addWidget(self.title_label)
+        header.addStretch()
+        self.clear_btn = QPushButton(self.translator.t('clear_facets'))
+        self.clear_btn.setCursor(Qt.PointingHandCursor)
+        self.clear_btn.clicked.connect(self.on_clear_clicked)
+        header.addWidget(self.clear_btn)
+        layout.addLayout(header)
+
+        for facet in FACETS:
+            group = QGroupBox(self.translator.t(FACET_TITLES[facet]))
+            group_layout = QVBoxLayout(group)
+            group_layout.setContentsMargins(5, 10, 5, 5)
+            values = QListWidget()
+            values.itemChanged.connect(self.on_item_changed)
+            group_layout.addWidget(values)
+            layout.addWidget(group, 0 if facet == 'stock' else 1)
+            self._groups[facet] = group
+            self._lists[facet] = values
+        self._lists['stock'].setFixedHeight(60)
+
+    def selection(self):
+        """Checked keys per facet, leaving out facets with nothing checked"""
+        selection = {}
+        for facet, items in self._items.items():
+            keys = {key for key, item in items.items() if item.checkState() == Qt.Checked}
+            if keys:
+                selection[facet] = keys
+        return selection
+
+    def clear_selection(self):
+        """Uncheck everything without emitting selection_changed"""
+        for facet, items in self._items.items():
+            self._lists[facet].blockSignals(True)
+            for item in items.values():
+                item.setCheckState(Qt.Unchecked)
+            self._lists[facet].blockSignals(False)
+
+    def on_clear_clicked(self):
+        if self.selection():
+            self.clear_selection()
+            self.selection_changed.emit({})
+
+    def on_item_changed(self, item):
+        self.selection_changed.emit(self.selection())
+
+    def set_counts(self, counts):
+        """Show FacetIndex.counts() output; new values are added in name order"""
+        self._counts = counts
+        for facet, entries in counts.items():
+            values = self._lists[facet]
+            items = self._items[facet]
+            values.blockSignals(True)
+            values.setUpdatesEnabled(False)
+            if any(key not in items for key, _, _ in entries):
+                self._add_items(facet, entries)
+            shown = set()
+            for key, name, count in entries:
+                item = items[key]
+                shown.add(key)
+                item.setText(f"{self._label(facet, name)} ({count})")
+                item.setHidden(not count and item.checkState() != Qt.Checked)
+            for key, item in items.items():
+                if key not in shown:
+                    # Value no longer in the index since a rebuild
+                    item.setHidden(item.checkState() != Qt.Checked)
+            values.setUpdatesEnabled(True)
+            values.blockSignals(False)
+
+    def _add_items(self, facet, entries):
+        values = self._lists[facet]
+        items = self._items[facet]
+        for key, name, _ in entries:
+            if key not in items:
+                item = QListWidgetItem(self._label(facet, name))
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Unchecked)
+                items[key] = item
+                values.addItem(item)
+        values.sortItems()
+
+    def _label(self, facet, name):
+        return self.translator.t(name) if facet == 'stock' else name
+
+    def update_translations(self):
+        self.title_label.setText(f"<b>{self.translator.t('facets_title')}</b>")
+        self.clear_btn.setText(self.translator.t('clear_facets'))
+        for facet, group in self._groups.items():
+            group.setTitle(self.translator.t(FACET_TITLES[facet]))
+        self.set_counts(self._counts)
@@ -0,0 +1,533 @@
+import sys
+from array import array
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal
+from PyQt5.QtGui import QColor
+
+from database.car_parts_db import part_keys
+from database.normalization import normalize_key
+
+
+class ProductTableModel(QAbstractTableModel):
+    """Table model for the products view backed by compact column storage.
+
+    Rows are kept as parallel columns (typed arrays for numbers, interned
+    string lists for text) and a separate ``_order`` array maps visible rows
+    to storage positions, so filtering and sorting only rewrite that array.
+    Cell text is formatted in data() for the rows the view actually paints.
+
+    Lookups by part id go through ``_pos_by_id`` (id -> storage position)
+    and the inverse of ``_order`` (storage position -> visible row), so
+    finding a row for an edit, delete or highlight does not scan the table.
+    While a column is sorted, an edited or added row is moved to its place
+    with a binary search instead of re-sorting every row.
+
+    Removing a product leaves a tombstone: its storage position is listed
+    in ``_removed`` and never shown again, but no other position moves, so
+    positions keep matching the inventory snapshot and the search indexes.
+    A None product (a slot the inventory has already removed) loads as a
+    tombstone. load() with the inventory's compacted rows clears them.
+    """
+
+    # Emitted when the user commits an edit: (row, column, new text)
+    cell_edited = pyqtSignal(int, int, str)
+
+    COLUMN_COUNT = 7
+    # Most rows added or edited at once that are placed one by one in a
+    # sorted table; larger batches re-sort the whole table instead
+    PLACE_LIMIT = 64
+    TEXT_COLUMNS = (1, 2, 3, 4)
+    FIELD_MAP = {
+        1: 'category',
+        2: 'car_name',
+        3: 'model',
+        4: 'product_name',
+        5: 'quantity',
+        6: 'price'
+    }
+
+    _ALIGNMENTS = {
+        0: Qt.AlignCenter,
+        5: Qt.AlignCenter,
+        6: Qt.AlignRight | Qt.AlignVCenter
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._headers = [""] * self.COLUMN_COUNT
+        self._ids = array('q')
+        self._quantities = array('q')
+        self._prices = array('d')
+        self._text = ([], [], [], [])  # category, car_name, model, product_name
+        self._order = array('l')
+        self._pos_by_id = {}
+        # Storage positions of removed products
+        self._removed = set()
+        # storage position -> visible row (-1 if hidden); rebuilt lazily after _order changes
+        self._row_of = None
+        # Search key of each stored product name, and key -> a position
+        # holding it; kept up to date as rows load and change
+        self._name_keys = []
+        self._pos_by_name = {}
+        self._sort_column = None
+        self._sort_order = Qt.AscendingOrder
+        # Set while the visible rows are in an order of their own (ranked
+        # results) that the sort column must not override
+        self._keep_order = False
+        # Every storage position in sort column order, and each position's
+        # index in it; rebuilt lazily after the sort or any value changes
+        self._sorted_all = None
+        self._rank = None
+        # (storage position, column) -> (background, foreground); column None = whole row
+        self._colors = {}
+
+    # --- Loading -----------------------------------------------------------
+
+    def load(self, products):
+        """Replace the model contents with the given product tuples"""
+        self.beginResetModel()
+        self._clear_storage()
+        for prod in products:
+            self._append(prod)
+        self._order = array('l', self._live_positions())
+        self._keep_order = False
+        self._apply_sort()
+        self.endResetModel()
+
+    def append(self, products):
+        """Add products to the storage and show them below the current rows"""
+        if not products:
+            return
+        start = len(self._ids)
+        for prod in products:
+            self._append(prod)
+        if self._is_sorted() and len(products) <= self.PLACE_LIMIT:
+            for pos in range(start, len(self._ids)):
+                row = self._sorted_row(pos)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self._order.insert(row, pos)
+                self._row_of = None
+                self.endInsertRows()
+            return
+        first = len(self._order)
+        self.beginInsertRows(QModelIndex(), first, first + len(products) - 1)
+        self._order.extend(range(start, len(self._ids)))
+        self._row_of = None
+        self.endInsertRows()
+        if self._is_sorted():
+            self.sort(self._sort_column, self._sort_order)
+
+    def _clear_storage(self):
+        self._ids = array('q')
+        self._quantities = array('q')
+        self._prices = array('d')
+        self._text = ([], [], [], [])
+        self._colors = {}
+        self._pos_by_id = {}
+        self._removed = set()
+        self._row_of = None
+        self._name_keys = []
+        self._pos_by_name = {}
+        self._sorted_all = self._rank = None
+
+    def _append(self, prod):
+        pos = len(self._ids)
+        self._sorted_all = self._rank = None
+        if prod is None:
+            self._removed.add(pos)
+            self._name_keys.append("")
+            self._ids.append(-1)
+            for column in self._text:
+                column.append("")
+            self._quantities.append(0)
+            self._prices.append(0.0)
+            return
+        self._pos_by_id[int(prod[0])] = pos
+        key = part_keys(prod)[3]
+        self._name_keys.append(key)
+        self._pos_by_name.setdefault(key, pos)
+        self._ids.append(int(prod[0]))
+        for col, column in zip(self.TEXT_COLUMNS, self._text):
+            column.append(self._intern(prod[col]))
+        self._quantities.append(int(prod[5] or 0))
+        self._prices.append(float(prod[6] or 0.0))
+
+    @staticmethod
+    def _intern(value):
+        if value in (None, ""):
+            return ""
+        return sys.intern(str(value))
+
+    # --- Visible rows ------------------------------------------------------
+
+    def set_visible_positions(self, positions, keep_order=False):
+        """Show only the given storage positions.
+
+        They are sorted by the current sort column unless keep_order is
+        set, which shows them in the given order (e.g. best match first)
+        until the user sorts by a column again.
+        """
+        self.beginResetModel()
+        self._order = array('l', positions)
+        self._row_of = None
+        self._keep_order = keep_order
+        self._apply_sort()
+        self.endResetModel()
+
+    def show_all(self):
+        self.set_visible_positions(self._live_positions())
+
+    def _live_positions(self):
+        if not self._removed:
+            return range(len(self._ids))
+        return [pos for pos in range(len(self._ids)) if pos not in self._removed]
+
+    def storage_size(self):
+        """Number of products held by the model, visible or not"""
+        return len(self._ids) - len(self._removed)
+
+    def position_for_row(self, row):
+        return self._order[row]
+
+    def position_for_id(self, part_id):
+        """Return the storage position of a part id, or -1 if not held"""
+        return self._pos_by_id.get(part_id, -1)
+
+    def row_for_position(self, pos):
+        """Return the visible row of a storage position, or -1 if hidden"""
+        if self._row_of is None:
+            row_of = array('l', [-1]) * len(self._ids)
+            for row, p in enumerate(self._order):
+                row_of[p] = row
+            self._row_of = row_of
+        if not 0 <= pos < len(self._row_of):
+            return -1
+        return self._row_of[pos]
+
+    def row_for_id(self, part_id):
+        """Return the visible row of a part id, or -1 if not shown"""
+        pos = self._pos_by_id.get(part_id)
+        return -1 if pos is None else self.row_for_position(pos)
+
+    def find_row(self, search_text, column=4):
+        """Return the first visible row whose column contains search_text.
+
+        Text is compared by normalize_key, like every search. A product name
+        typed or picked in full is found through the name index; only
+        partial text falls back to scanning the visible rows.
+        """
+        search_text = normalize_key(search_text)
+        if column == 4:
+            keys = self._name_keys
+            pos = self._pos_by_name.get(search_text)
+            if pos is not None:
+                row = self.row_for_position(pos)
+                if row >= 0:
+                    return row
+        else:
+            keys = [normalize_key(text) for text in self._text[self.TEXT_COLUMNS.index(column)]]
+        for row, pos in enumerate(self._order):
+            if search_text in keys[pos]:
+                return row
+        return -1
+
+    # --- Row access --------------------------------------------------------
+
+    def part_id(self, row):
+        return self._ids[self._order[row]]
+
+    def product(self, row):
+        """Return the raw product tuple shown at the given row"""
+        pos = self._order[row]
+        return (self._ids[pos],) + tuple(column[pos] for column in self._text) + \
+            (self._quantities[pos], self._prices[pos])
+
+    def cell_text(self, row, column):
+        return self._format(self._order[row], column)
+
+    def _format(self, pos, column):
+        if column == 0:
+            return str(self._ids[pos])
+        if column == 5:
+            return str(self._quantities[pos])
+        if column == 6:
+            return f"{self._prices[pos]:.2f}"
+        return self._text[column - 1][pos] or "-"
+
+    def update_row(self, row, data):
+        """Overwrite the stored values of a row with a fresh product tuple"""
+        self._store(self._order[row], data)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.COLUMN_COUNT - 1))
+
+    def _store(self, pos, data):
+        self._sorted_all = self._rank = None
+        if data[4] != self._text[3][pos]:
+            old, key = self._name_keys[pos], part_keys(data)[3]
+            if self._pos_by_name.get(old) == pos:
+                # Another row with the old name is still found by find_row's scan
+                del self._pos_by_name[old]
+            self._name_keys[pos] = key
+            self._pos_by_name.setdefault(key, pos)
+        for col, column in zip(self.TEXT_COLUMNS, self._text):
+            column[pos] = self._intern(data[col])
+        self._quantities[pos] = int(data[5] or 0)
+        self._prices[pos] = float(data[6] or 0.0)
+
+    def upsert(self, products):
+        """Update products already held (matched by id) and append the rest"""
+        if not products:
+            return
+        new = []
+        rows = []
+        place = self._is_sorted() and len(products) <= self.PLACE_LIMIT
+        for prod in products:
+            pos = self._pos_by_id.get(int(prod[0]))
+            if pos is None:
+                new.append(prod)
+                continue
+            self._store(pos, prod)
+            row = self.row_for_position(pos)
+            if row < 0:
+                continue
+            if place:
+                row = self._move_to_sorted_row(row)
+                self.dataChanged.emit(self.index(row, 0),
+                                      self.index(row, self.COLUMN_COUNT - 1))
+            else:
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), 0),
+                                  self.index(max(rows), self.COLUMN_COUNT - 1))
+            if self._is_sorted():
+                self.sort(self._sort_column, self._sort_order)
+        self.append(new)
+
+    def _move_to_sorted_row(self, row):
+        """Move a visible row whose values changed to its place in the sort order.
+
+        Returns the row it ends up at. Only the rows it passes over get a
+        new row number.
+        """
+        order = self._order
+        pos = order.pop(row)
+        dest = self._sorted_row(pos)
+        order.insert(row, pos)
+        if dest == row:
+            return row
+        # Qt counts the destination before the moved row is taken out
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(),
+                           dest if dest < row else dest + 1)
+        order.pop(row)
+        order.insert(dest, pos)
+        if self._row_of is not None:
+            for r in range(min(row, dest), max(row, dest) + 1):
+                self._row_of[order[r]] = r
+        self.endMoveRows()
+        return dest
+
+    def _sort_key(self, pos):
+        column = self._sort_column
+        if column == 0:
+            return self._ids[pos]
+        if column == 5:
+            return self._quantities[pos]
+        if column == 6:
+            return self._prices[pos]
+        return self._text[column - 1][pos].lower()
+
+    def _sorted_row(self, pos):
+        """Row where pos belongs in the sorted visible rows, after rows that sort equal"""
+        key = self._sort_key(pos)
+        descending = self._sort_order == Qt.DescendingOrder
+        order = self._order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self._sort_key(order[mid])
+            if (key > other) if descending else (key < other):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def remove_ids(self, part_ids):
+        """Drop products by id and return how many were removed.
+
+        Each leaves a tombstone (see the class docstring); only its visible
+        row is taken out of the view.
+        """
+        part_ids = set(part_ids)
+        # For a few ids a C-level scan of _order per id beats rebuilding the
+        # whole position -> row map
+        scan = self._row_of is None and len(part_ids) <= self.PLACE_LIMIT
+        removed = 0
+        rows = []
+        for part_id in part_ids:
+            pos = self._pos_by_id.pop(part_id, None)
+            if pos is None:
+                continue
+            removed += 1
+            self._removed.add(pos)
+            key = self._name_keys[pos]
+            if self._pos_by_name.get(key) == pos:
+                # Another row with the name is still found by find_row's scan
+                del self._pos_by_name[key]
+            for column in (None,) + tuple(range(self.COLUMN_COUNT)):
+                self._colors.pop((pos, column), None)
+            if scan:
+                try:
+                    rows.append(self._order.index(pos))
+                except ValueError:
+                    pass
+            else:
+                row = self.row_for_position(pos)
+                if row >= 0:
+                    rows.append(row)
+        # Take the rows out bottom up, one contiguous run at a time
+        rows.sort(reverse=True)
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._order[first:last + 1]
+            self._row_of = None
+            self.endRemoveRows()
+        return removed
+
+    # --- Highlighting ------------------------------------------------------
+
+    def set_colors(self, row, column, background, foreground):
+        """Color a cell, or the whole row when column is None.
+
+        Returns the storage position, which stays valid across sorting and
+        filtering and is what clear_colors expects.
+        """
+        pos = self._order[row]
+        self._colors[(pos, column)] = (background, foreground)
+        self._emit_colors_changed(row, column)
+        return pos
+
+    def clear_colors(self, pos, column):
+        if self._colors.pop((pos, column), None) is None:
+            return
+        row = self.row_for_position(pos)
+        if row >= 0:
+            self._emit_colors_changed(row, column)
+
+    def _emit_colors_changed(self, row, column):
+        first = 0 if column is None else column
+        last = self.COLUMN_COUNT - 1 if column is None else column
+        self.dataChanged.emit(self.index(row, first), self.index(row, last),
+                              [Qt.BackgroundRole, Qt.ForegroundRole])
+
+    # --- Qt model interface ------------------------------------------------
+
+    def set_headers(self, headers):
+        self._headers = list(headers)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, self.COLUMN_COUNT - 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.COLUMN_COUNT
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return QVariant()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row, column = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._format(self._order[row], column)
+        if role == Qt.TextAlignmentRole:
+            return int(self._ALIGNMENTS.get(column, Qt.AlignLeft | Qt.AlignVCenter))
+        if self._colors and role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            pos = self._order[row]
+            colors = self._colors.get((pos, column)) or self._colors.get((pos, None))
+            if colors:
+                return QColor(colors[0] if role == Qt.BackgroundRole else colors[1])
+        return QVariant()
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() != 0:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """Forward user edits; storage only changes once the database accepts them"""
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.cell_edited.emit(index.row(), index.column(), str(value))
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if (column, order) != (self._sort_column, self._sort_order):
+            self._sorted_all = self._rank = None
+        self._sort_column, self._sort_order = column, order
+        self._keep_order = False
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        positions = [self._order[index.row()] for index in persistent]
+        self._apply_sort()
+        if persistent:
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(self.row_for_position(pos), index.column())
+                 for pos, index in zip(positions, persistent)])
+        self.layoutChanged.emit()
+
+    def _is_sorted(self):
+        """Whether the visible rows follow the sort column"""
+        column = self._sort_column
+        return not self._keep_order and column is not None and 0 <= column < self.COLUMN_COUNT
+
+    def _apply_sort(self):
+        """Reorder the visible rows by the last requested sort column.
+
+        The whole storage is sorted once and cached, so showing another
+        subset (a search, filter or facet click) only picks its rows out of
+        that order: by walking it when the subset is large, or by sorting
+        the subset on each position's cached rank when it is small.
+        """
+        if not self._is_sorted():
+            return
+        if self._sorted_all is None:
+            column = self._sort_column
+            if column == 0:
+                values = self._ids
+            elif column == 5:
+                values = self._quantities
+            elif column == 6:
+                values = self._prices
+            else:
+                values = [text.lower() for text in self._text[column - 1]]
+            self._sorted_all = array('l', sorted(
+                range(len(self._ids)), key=values.__getitem__,
+                reverse=self._sort_order == Qt.DescendingOrder))
+        order, size = self._order, len(self._ids)
+        if len(order) == size:
+            self._order = array('l', self._sorted_all)
+        elif len(order) * 4 >= size:
+            shown = bytearray(size)
+            for pos in order:
+                shown[pos] = 1
+            self._order = array('l', [pos for pos in self._sorted_all if shown[pos]])
+        else:
+            if self._rank is None:
+                rank = array('l', bytes(array('l').itemsize * size))
+                for i, pos in enumerate(self._sorted_all):
+                    rank[pos] = i
+                self._rank = rank
+            self._order = array('l', sorted(order, key=self._rank.__getitem__))
+        self._row_of = None
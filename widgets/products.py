@@ -1,15 +1,23 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-                             QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
+                             QTableView, QHeaderView, QLineEdit,
                              QAbstractItemView, QMessageBox, QDialog, QFileDialog,
-                             QStyledItemDelegate, QFrame, QApplication,QScrollArea,QProgressDialog)
+                             QStyledItemDelegate, QFrame, QScrollArea, QProgressDialog)
 from PyQt5.QtGui import QIcon, QColor, QPainter, QPixmap
-from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSlot, QMetaObject, Q_ARG,QEventLoop
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSlot, QMetaObject, Q_ARG
 from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 import csv
 import datetime
+import logging
+import time
 from translator import Translator
-from widgets.dialogs import FilterDialog, AddProductDialog, ItemDetailsDialog
-from widgets.workers import DatabaseWorker
+from widgets.dialogs import FilterDialog, AddProductDialog, ItemDetailsDialog, CompatibilityDialog
+from widgets.workers import BulkDeleteWorker, DatabaseWorker, IndexBuildWorker
+from widgets.product_table_model import ProductTableModel
+from database.normalization import normalize_key
+from filter_engine import FilterEngine
+from facet_index import FacetIndex
+from widgets.facet_panel import FacetPanel
+from search_index import NarrowingSearch, TokenIndex, FuzzyIndex
 from themes import get_color
 
 
@@ -94,16 +102,77 @@ class StatusBar(QFrame):
 
 
 class ProductsWidget(QWidget):
-    def __init__(self, translator, db):
+    # "memory" filters the shared snapshot; "sql" pushes the criteria down to CarPartsDB
+    filter_mode = "memory"
+    # Show similar products when a search has no exact matches
+    fuzzy_fallback = True
+    # Snapshot indexes by attribute name. Each is built in an IndexBuildWorker
+    # once the catalog has loaded, so streamed pages only reach the table; a
+    # search that needs one sooner builds it on the spot (except the fuzzy
+    # index, whose fallback is simply skipped until it is ready).
+    SNAPSHOT_INDEXES = {
+        'filter_engine': FilterEngine,
+        'facet_index': FacetIndex,
+        'search_engine': NarrowingSearch,
+        'token_index': TokenIndex,
+        'fuzzy_index': FuzzyIndex,
+    }
+
+    def __init__(self, translator, db, inventory):
         super().__init__()
         self._is_closing = False
-        self.worker_thread = None
+        self.delete_worker = None
+        self.filter_worker = None
+        self.compatibility_worker = None
+        # Workers still running after being superseded, kept alive until they end
+        self._workers = set()
         self.translator = translator
         self.db = db
-        self.all_products = []
+        self.inventory = inventory
+        self._active_filters = None
+        # (car, model, year) of the compatibility search being shown, if any
+        self._active_vehicle = None
+        # FacetPanel selection being shown, if any
+        self._active_facets = None
+        # Column copy of the snapshot for FilterDialog criteria, by storage position
+        self.filter_engine = None
+        # Per-value bitmaps behind the facet panel counts
+        self.facet_index = None
+        # Precomputed search keys and recent results for on_search
+        self.search_engine = None
+        # Word index for multi-word queries in any order
+        self.token_index = None
+        # Trigram index for the fuzzy fallback
+        self.fuzzy_index = None
+        # Running IndexBuildWorker per SNAPSHOT_INDEXES attribute
+        self._index_workers = {}
+        self._data_version = 0
         self.setup_ui()
         self.apply_theme()
-        QTimer.singleShot(100, self.load_products)
+
+        # The table mirrors the shared inventory snapshot row for row
+        self.inventory.loading_started.connect(self.handle_loading_started)
+        self.inventory.page_loaded.connect(self.handle_loaded_page)
+        self.inventory.loaded.connect(self.handle_load_finished)
+        self.inventory.rows_added.connect(self.handle_rows_added)
+        self.inventory.rows_updated.connect(self.handle_rows_updated)
+        self.inventory.rows_removed.connect(self.handle_rows_removed)
+        self.inventory.compacted.connect(self.handle_compacted)
+        self.inventory.error.connect(self.show_error)
+        self.update_table_data(self.inventory.products)
+        self.refresh_facet_counts()
+        if self.inventory.is_loaded:
+            # Built after the catalog finished loading; loaded will not fire again
+            self._build_indexes()
+
+    @property
+    def all_products(self):
+        """The shared inventory snapshot; index i is the model's storage position i.
+
+        Removed rows are None until the inventory compacts; len(self.inventory)
+        counts the live rows.
+        """
+        return self.inventory.products
 
     def setup_ui(self):
         # Add object name for the container to apply enhanced borders
@@ -147,6 +216,13 @@ class ProductsWidget(QWidget):
         self.filter_btn.setCursor(Qt.PointingHandCursor)  # Add cursor change
         button_layout.addWidget(self.filter_btn)
 
+        self.compatibility_btn = QPushButton(self.translator.t('compatibility_button'))
+        self.compatibility_btn.setIcon(QIcon("resources/car-icon.jpg"))
+        self.compatibility_btn.setIconSize(QSize(18, 18))
+        self.compatibility_btn.clicked.connect(self.show_compatibility_dialog)
+        self.compatibility_btn.setCursor(Qt.PointingHandCursor)
+        button_layout.addWidget(self.compatibility_btn)
+
         # Add export button
         self.export_btn = QPushButton(self.translator.t('export'))
         self.export_btn.setIcon(QIcon("resources/export_icon.png"))
@@ -159,7 +235,7 @@ class ProductsWidget(QWidget):
         self.refresh_btn = QPushButton(self.translator.t('refresh'))
         self.refresh_btn.setIcon(QIcon("resources/refresh_icon.png"))
         self.refresh_btn.setIconSize(QSize(18, 18))
-        self.refresh_btn.clicked.connect(self.load_products)
+        self.refresh_btn.clicked.connect(self.refresh_products)
         self.refresh_btn.setCursor(Qt.PointingHandCursor)  # Add cursor change
 
         button_layout.addStretch()
@@ -188,8 +264,10 @@ class ProductsWidget(QWidget):
         table_layout = QVBoxLayout(table_container)
         table_layout.setContentsMargins(0, 0, 0, 15)  # Add bottom margin for scrollbar
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
+        self.table_model = ProductTableModel(self)
+        self.table_model.cell_edited.connect(self.on_cell_changed)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
         self.update_headers()
         self.table.verticalHeader().setVisible(False)
 
@@ -204,7 +282,7 @@ class ProductsWidget(QWidget):
 
         self.table.setSelectionBehavior(QAbstractItemView.SelectItems)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.table.cellChanged.connect(self.on_cell_changed)
+        self.table.setSortingEnabled(True)
         self.table.setAlternatingRowColors(True)
 
         # Use delegates for better numeric editing
@@ -214,7 +292,15 @@ class ProductsWidget(QWidget):
         self.table.setItemDelegateForColumn(6, self.price_delegate)  # Price
 
         table_layout.addWidget(self.table)
-        main_layout.addWidget(table_container, 1)  # Add table container to main layout
+
+        # Facet panel beside the table
+        content_layout = QHBoxLayout()
+        content_layout.setSpacing(10)
+        self.facet_panel = FacetPanel(self.translator, self)
+        self.facet_panel.selection_changed.connect(self.apply_facets)
+        content_layout.addWidget(self.facet_panel)
+        content_layout.addWidget(table_container, 1)
+        main_layout.addLayout(content_layout, 1)  # Add table and facets to main layout
 
         # Add status bar for operation messages with proper spacing
         status_container = QFrame()
@@ -324,7 +410,7 @@ class ProductsWidget(QWidget):
         """
 
         for btn in [self.add_btn, self.select_toggle, self.remove_btn, self.filter_btn,
-                    self.export_btn, self.refresh_btn]:
+                    self.compatibility_btn, self.export_btn, self.refresh_btn]:
             btn.setStyleSheet(btn_style)
 
         # Search box styling
@@ -349,7 +435,7 @@ class ProductsWidget(QWidget):
 
         # Table styling with larger elements and enhanced borders
         table_style = f"""
-                   QTableWidget {{
+                   QTableView {{
                        background-color: {bg_color};
                        alternate-background-color: {get_color('secondary')};
                        gridline-color: {border_color};
@@ -357,7 +443,7 @@ class ProductsWidget(QWidget):
                        border-radius: 6px;
                        font-size: 14px;
                    }}
-                   QTableWidget::item {{
+                   QTableView::item {{
                        padding: 8px;
                        transition: background 0.3s ease, color 0.3s ease;
                    }}
@@ -370,7 +456,7 @@ class ProductsWidget(QWidget):
                        font-weight: bold;
                        font-size: 15px;
                    }}
-                   QTableWidget::item:selected {{
+                   QTableView::item:selected {{
                        background-color: {highlight_color};
                        color: {bg_color};
                    }}
@@ -444,35 +530,43 @@ class ProductsWidget(QWidget):
         self.adjust_statusbar_position()  # Add this line
     def on_search(self, text):
         """Filter table based on search text"""
-        search_text = text.lower().strip()
+        # Same canonical form as the stored keys: niqqud, final letters,
+        # geresh/gershayim, case and punctuation don't matter
+        search_text = normalize_key(text)
+        self._active_filters = None
+        self._active_vehicle = None
+        self._clear_facets()
         if not search_text:
             # If search is cleared, show all products
-            self.update_table_data(self.all_products)
+            self.table_model.show_all()
+            self.status_bar.clear()
             return
 
-        # Filter products based on search text
-        filtered_products = []
-        for product in self.all_products:
-            # Search in product name, category, car, and model
-            searchable_fields = [
-                str(product[1] or ""),  # Category
-                str(product[2] or ""),  # Car
-                str(product[3] or ""),  # Model
-                str(product[4] or "")  # Product name
-            ]
+        # Search in category, car, model and product name. Several words
+        # must all appear, in any order; a single word is a substring match
+        # where typing more characters only rescans the previous matches.
+        if len(search_text.split()) > 1:
+            filtered_positions = self._index('token_index').search(search_text)
+        else:
+            filtered_positions = self._index('search_engine').search(search_text)
 
-            searchable_text = " ".join(searchable_fields).lower()
-            if search_text in searchable_text:
-                filtered_products.append(product)
+        if not filtered_positions and self.fuzzy_fallback and self.fuzzy_index is not None:
+            similar = self.fuzzy_index.search(search_text)
+            if similar:
+                # Ranked best first; shown in that order even if a column is sorted
+                self.table_model.set_visible_positions(similar, keep_order=True)
+                self.status_bar.show_message(
+                    self.translator.t('fuzzy_results').format(count=len(similar)), "info")
+                return
 
-        self.update_table_data(filtered_products)
+        self.table_model.set_visible_positions(filtered_positions)
 
         # Show status message
-        if len(filtered_products) < len(self.all_products):
+        if len(filtered_positions) < len(self.inventory):
             self.status_bar.show_message(
                 self.translator.t('search_results').format(
-                    count=len(filtered_products),
-                    total=len(self.all_products)
+                    count=len(filtered_positions),
+                    total=len(self.inventory)
                 ),
                 "info"
             )
@@ -498,32 +592,18 @@ class ProductsWidget(QWidget):
                 )
     def highlight_product(self, search_text):
         """Scroll to and highlight matching product using theme colors"""
-        search_text = search_text.lower()
-        for row in range(self.table.rowCount()):
-            product_item = self.table.item(row, 4)
-            if product_item and search_text in product_item.text().lower():
-                self.table.scrollToItem(product_item)
-                self.table.blockSignals(True)
-                for col in range(self.table.columnCount()):
-                    item = self.table.item(row, col)
-                    if item:
-                        item.setBackground(QColor(get_color('highlight')))
-                        item.setForeground(QColor(get_color('background')))
-                self.table.blockSignals(False)
-                QTimer.singleShot(2000, lambda r=row: self.clear_highlight(r))
-                return True
-        return False
-
-    def clear_highlight(self, row):
-        """Clear highlight using theme background color"""
-        self.table.blockSignals(True)
-        for col in range(self.table.columnCount()):
-            item = self.table.item(row, col)
-            if item:
-                item.setBackground(QColor(
-                    get_color('background') if row % 2 == 0 else get_color('secondary')))
-                item.setForeground(QColor(get_color('text')))
-        self.table.blockSignals(False)
+        row = self.table_model.find_row(search_text)
+        if row < 0:
+            return False
+        self.table.scrollTo(self.table_model.index(row, 4))
+        pos = self.table_model.set_colors(row, None, get_color('highlight'),
+                                          get_color('background'))
+        QTimer.singleShot(2000, lambda p=pos: self.clear_highlight(p))
+        return True
+
+    def clear_highlight(self, pos):
+        """Clear the row highlight so the table's own colors show again"""
+        self.table_model.clear_colors(pos, None)
 
     def on_select_toggled(self, checked):
         """Handle selection mode toggle with proper error handling"""
@@ -610,121 +690,194 @@ class ProductsWidget(QWidget):
             self.translator.t('quantity'),
             self.translator.t('price')
         ]
-        self.table.setHorizontalHeaderLabels(headers)
+        self.table_model.set_headers(headers)
 
     def show_filter_dialog(self):
-        dialog = FilterDialog(self.translator, self)
+        count = self._count_in_memory if self.filter_mode == "memory" else None
+        dialog = FilterDialog(self.translator, self, db=self.db, count=count)
         if dialog.exec_() == QDialog.Accepted:
             filters = dialog.get_filters()
             self.filter_products(filters)
 
     def filter_products(self, filters):
+        self._active_filters = filters
+        self._active_vehicle = None
+        self._clear_facets()
+        if self.filter_mode == "sql":
+            self._filter_in_database(filters)
+            return
+        try:
+            started = time.perf_counter()
+            filtered = self._index('filter_engine').positions(filters)
+            self._show_filter_results(filtered, "memory", time.perf_counter() - started)
+
+        except Exception as e:
+            print("Error filtering products:", e)
+            self.status_bar.show_message(self.translator.t('filter_error'), "error")
+
+    def _count_in_memory(self, filters):
+        """FilterDialog's live count on the filter engine Apply will use.
+
+        None while the engine is still being built, so the dialog counts in
+        the database meanwhile; both apply the same criteria.
+        """
+        if not self._index_ready('filter_engine'):
+            return None
+        return len(self.filter_engine.positions(filters))
+
+    def _filter_in_database(self, filters):
+        """Run the criteria as an indexed query in a worker; see CarPartsDB.filter_parts"""
+        self.filter_worker = DatabaseWorker(self.db, "filter", filters)
+        self.filter_worker.finished.connect(self.handle_filtered_parts)
+        self.filter_worker.error.connect(self.show_error)
+        self._track_worker(self.filter_worker, self.filter_worker.finished,
+                           self.filter_worker.error)
+        self.filter_worker.start()
+
+    @pyqtSlot(object)
+    def handle_filtered_parts(self, result):
+        if self.sender() is not self.filter_worker or self._is_closing:
+            return
+        if self._active_filters is None:
+            return
+        rows, seconds = result
+        try:
+            # Map the matches onto the table's storage; rows outside a
+            # truncated snapshot cannot be shown and are left out
+            positions = [self.table_model.position_for_id(row[0]) for row in rows]
+            self._show_filter_results([pos for pos in positions if pos >= 0], "sql", seconds)
+        except Exception as e:
+            print("Error filtering products:", e)
+            self.status_bar.show_message(self.translator.t('filter_error'), "error")
+
+    def _show_filter_results(self, positions, path, seconds):
+        """Show only the matching rows and report which filter path ran and how long it took"""
+        self.table_model.set_visible_positions(positions)
+        logging.debug("Filter (%s): %d rows in %.1f ms", path, len(positions), seconds * 1000)
+        self.status_bar.show_message(
+            self.translator.t('filter_results').format(
+                count=len(positions),
+                total=len(self.inventory)
+            ) + " " + self.translator.t('filter_timing').format(
+                path=self.translator.t(f'filter_path_{path}'),
+                ms=seconds * 1000
+            ),
+            "info"
+        )
+
+    def show_compatibility_dialog(self):
+        dialog = CompatibilityDialog(self.translator, self, db=self.db)
+        if dialog.exec_() == QDialog.Accepted:
+            self.find_compatible(*dialog.get_vehicle())
+
+    def find_compatible(self, car, model, year):
+        """Show the parts that fit a vehicle; see CarPartsDB.build_compatibility_query"""
+        self._active_filters = None
+        self._active_vehicle = (car, model, year)
+        self._clear_facets()
+        self.compatibility_worker = DatabaseWorker(self.db, "compatible", car, model, year)
+        self.compatibility_worker.finished.connect(self.handle_compatible_parts)
+        self.compatibility_worker.error.connect(self.show_error)
+        self._track_worker(self.compatibility_worker, self.compatibility_worker.finished,
+                           self.compatibility_worker.error)
+        self.compatibility_worker.start()
+
+    @pyqtSlot(object)
+    def handle_compatible_parts(self, result):
+        if self.sender() is not self.compatibility_worker or self._is_closing:
+            return
+        if self._active_vehicle is None:
+            return
+        part_ids, seconds = result
+        positions = sorted(pos for pos in map(self.table_model.position_for_id, part_ids)
+                           if pos >= 0)
+        self.table_model.set_visible_positions(positions)
+        vehicle = " ".join(str(value) for value in self._active_vehicle if value)
+        logging.debug("Compatibility (%s): %d rows in %.1f ms",
+                      vehicle, len(positions), seconds * 1000)
+        self.status_bar.show_message(
+            self.translator.t('compatible_results').format(
+                count=len(positions), vehicle=vehicle or "-", ms=seconds * 1000),
+            "info"
+        )
+
+    def apply_facets(self, selection):
+        """Show the rows matching a FacetPanel selection and recount every facet"""
+        if self._active_filters is not None or self._active_vehicle is not None or \
+                self.search_input.text():
+            self._active_filters = None
+            self._active_vehicle = None
+            self.search_input.blockSignals(True)
+            self.search_input.clear()
+            self.search_input.blockSignals(False)
+        self._active_facets = selection or None
         try:
-            # Get all products from the database if we don't have them cached
-            if not self.all_products:
-                self.all_products = self.db.get_all_parts()
-
-            filtered = []
-            # Apply filters
-            for prod in self.all_products:
-                category = prod[1] if prod[1] else ""
-                name = prod[4] if prod[4] else ""
-                price = float(prod[6])
-
-                # Apply filters
-                if filters["category"] and filters[
-                    "category"].lower() not in category.lower():
-                    continue
-                if filters["name"] and filters["name"].lower() not in name.lower():
-                    continue
-                if filters["min_price"] is not None and price < filters["min_price"]:
-                    continue
-                if filters["max_price"] is not None and price > filters["max_price"]:
-                    continue
-                filtered.append(prod)
-
-            # Update the table with filtered products
-            self.update_table_data(filtered)
-
-            # Show status message
+            started = time.perf_counter()
+            facet_index = self._index('facet_index')
+            if self._active_facets is None:
+                self.table_model.show_all()
+                self.facet_panel.set_counts(facet_index.counts())
+                self.status_bar.clear()
+                return
+            positions = facet_index.positions(selection)
+            self.facet_panel.set_counts(facet_index.counts(selection))
+            self.table_model.set_visible_positions(positions)
+            seconds = time.perf_counter() - started
             self.status_bar.show_message(
-                self.translator.t('filter_results').format(
-                    count=len(filtered),
-                    total=len(self.all_products)
-                ),
+                self.translator.t('facet_results').format(
+                    count=len(positions), total=len(self.inventory), ms=seconds * 1000),
                 "info"
             )
-
         except Exception as e:
             print("Error filtering products:", e)
             self.status_bar.show_message(self.translator.t('filter_error'), "error")
 
+    def refresh_facet_counts(self):
+        """Recount the facet panel for the current rows and selection.
+
+        Does nothing until the facet index is ready; the counts are shown
+        once its worker delivers it.
+        """
+        if not self._index_ready('facet_index'):
+            return
+        try:
+            self.facet_panel.set_counts(self.facet_index.counts(self._active_facets))
+        except Exception as e:
+            print("Error counting facets:", e)
+
+    def _clear_facets(self):
+        """Drop the facet selection when another search or filter takes over the table"""
+        if self._active_facets is not None:
+            self._active_facets = None
+            self.facet_panel.clear_selection()
+            self.refresh_facet_counts()
+
     def update_table_data(self, products):
-        """Update table with the given products data"""
-        self.table.blockSignals(True)
-        self.table.setSortingEnabled(False)
-        self.table.clearContents()
-        self.table.setRowCount(len(products))
-
-        for row, prod in enumerate(products):
-            # ID column (non-editable)
-            id_item = QTableWidgetItem(str(prod[0]))
-            id_item.setFlags(id_item.flags() ^ Qt.ItemIsEditable)
-            id_item.setTextAlignment(Qt.AlignCenter)  # Center align ID
-            self.table.setItem(row, 0, id_item)
-
-            # Other columns
-            for col in range(1, 5):
-                text = str(prod[col]) if prod[col] not in [None, ""] else "-"
-                item = QTableWidgetItem(text)
-                # Left align text fields
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(row, col, item)
-
-            # Quantity - center align
-            qty_item = QTableWidgetItem(str(prod[5]))
-            qty_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row, 5, qty_item)
-
-            # Price - right align
-            price_item = QTableWidgetItem(f"{float(prod[6]):.2f}")
-            price_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 6, price_item)
-
-            if row % 10 == 0:
-                QApplication.processEvents()
+        """Load the given products into the table model.
 
-        self.table.setSortingEnabled(True)
-        self.table.blockSignals(False)
+        Cells are formatted lazily by the model, so this only copies the
+        values into its column storage.
+        """
+        self.table_model.load(products)
 
     def load_products(self):
+        """Reload the whole shared inventory; the table follows its signals"""
         if self._is_closing:
             return
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.quit()
-            self.worker_thread.wait(1000)
-
-        # Clear existing data first
-        self.table.blockSignals(True)
-        self.table.clearContents()
-        self.table.setRowCount(0)
-        self.table.blockSignals(False)
-
-        # Show loading status
-        self.status_bar.show_message(self.translator.t('loading_products'), "info")
+        self.inventory.load()
 
-        # Create and start worker thread
-        self.worker_thread = DatabaseWorker(self.db, "load")
-        self.worker_thread.finished.connect(self.handle_loaded_products)
-        self.worker_thread.error.connect(self.show_error)
-        self.worker_thread.start()
+    def refresh_products(self):
+        """Apply only what changed in the database since the last sync"""
+        if self._is_closing:
+            return
+        self.inventory.refresh()
 
     def export_data(self):
         """Export the current table data to a CSV file"""
         try:
             # Get current table data
-            rows = self.table.rowCount()
-            cols = self.table.columnCount()
+            rows = self.table_model.rowCount()
+            cols = self.table_model.columnCount()
 
             if rows == 0:
                 self.status_bar.show_message(self.translator.t('no_data_to_export'),
@@ -752,16 +905,13 @@ class ProductsWidget(QWidget):
                 # Write headers
                 headers = []
                 for col in range(cols):
-                    headers.append(self.table.horizontalHeaderItem(col).text())
+                    headers.append(self.table_model.headerData(col, Qt.Horizontal))
                 writer.writerow(headers)
 
                 # Write data
                 for row in range(rows):
-                    row_data = []
-                    for col in range(cols):
-                        item = self.table.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    writer.writerow(row_data)
+                    writer.writerow([self.table_model.cell_text(row, col)
+                                     for col in range(cols)])
 
             self.status_bar.show_message(
                 self.translator.t('export_success').format(file=file_name),
@@ -772,30 +922,14 @@ class ProductsWidget(QWidget):
             print(f"Export error: {e}")
             self.status_bar.show_message(self.translator.t('export_error'), "error")
 
-    def on_cell_changed(self, row, column):
+    def on_cell_changed(self, row, column, text):
         try:
             # Only allow cell edits for columns 1-6 (skip ID column)
-            if not (0 <= row < self.table.rowCount() and 1 <= column < 7):
+            if not (0 <= row < self.table_model.rowCount() and 1 <= column < 7):
                 return
-            item = self.table.item(row, column)
-            id_item = self.table.item(row, 0)
-            if not item or not id_item:
-                return
-            try:
-                part_id = int(id_item.text())
-            except ValueError:
-                self.status_bar.show_message(self.translator.t('invalid_id'), "error")
-                return
-            field_map = {
-                1: 'category',
-                2: 'car_name',
-                3: 'model',
-                4: 'product_name',
-                5: 'quantity',
-                6: 'price'
-            }
-            field = field_map.get(column)
-            new_value = item.text().strip()
+            part_id = self.table_model.part_id(row)
+            field = ProductTableModel.FIELD_MAP.get(column)
+            new_value = text.strip()
             # For product name, don't allow empty (if editing column 4)
             if field == 'product_name' and not new_value:
                 self.status_bar.show_message(self.translator.t('product_name_required'),
@@ -813,111 +947,65 @@ class ProductsWidget(QWidget):
                                                  "error")
                     self._revert_cell(row, column)
                     return
-            if self.db.update_part(part_id, **{field: new_value}):
-                updated = self.db.get_part(part_id)
-                if not updated:
-                    raise ValueError("Product not found after update")
-                self._refresh_row(row, updated)
-
-                # Update the cached product in all_products
-                for i, prod in enumerate(self.all_products):
-                    if prod[0] == part_id:
-                        # Create a new tuple with the updated value
-                        new_prod = list(prod)
-                        new_prod[column] = new_value
-                        self.all_products[i] = tuple(new_prod)
-                        break
-
-                self.show_update_effect(row, column)
-                self.status_bar.show_message(self.translator.t('update_success'),
-                                             "success")
-            else:
-                self.show_error_effect(row, column)
-                raise RuntimeError("Database update failed")
+            # Queued without waiting for the commit; the table updates from
+            # rows_updated once the write is stored
+            notifier = self.inventory.submit_update(part_id, **{field: new_value})
+            notifier.finished.connect(
+                lambda stored: self._on_cell_written(part_id, column, stored))
+            notifier.error.connect(
+                lambda message: self._on_cell_write_failed(part_id, column, message))
+            notifier.start()
         except Exception as e:
                 self.show_error_effect(row, column)
                 self.status_bar.show_message(self.translator.t('update_error'), "error")
                 self._revert_cell(row, column)
 
+    def _on_cell_written(self, part_id, column, stored):
+        if stored is None:
+            self._on_cell_write_failed(part_id, column, "part no longer exists")
+            return
+        # A sorted table may have moved the edited row
+        self.show_update_effect(self.table_model.row_for_id(part_id), column)
+        self.status_bar.show_message(self.translator.t('update_success'), "success")
+
+    def _on_cell_write_failed(self, part_id, column, message):
+        print(f"Cell update error: {message}")
+        row = self.table_model.row_for_id(part_id)
+        self.show_error_effect(row, column)
+        self.status_bar.show_message(self.translator.t('update_error'), "error")
+        if row >= 0:
+            self._revert_cell(row, column)
+
     def show_error_effect(self, row, column):
         """Visual feedback for errors"""
-        item = self.table.item(row, column)
-        if item:
-            original_bg = item.background()
-            original_fg = item.foreground()
-            item.setBackground(QColor(get_color('error')))
-            item.setForeground(QColor(get_color('background')))
-            QTimer.singleShot(1000,
-                              lambda: self.clear_error_effect(row, column, original_bg,
-                                                              original_fg))
-
-    def clear_error_effect(self, row, column, bg, fg):
+        if 0 <= row < self.table_model.rowCount():
+            pos = self.table_model.set_colors(row, column, get_color('error'),
+                                              get_color('background'))
+            QTimer.singleShot(1000, lambda: self.clear_error_effect(pos, column))
+
+    def clear_error_effect(self, pos, column):
         """Clear error highlight"""
-        item = self.table.item(row, column)
-        if item:
-            item.setBackground(bg)
-            item.setForeground(fg)
+        self.table_model.clear_colors(pos, column)
 
     def show_update_effect(self, row, column):
         """Visual feedback for successful updates"""
-        item = self.table.item(row, column)
-        if item:
-            original_bg = item.background()
-            original_fg = item.foreground()
-            item.setBackground(QColor(get_color('highlight')))
-            item.setForeground(QColor(get_color('background')))
-            QTimer.singleShot(500, lambda: self.clear_update_effect(row, column, original_bg, original_fg))
-
-    def clear_update_effect(self, row, column, bg, fg):
-        """Clear update highlight"""
-        item = self.table.item(row, column)
-        if item:
-            item.setBackground(bg)
-            item.setForeground(fg)
+        if 0 <= row < self.table_model.rowCount():
+            pos = self.table_model.set_colors(row, column, get_color('highlight'),
+                                              get_color('background'))
+            QTimer.singleShot(500, lambda: self.clear_update_effect(pos, column))
 
-    def _refresh_row(self, row, data):
-        self.table.blockSignals(True)
-        try:
-            for col in range(7):
-                if col == 0:
-                    val = str(data[0])
-                elif col in [1, 2, 3, 4]:
-                    val = str(data[col]) if data[col] else "-"
-                elif col == 5:
-                    val = str(int(data[5]))
-                elif col == 6:
-                    val = f"{float(data[6]):.2f}"
-                else:
-                    val = ""
-                if self.table.item(row, col):
-                    self.table.item(row, col).setText(val)
-        finally:
-            self.table.blockSignals(False)
+    def clear_update_effect(self, pos, column):
+        """Clear update highlight"""
+        self.table_model.clear_colors(pos, column)
 
     def _revert_cell(self, row, column):
-        self.table.blockSignals(True)
+        """Re-read the row from the database so the view drops the rejected edit"""
         try:
-            id_item = self.table.item(row, 0)
-            if id_item:
-                part_id = int(id_item.text())
-                part = self.db.get_part(part_id)
-                if part:
-                    val = ""
-                    if column == 0:
-                        val = str(part[0])
-                    elif column in [1, 2, 3, 4]:
-                        val = str(part[column]) if part[column] else "-"
-                    elif column == 5:
-                        val = str(int(part[5]))
-                    elif column == 6:
-                        val = f"{float(part[6]):.2f}"
-
-                    if self.table.item(row, column):
-                        self.table.item(row, column).setText(val)
+            part = self.inventory.get(self.table_model.part_id(row))
+            if part:
+                self.table_model.update_row(row, part)
         except Exception as e:
             print(f"Error reverting cell: {e}")
-        finally:
-            self.table.blockSignals(False)
 
     def show_add_dialog(self):
         try:
@@ -950,7 +1038,7 @@ class ProductsWidget(QWidget):
                     QMessageBox.Yes | QMessageBox.No
                 )
                 if confirm == QMessageBox.Yes:
-                    success = self.db.update_part(existing[0], **data)
+                    success = self.inventory.update_part(existing[0], **data)
                     if not success:
                         raise Exception("Failed to update existing product")
                     self.status_bar.show_message(self.translator.t('product_updated'),
@@ -958,38 +1046,183 @@ class ProductsWidget(QWidget):
                 else:
                     return
             else:
-                success = self.db.add_part(**data)
+                success = self.inventory.add_part(**data)
                 if not success:
                     raise Exception("Failed to add new product")
                 self.status_bar.show_message(self.translator.t('product_added'),
                                              "success")
 
-            self.load_products()
-
         except Exception as e:
             print(f"Add product error: {e}")
             self.status_bar.show_message(self.translator.t('add_error'), "error")
 
-    @pyqtSlot(object)
-    def handle_loaded_products(self, products):
-        try:
-            # Cache the products
-            self.all_products = products
+    def handle_loading_started(self):
+        self._active_filters = None
+        self._active_vehicle = None
+        self._active_facets = None
+        self.facet_panel.clear_selection()
+        self.table_model.load([])
+        for name in self.SNAPSHOT_INDEXES:
+            setattr(self, name, None)
+        self._data_version += 1
+        self.status_bar.show_message(self.translator.t('loading_products'), "info")
 
-            # Update the table
-            self.update_table_data(products)
+    @pyqtSlot(list)
+    def handle_loaded_page(self, page):
+        """Append one streamed page to the table"""
+        if self._is_closing:
+            return
+        try:
+            self.table_model.append(page)
+            for index in self._ready_indexes():
+                # Built early for a search during the load; keep it in step
+                index.append(page)
+            self._data_version += 1
+            self._reapply_view()
+        except Exception as e:
+            print(f"Load error: {e}")
+            self.status_bar.show_message(self.translator.t('load_error'), "error")
 
-            # Update status
+    @pyqtSlot(int)
+    def handle_load_finished(self, count):
+        if self._is_closing:
+            return
+        if self._active_filters is not None and self.filter_mode == "sql":
+            self._reapply_view()
+        self.refresh_facet_counts()
+        self._build_indexes()
+        if not self.search_input.text().strip() and self._active_filters is None:
             self.status_bar.show_message(
-                self.translator.t('products_loaded').format(count=len(products)),
+                self.translator.t('products_loaded').format(count=count),
                 "success"
             )
 
-        except Exception as e:
-            print(f"Load error: {e}")
-            self.status_bar.show_message(self.translator.t('load_error'), "error")
-
+    @pyqtSlot(list)
+    def handle_rows_added(self, rows):
+        self.table_model.append(rows)
+        for index in self._ready_indexes():
+            index.append(rows)
+        self._data_version += 1
+        self._reapply_view()
+        if self._active_facets is None:
+            self.refresh_facet_counts()
+
+    @pyqtSlot(list, list)
+    def handle_rows_updated(self, old_rows, new_rows):
+        self.table_model.upsert(new_rows)
+        for row in new_rows:
+            pos = self.inventory.position(row[0])
+            for index in self._ready_indexes():
+                index.update(pos, row)
+        self._data_version += 1
+        self.refresh_facet_counts()
+
+    @pyqtSlot(list)
+    def handle_rows_removed(self, rows):
+        # Removed rows leave tombstones, so no other position moves and the
+        # indexes just drop these
+        positions = [self.table_model.position_for_id(row[0]) for row in rows]
+        self.table_model.remove_ids(row[0] for row in rows)
+        for index in self._ready_indexes():
+            for pos in positions:
+                if pos >= 0:
+                    index.remove(pos)
+        self._data_version += 1
+        self.refresh_facet_counts()
+
+    @pyqtSlot()
+    def handle_compacted(self):
+        """The inventory renumbered its positions: reload the table and rebuild the indexes"""
+        self.table_model.load(self.all_products)
+        for name in self.SNAPSHOT_INDEXES:
+            setattr(self, name, None)
+        self._data_version += 1
+        self._build_indexes()
+        self._reapply_view()
+        self.refresh_facet_counts()
+
+    def _index_ready(self, name):
+        index = getattr(self, name)
+        return index is not None and len(index) == len(self.all_products)
+
+    def _ready_indexes(self):
+        """The snapshot indexes built so far, which must follow every row change"""
+        indexes = (getattr(self, name) for name in self.SNAPSHOT_INDEXES)
+        return [index for index in indexes if index is not None]
+
+    def _index(self, name):
+        """Return a snapshot index for immediate use, building it here if it is not ready"""
+        if not self._index_ready(name):
+            # A worker still building it finds it set and drops its copy
+            setattr(self, name, self.SNAPSHOT_INDEXES[name](self.all_products))
+        return getattr(self, name)
+
+    def _build_indexes(self):
+        """Build every snapshot index not in step with the rows, each in a worker"""
+        if self._is_closing:
+            return
+        for name in self.SNAPSHOT_INDEXES:
+            if name == 'fuzzy_index' and not self.fuzzy_fallback:
+                continue
+            if not self._index_ready(name):
+                setattr(self, name, None)
+                self._start_index_worker(name)
+
+    def _start_index_worker(self, name):
+        worker = IndexBuildWorker(self.SNAPSHOT_INDEXES[name], self.all_products)
+        worker.index_name = name
+        worker.version = self._data_version
+        worker.built.connect(self.handle_index_built)
+        worker.error.connect(
+            lambda message, name=name: print(f"Error building {name}:", message))
+        self._track_worker(worker, worker.built, worker.error)
+        self._index_workers[name] = worker
+        worker.start()
 
+    @pyqtSlot(object)
+    def handle_index_built(self, index):
+        worker = self.sender()
+        name = getattr(worker, 'index_name', None)
+        if self._is_closing or self._index_workers.get(name) is not worker:
+            return
+        del self._index_workers[name]
+        if getattr(self, name) is not None:
+            # Built on the spot meanwhile and kept in step since
+            return
+        if worker.version != self._data_version:
+            # Rows changed while it was building; a reload builds it when done
+            if self.inventory.is_loaded:
+                self._start_index_worker(name)
+            return
+        setattr(self, name, index)
+        if name == 'facet_index':
+            self.refresh_facet_counts()
+
+    def _track_worker(self, worker, *done_signals):
+        """Hold a reference until the worker ends; a running QThread must not be destroyed"""
+        self._workers.add(worker)
+
+        def release(*args):
+            worker.wait()
+            self._workers.discard(worker)
+
+        for signal in done_signals:
+            signal.connect(release)
+
+    def _reapply_view(self):
+        """Re-run the active search or filter so newly loaded rows respect it"""
+        search_text = self.search_input.text()
+        if search_text.strip():
+            self.on_search(search_text)
+        elif self._active_filters is not None:
+            if self.filter_mode == "sql" and not self.inventory.is_loaded:
+                # One query once loading finishes rather than one per page
+                return
+            self.filter_products(self._active_filters)
+        elif self._active_vehicle is not None and self.inventory.is_loaded:
+            self.find_compatible(*self._active_vehicle)
+        elif self._active_facets is not None:
+            self.apply_facets(self._active_facets)
 
     def show_error(self, message):
         """Display an error message in the status bar"""
@@ -1004,6 +1237,8 @@ class ProductsWidget(QWidget):
         self.select_toggle.setText(self.translator.t('select_button'))
         self.remove_btn.setText(self.translator.t('remove'))
         self.filter_btn.setText(self.translator.t('filter_button'))
+        self.compatibility_btn.setText(self.translator.t('compatibility_button'))
+        self.facet_panel.update_translations()
         self.export_btn.setText(self.translator.t('export'))
         self.refresh_btn.setText(self.translator.t('refresh'))
 
@@ -1025,14 +1260,14 @@ class ProductsWidget(QWidget):
             if current_text.startswith("Found "):
                 self.status_bar.show_message(
                     self.translator.t('search_results').format(
-                        count=len([r for r in range(self.table.rowCount()) if not self.table.isRowHidden(r)]),
-                        total=len(self.all_products)
+                        count=self.table_model.rowCount(),
+                        total=len(self.inventory)
                     ),
                     message_type
                 )
             elif current_text.startswith("Loaded "):
                 self.status_bar.show_message(
-                    self.translator.t('products_loaded').format(count=self.table.rowCount()),
+                    self.translator.t('products_loaded').format(count=self.table_model.rowCount()),
                     message_type
                 )
 
@@ -1040,13 +1275,6 @@ class ProductsWidget(QWidget):
         """Clean up resources before closing"""
         try:
             self._is_closing = True
-            # Stop any ongoing worker thread
-            if self.worker_thread and self.worker_thread.isRunning():
-                self.worker_thread.quit()
-                self.worker_thread.wait(1000)
-
-            # Clear cached data
-            self.all_products = None
 
         except Exception as e:
             print(f"Cleanup error: {e}")
@@ -1056,17 +1284,8 @@ class ProductsWidget(QWidget):
 
     def _restore_cell_appearance(self, row, column):
         """Restore cell appearance after a highlight animation"""
-        item = self.table.item(row, column)
-        if not item:
-            return
-
-        # Restore normal appearance based on row parity
-        is_alternate = row % 2 == 1
-        if is_alternate:
-            item.setBackground(QColor(get_color('secondary')))
-        else:
-            item.setBackground(QColor(get_color('background')))
-        item.setForeground(QColor(get_color('text')))
+        if 0 <= row < self.table_model.rowCount():
+            self.table_model.clear_colors(self.table_model.position_for_row(row), column)
 
     def _flash_button(self, button, times=2):
         """Make a button flash to draw attention to it"""
@@ -1130,13 +1349,11 @@ class ProductsWidget(QWidget):
                 for index in selected_rows:
                     row = index.row()
                     try:
-                        id_item = self.table.item(row, 0)
-                        name_item = self.table.item(row, 4)
-                        if id_item and name_item and id_item.text().isdigit():
-                            product_details.append((
-                                int(id_item.text()),
-                                name_item.text() or self.translator.t('unnamed_product')
-                            ))
+                        product_details.append((
+                            self.table_model.part_id(row),
+                            self.table_model.cell_text(row, 4) or
+                            self.translator.t('unnamed_product')
+                        ))
                     except Exception as e:
                         print(f"Error parsing row {row}: {e}")
 
@@ -1174,49 +1391,22 @@ class ProductsWidget(QWidget):
 
                 # Process user confirmation
                 if dialog.exec_() == QDialog.Accepted:
-                    # Use a batch operation for better memory management
-                    deleted_ids = self._batch_delete_products(product_details)
-
-                    # Update UI and cache
-                    if deleted_ids:
-                        # Filter out deleted products from the cache
-                        self.all_products = [p for p in self.all_products if
-                                             p[0] not in deleted_ids]
-                        self.update_table_data(self.all_products)
-
-                        # Visual feedback
-                        self.table.setStyleSheet(f"""
-                            QTableWidget {{
-                                border: 2px solid {get_color('success')};
-                                transition: border 0.5s ease;
-                            }}
-                        """)
-                        QTimer.singleShot(1000, lambda: self.table.setStyleSheet(
-                            self.table.styleSheet().replace(get_color('success'),
-                                                            get_color('border'))))
-
-                        self.status_bar.show_message(
-                            self.translator.t('items_deleted').format(
-                                count=len(deleted_ids)),
-                            "success"
-                        )
-                    else:
-                        self.status_bar.show_message(self.translator.t('delete_failed'),
-                                                     "error")
+                    # Deleted in one transaction by a worker thread
+                    self._batch_delete_products(product_details)
 
                 # Explicitly clean up the dialog
                 dialog.deleteLater()
 
             else:
                 # Single cell clearing mode
-                current_item = self.table.currentItem()
-                if not current_item:
+                current_index = self.table.currentIndex()
+                if not current_index.isValid():
                     self.status_bar.show_message(self.translator.t('no_cell_selected'),
                                                  "warning")
                     return
 
-                row = current_item.row()
-                column = current_item.column()
+                row = current_index.row()
+                column = current_index.column()
 
                 # Prevent ID modification
                 if column == 0:
@@ -1236,11 +1426,10 @@ class ProductsWidget(QWidget):
             print(f"Universal remove error: {traceback.format_exc()}")
 
     def _batch_delete_products(self, product_list):
-        """Process deletion in optimized batches to prevent memory issues"""
-        deleted_ids = []
-        batch_size = 20  # Process in smaller batches
+        """Delete the selected products in a worker thread with a cancellable progress dialog"""
+        if self.delete_worker and self.delete_worker.isRunning():
+            return
 
-        # Create a single progress dialog
         progress = QProgressDialog(
             self.translator.t('deleting_items').format(count=len(product_list)),
             self.translator.t('cancel'),
@@ -1248,58 +1437,65 @@ class ProductsWidget(QWidget):
         )
         progress.setWindowModality(Qt.WindowModal)
         progress.setMinimumDuration(500)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+
+        self.delete_worker = BulkDeleteWorker(self.db, [pid for pid, _ in product_list])
+        self.delete_worker.progress.connect(lambda done, total: progress.setValue(done))
+        progress.canceled.connect(self.delete_worker.cancel)
+        self.delete_worker.finished.connect(self._on_products_deleted)
+        self.delete_worker.cancelled.connect(
+            lambda: self.status_bar.show_message(self.translator.t('delete_cancelled'),
+                                                 "warning"))
+        self.delete_worker.error.connect(self._on_delete_error)
+        for signal in (self.delete_worker.finished, self.delete_worker.cancelled,
+                       self.delete_worker.error):
+            signal.connect(progress.deleteLater)
+        self.delete_worker.start()
 
-        try:
-            for i in range(0, len(product_list), batch_size):
-                if progress.wasCanceled():
-                    break
-
-                # Process a batch
-                batch = product_list[i:i + batch_size]
-                for j, (pid, _) in enumerate(batch):
-                    progress_value = i + j
-                    progress.setValue(progress_value)
-                    QApplication.processEvents(
-                        QEventLoop.ExcludeUserInputEvents)  # Less intensive processing
+    @pyqtSlot(object)
+    def _on_products_deleted(self, deleted_ids):
+        """Drop deleted products from the cache and the table by id"""
+        if not deleted_ids:
+            self.status_bar.show_message(self.translator.t('delete_failed'), "error")
+            return
 
-                    if self.db.delete_part(pid):
-                        deleted_ids.append(pid)
+        # The table drops the rows when the inventory reports them removed
+        self.inventory.discard(deleted_ids)
 
-                # Force garbage collection after each batch
-                import gc
-                gc.collect()
+        # Visual feedback
+        self.table.setStyleSheet(f"""
+            QTableView {{
+                border: 2px solid {get_color('success')};
+                transition: border 0.5s ease;
+            }}
+        """)
+        QTimer.singleShot(1000, lambda: self.table.setStyleSheet(
+            self.table.styleSheet().replace(get_color('success'),
+                                            get_color('border'))))
 
-        finally:
-            # Ensure progress dialog is closed and cleaned up
-            progress.setValue(len(product_list))
-            progress.deleteLater()
+        self.status_bar.show_message(
+            self.translator.t('items_deleted').format(count=len(deleted_ids)),
+            "success"
+        )
 
-        return deleted_ids
+    def _on_delete_error(self, message):
+        print(f"Bulk delete error: {message}")
+        self.status_bar.show_message(self.translator.t('delete_failed'), "error")
 
     def _clear_field(self, row, column):
         """Handle single field clearing with proper cleanup"""
         # Get current values for undo capability
-        id_item = self.table.item(row, 0)
-        current_item = self.table.item(row, column)
-
-        if not id_item or not current_item:
+        if not 0 <= row < self.table_model.rowCount():
             self.status_bar.show_message(self.translator.t('invalid_selection'),
                                          "error")
             return
 
-        original_value = current_item.text()
+        original_value = self.table_model.cell_text(row, column)
 
         try:
-            part_id = int(id_item.text())
-            field_map = {
-                1: 'category',
-                2: 'car_name',
-                3: 'model',
-                4: 'product_name',
-                5: 'quantity',
-                6: 'price'
-            }
-            field = field_map.get(column)
+            part_id = self.table_model.part_id(row)
+            field = ProductTableModel.FIELD_MAP.get(column)
 
             if not field:
                 self.status_bar.show_message(self.translator.t('invalid_column'),
@@ -1336,17 +1532,9 @@ class ProductsWidget(QWidget):
             if confirm.exec_() == QMessageBox.Yes:
                 new_value = "" if column in [1, 2, 3] else "0"
 
-                if self.db.update_part(part_id, **{field: new_value}):
-                    # Update UI
-                    self.show_update_effect(row, column)
-
-                    # Update cached data efficiently
-                    for i, prod in enumerate(self.all_products):
-                        if prod[0] == part_id:
-                            updated = list(prod)
-                            updated[column] = new_value if new_value != "" else None
-                            self.all_products[i] = tuple(updated)
-                            break
+                if self.inventory.update_part(part_id, **{field: new_value}):
+                    # Update UI; a sorted table may have moved the row
+                    self.show_update_effect(self.table_model.row_for_id(part_id), column)
 
                     self.status_bar.show_message(
                         self.translator.t('field_cleared'),
@@ -1358,10 +1546,6 @@ class ProductsWidget(QWidget):
                         self.translator.t('update_failed'),
                         "error"
                     )
-            else:
-                # Restore original value if user cancels
-                current_item.setText(original_value)
-
             # Explicit cleanup
             confirm.deleteLater()
 
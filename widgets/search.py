@@ -2,17 +2,27 @@ from shared_imports import *
 from translator import Translator
 from database.car_parts_db import CarPartsDB
 from themes import get_color  # Add theme import
+from search_index import PrefixIndex
+from widgets.workers import DatabaseWorker
+
+# Delay between the last keystroke and the suggestion lookup
+SUGGESTION_DEBOUNCE_MS = 120
 
 
 class SearchBarWidget(QWidget):
-    def __init__(self, translator, product_db=None):
+    def __init__(self, translator, product_db=None, inventory=None):
         super().__init__()
         self.translator = translator
         self.product_db = product_db
+        self.inventory = inventory
+        self.suggestion_index = PrefixIndex()
+        self.index_ready = False
+        self.index_worker = None
         self.setup_ui()
         self.notification_count = 0
         self.init_clock()
         self.apply_theme()  # Apply theme on initialization
+        self.load_suggestion_index()
 
     def setup_ui(self):
         self.setFixedHeight(70)
@@ -73,6 +83,12 @@ class SearchBarWidget(QWidget):
         self.search_input.setCompleter(self.completer)
         self.search_input.textChanged.connect(self.on_text_changed)
 
+        # Suggestions are looked up once typing pauses, not on every keystroke
+        self.suggestion_timer = QTimer(self)
+        self.suggestion_timer.setSingleShot(True)
+        self.suggestion_timer.setInterval(SUGGESTION_DEBOUNCE_MS)
+        self.suggestion_timer.timeout.connect(self.update_suggestions)
+
     def apply_theme(self):
         """Apply current theme to all elements"""
         # Main widget styling
@@ -194,30 +210,71 @@ class SearchBarWidget(QWidget):
         self.clock_timer.start(1000)
 
 
-    def on_text_changed(self, text):
-        """Update autocomplete suggestions based on the current text."""
-        # If no product database is provided, do nothing
+    def load_suggestion_index(self):
+        """Build the name index once, in a worker thread.
+
+        With a shared inventory the names come from its snapshot and are
+        kept current from its change signals instead.
+        """
+        if self.inventory is not None:
+            self.inventory.loaded.connect(
+                lambda count: self.set_product_names(self.inventory.product_names()))
+            self.inventory.rows_added.connect(
+                lambda rows: self.on_product_names_changed([], [row[4] for row in rows]))
+            self.inventory.rows_updated.connect(self.on_rows_updated)
+            self.inventory.rows_removed.connect(
+                lambda rows: self.on_product_names_changed([row[4] for row in rows], []))
+            if self.inventory.is_loaded:
+                self.set_product_names(self.inventory.product_names())
+            return
         if not self.product_db:
             return
+        self.index_worker = DatabaseWorker(self.product_db, "names")
+        self.index_worker.finished.connect(self.on_names_loaded)
+        self.index_worker.error.connect(
+            lambda message: print("Error loading suggestions:", message))
+        self.index_worker.start()
+
+    def on_names_loaded(self, names):
+        self.set_product_names(names)
+
+    def set_product_names(self, names):
+        """Replace the indexed names, e.g. after the products view reloads"""
+        self.suggestion_index.rebuild(names)
+        self.index_ready = True
+        if self.search_input.text():
+            self.update_suggestions()
+
+    def on_product_names_changed(self, removed, added):
+        """Apply individual name changes without rebuilding the index"""
+        for name in removed:
+            self.suggestion_index.remove(name)
+        for name in added:
+            self.suggestion_index.add(name)
+
+    def on_rows_updated(self, old_rows, new_rows):
+        renamed = [(old[4], new[4]) for old, new in zip(old_rows, new_rows) if old[4] != new[4]]
+        if renamed:
+            self.on_product_names_changed([old for old, _ in renamed],
+                                          [new for _, new in renamed])
+
+    def on_text_changed(self, text):
+        """Schedule an autocomplete update; each keystroke cancels the previous one"""
+        if not self.product_db and self.inventory is None:
+            return
 
         # If the text is empty, clear the model
         if not text:
+            self.suggestion_timer.stop()
             self.completer_model.setStringList([])
             return
 
-        try:
-            # Fetch all products from the database
-            all_products = self.product_db.get_all_parts()
-            # Assuming the product name is at index 4 (as used in ProductsWidget)
-            suggestions = [
-                prod[4] for prod in all_products
-                if prod[4] and prod[4].lower().startswith(text.lower())
-            ]
-            # Limit to five suggestions
-            suggestions = suggestions[:5]
-        except Exception as e:
-            print("Error fetching suggestions:", e)
-            suggestions = []
-
-        self.completer_model.setStringList(suggestions)
+        self.suggestion_timer.start()
+
+    def update_suggestions(self):
+        """Fill the completer from the in-memory index for the current text"""
+        text = self.search_input.text()
+        if not text or not self.index_ready:
+            return
+        self.completer_model.setStringList(self.suggestion_index.suggest(text, limit=5))
 
@@ -38,11 +38,8 @@ class SplashScreen(QWidget):
         self.animation.setEndValue(1.0)
         self.animation.setEasingCurve(QEasingCurve.InOutSine)
 
-        self.timer = QTimer(self)
-        self.timer.setSingleShot(True)
-        self.timer.timeout.connect(self.close)
+        # Stays up until the caller closes it once the application is ready
         self.animation.start()
-        self.timer.start(6000)
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -51,7 +48,6 @@ class SplashScreen(QWidget):
     def closeEvent(self, event):
         try:
             self.animation.stop()
-            self.timer.stop()
             self.logo.deleteLater()
             self.deleteLater()
             QApplication.processEvents()
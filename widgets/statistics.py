@@ -3,13 +3,21 @@ from translator import Translator
 from themes import get_color  # Add theme import
 
 class StatisticsWidget(QWidget):
-    def __init__(self, translator):
+    def __init__(self, translator, inventory=None):
         super().__init__()
         self.setObjectName("statisticsContainer")  # Added for CSS styling
         self.translator = translator
+        self.inventory = inventory
+        self._stats_dirty = True
         self.setup_ui()
         self.apply_theme()  # Apply theme on initialization
 
+        if self.inventory is not None:
+            # Recomputed lazily: changes only mark the numbers stale
+            for signal in (self.inventory.loaded, self.inventory.rows_added,
+                           self.inventory.rows_updated, self.inventory.rows_removed):
+                signal.connect(self.mark_stats_dirty)
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -33,7 +41,7 @@ class StatisticsWidget(QWidget):
 
         # Refresh button
         self.refresh_button = QPushButton()
-        self.refresh_button.clicked.connect(lambda: print("Refreshing statistics..."))
+        self.refresh_button.clicked.connect(self.refresh_statistics)
         layout.addWidget(self.refresh_button, alignment=Qt.AlignCenter)
 
         # Set initial translations
@@ -96,5 +104,38 @@ class StatisticsWidget(QWidget):
         """Update text content from translations"""
         self.title_label.setText(self.translator.t('statistics_button'))
         self.graph_placeholder.setText(self.translator.t('graph_placeholder'))
-        self.stats_info.setText(self.translator.t('stats_info'))
-        self.refresh_button.setText(self.translator.t('refresh_statistics'))
\ No newline at end of file
+        self.refresh_button.setText(self.translator.t('refresh_statistics'))
+        self._stats_dirty = True
+        self.update_stats()
+
+    def refresh_statistics(self):
+        """Pull database changes into the shared inventory; the numbers follow"""
+        if self.inventory is not None:
+            self.inventory.refresh()
+        self.update_stats()
+
+    def mark_stats_dirty(self, *args):
+        self._stats_dirty = True
+        if self.isVisible():
+            self.update_stats()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_stats()
+
+    def update_stats(self):
+        """Summarize the inventory snapshot; no database query involved"""
+        if not self._stats_dirty:
+            return
+        self._stats_dirty = False
+        if self.inventory is None or not self.inventory.is_loaded:
+            self.stats_info.setText(self.translator.t('stats_info'))
+            return
+        products = list(self.inventory.rows())
+        self.stats_info.setText(self.translator.t('stats_summary').format(
+            count=len(products),
+            units=sum(p[5] or 0 for p in products),
+            value=sum((p[5] or 0) * (p[6] or 0) for p in products),
+            out_of_stock=sum(1 for p in products if not p[5]),
+            categories=len({p[1] for p in products if p[1]}),
+        ))
\ No newline at end of file
@@ -1,5 +1,166 @@
+import sqlite3
+
 from shared_imports import *
-from database.car_parts_db import CarPartsDB
+from PyQt5.QtCore import QObject
+from database.car_parts_db import CarPartsDB, OperationCancelled
+
+
+class WriteNotifier(QObject):
+    """Relays a queued write's Future as Qt signals.
+
+    The Future completes on the database writer thread; emitting from there
+    reaches slots in the GUI thread through a queued connection. Connect the
+    signals before calling start(), since an already finished Future reports
+    straight away.
+    """
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, future, parent=None):
+        super().__init__(parent)
+        self.future = future
+
+    def start(self):
+        self.future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        if future.cancelled():
+            self.error.emit("Write cancelled")
+        elif future.exception() is not None:
+            self.error.emit(str(future.exception()))
+        else:
+            self.finished.emit(future.result())
+
+
+class BulkDeleteWorker(QThread):
+    """Deletes a set of part ids in one transaction off the GUI thread"""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, db, part_ids):
+        super().__init__()
+        self.db = db
+        self.part_ids = list(part_ids)
+        self._cancel_requested = False
+
+    def cancel(self):
+        """Ask the worker to stop; everything it deleted so far is rolled back"""
+        self._cancel_requested = True
+
+    def run(self):
+        try:
+            deleted = self.db.delete_parts(self.part_ids,
+                                           progress=self.progress.emit,
+                                           is_cancelled=lambda: self._cancel_requested)
+            self.finished.emit(deleted)
+        except OperationCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            self.db.release_thread_connection()
+
+
+class CountWorker(QThread):
+    """Counts the parts matching filter criteria for a live preview.
+
+    cancel() interrupts the COUNT query if it is already running, so a
+    superseded preview stops using the database straight away.
+    """
+    counted = pyqtSignal(int, int)  # (request id, count)
+    error = pyqtSignal(str)
+
+    def __init__(self, db, filters, request_id):
+        super().__init__()
+        self.db = db
+        self.filters = dict(filters)
+        self.request_id = request_id
+        self._conn = None
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+        conn = self._conn
+        if conn is not None:
+            conn.interrupt()
+
+    def run(self):
+        try:
+            self._conn = self.db.connections.get()
+            if self._cancel_requested:
+                return
+            count = self.db.count_parts(self.filters)
+            if not self._cancel_requested:
+                self.counted.emit(self.request_id, count)
+        except sqlite3.OperationalError as e:
+            if not self._cancel_requested:
+                self.error.emit(str(e))
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            self._conn = None
+            self.db.release_thread_connection()
+
+
+class IndexBuildWorker(QThread):
+    """Builds an in-memory search index from a snapshot of rows off the GUI thread"""
+    built = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, index_class, rows):
+        super().__init__()
+        self.index_class = index_class
+        self.rows = list(rows)
+
+    def run(self):
+        try:
+            self.built.emit(self.index_class(self.rows))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class PagedLoadWorker(QThread):
+    """Streams the catalog page by page so the first rows show up immediately.
+
+    The first page is kept small to fill the visible screen; later pages are
+    larger and separated by a short pause so the GUI thread stays idle
+    enough to paint and handle input while the rest loads.
+    """
+    page_loaded = pyqtSignal(object)
+    finished = pyqtSignal(int)
+    error = pyqtSignal(str)
+
+    def __init__(self, db, first_page=100, page_size=2000, pause_ms=10):
+        super().__init__()
+        self.db = db
+        self.first_page = first_page
+        self.page_size = page_size
+        self.pause_ms = pause_ms
+
+    def run(self):
+        try:
+            cursor = None
+            limit = self.first_page
+            total = 0
+            while not self.isInterruptionRequested():
+                page = self.db.get_parts_page(cursor, limit)
+                if page:
+                    total += len(page)
+                    self.page_loaded.emit(page)
+                if len(page) < limit:
+                    break
+                cursor = self.db.page_cursor(page)
+                limit = self.page_size
+                self.msleep(self.pause_ms)
+            self.finished.emit(total)
+        except Exception as e:
+            self.error.emit(str(e))
+        finally:
+            self.db.release_thread_connection()
+
+
 class DatabaseWorker(QThread):
     finished = pyqtSignal(object)
     error = pyqtSignal(str)
@@ -13,11 +174,22 @@ class DatabaseWorker(QThread):
 
     def run(self):
         try:
-            if self.operation == "load":
-                result = self.db.get_all_parts()
+            if self.operation == "filter":
+                started = time.perf_counter()
+                result = self.db.filter_parts(*self.args)
+                self.finished.emit((result, time.perf_counter() - started))
+            elif self.operation == "compatible":
+                started = time.perf_counter()
+                result = self.db.find_compatible_ids(*self.args)
+                self.finished.emit((result, time.perf_counter() - started))
+            elif self.operation == "changes":
+                result = self.db.get_changes_since(*self.args)
+                self.finished.emit(result)
+            elif self.operation == "names":
+                result = self.db.get_product_names()
                 self.finished.emit(result)
-            elif self.operation == "add":
-                success = self.db.add_part(**self.kwargs)
-                self.finished.emit(success)
         except Exception as e:
-            self.error.emit(str(e))
\ No newline at end of file
+            self.error.emit(str(e))
+        finally:
+            # Each worker thread gets its own connection; don't leave it open
+            self.db.release_thread_connection()
\ No newline at end of file